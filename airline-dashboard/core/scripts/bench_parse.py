@@ -0,0 +1,122 @@
+"""Benchmark the HTML parse backends and check that their output matches.
+
+Reads real filing documents from the raw filing store (default), a replay
+fixture directory, or HTML files given on the command line. Each document is
+parsed with the ``soup`` and ``stream`` backends of ``parse.html_to_text``.
+Per document and in total, the script reports wall time and, with ``--memory``,
+peak Python allocations. A document whose two outputs differ is reported, and
+the script then exits non-zero, so the run doubles as the equivalence check.
+
+    python -m scripts.bench_parse --limit 20
+    python -m scripts.bench_parse --fixtures fixtures/edgar-2024q2 --memory
+    python -m scripts.bench_parse path/to/aal-20241231.htm
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Iterator
+
+from sec_pipeline.doc_store import DocStore
+from sec_pipeline.parse import html_to_text
+from sec_pipeline.replay import MANIFEST_NAME
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger("bench_parse")
+
+BACKENDS = ("soup", "stream")
+_HTML_SUFFIXES = (".htm", ".html")
+
+
+def _from_store(root: Path | None, limit: int) -> Iterator[tuple[str, bytes]]:
+    store = DocStore(root)
+    try:
+        keys = [k for k in store.keys() if k[2].lower().endswith(_HTML_SUFFIXES)]
+        for cik, accession, document in keys[:limit]:
+            content = store.get(cik, accession, document)
+            if content is not None:
+                yield f"{accession}/{document}", content
+    finally:
+        store.close()
+
+
+def _from_fixtures(root: Path, limit: int) -> Iterator[tuple[str, bytes]]:
+    responses = json.loads((root / MANIFEST_NAME).read_text(encoding="utf-8"))["responses"]
+    paths = [p for p in responses if p.startswith("/Archives/") and p.lower().endswith(_HTML_SUFFIXES)]
+    for path in paths[:limit]:
+        yield path.rsplit("/", 2)[-2] + "/" + path.rsplit("/", 1)[-1], gzip.decompress(
+            (root / responses[path]["file"]).read_bytes()
+        )
+
+
+def _measure(content: bytes, backend: str, memory: bool) -> tuple[str, float, int]:
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    text = html_to_text(content, backend=backend)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return text, elapsed, peak
+
+
+def bench(documents: Iterator[tuple[str, bytes]], memory: bool = False) -> int:
+    """Time both backends on ``documents``; return how many outputs differ."""
+    totals = {b: [0.0, 0] for b in BACKENDS}
+    size = mismatches = count = 0
+    for name, content in documents:
+        results = {b: _measure(content, b, memory) for b in BACKENDS}
+        count += 1
+        size += len(content)
+        for backend, (_, elapsed, peak) in results.items():
+            totals[backend][0] += elapsed
+            totals[backend][1] = max(totals[backend][1], peak)
+        same = results["soup"][0] == results["stream"][0]
+        mismatches += not same
+        log.info(
+            "%-48s %7.2f MB  soup %6.2fs  stream %6.2fs%s",
+            name, len(content) / 1e6, results["soup"][1], results["stream"][1],
+            "" if same else "  OUTPUT DIFFERS",
+        )
+    if not count:
+        log.warning("No HTML documents to benchmark")
+        return 0
+    for backend, (elapsed, peak) in totals.items():
+        log.info(
+            "%s: %d documents, %.1f MB in %.2fs (%.1f MB/s)%s",
+            backend, count, size / 1e6, elapsed, size / 1e6 / elapsed if elapsed else 0.0,
+            f", peak {peak / 1e6:.0f} MB" if memory else "",
+        )
+    log.info("Speedup: %.1fx; %d of %d outputs differ",
+             totals["soup"][0] / (totals["stream"][0] or 1e-9), mismatches, count)
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the soup and stream HTML parsers.")
+    parser.add_argument("files", nargs="*", type=Path, help="HTML files to parse instead of stored filings.")
+    parser.add_argument("--store", type=Path, default=None, help="Raw filing store to read (default: DOC_STORE_DIR).")
+    parser.add_argument("--fixtures", type=Path, default=None, help="Replay fixture directory to read instead of the store.")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum documents to parse.")
+    parser.add_argument("--memory", action="store_true", help="Also report peak allocations (slows both backends).")
+    args = parser.parse_args()
+    if args.files:
+        documents = ((str(p), p.read_bytes()) for p in args.files[: args.limit])
+    elif args.fixtures:
+        documents = _from_fixtures(args.fixtures, args.limit)
+    else:
+        documents = _from_store(args.store, args.limit)
+    sys.exit(1 if bench(documents, memory=args.memory) else 0)
+
+
+if __name__ == "__main__":
+    main()
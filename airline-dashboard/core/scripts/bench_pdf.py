@@ -0,0 +1,90 @@
+"""Benchmark serial against page-parallel PDF extraction.
+
+Reads PDF documents from the raw filing store (default) or from files given on
+the command line, largest first. Each is extracted in-process and with
+``--workers`` processes, and the script reports wall time per document and in
+total. A document whose two extractions differ is reported, and the script
+then exits non-zero.
+
+    python -m scripts.bench_pdf --limit 10 --workers 8
+    python -m scripts.bench_pdf exhibits/*.pdf --max-pages 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Iterator
+
+from sec_pipeline.doc_store import DocStore
+from sec_pipeline.parse import pdf_to_text
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger("bench_pdf")
+
+
+def _from_store(root: Path | None) -> Iterator[tuple[str, bytes]]:
+    store = DocStore(root)
+    try:
+        for cik, accession, document in store.keys():
+            if document.lower().endswith(".pdf"):
+                content = store.get(cik, accession, document)
+                if content is not None:
+                    yield f"{accession}/{document}", content
+    finally:
+        store.close()
+
+
+def bench(
+    documents: list[tuple[str, bytes]], workers: int, max_pages: int = 0
+) -> int:
+    """Time both modes on ``documents``; return how many outputs differ."""
+    serial_total = parallel_total = 0.0
+    mismatches = 0
+    for name, content in documents:
+        start = time.perf_counter()
+        serial = pdf_to_text(content, max_pages=max_pages, workers=1)
+        serial_s = time.perf_counter() - start
+        start = time.perf_counter()
+        parallel = pdf_to_text(content, max_pages=max_pages, workers=workers)
+        parallel_s = time.perf_counter() - start
+        serial_total += serial_s
+        parallel_total += parallel_s
+        mismatches += serial != parallel
+        log.info(
+            "%-48s %7.2f MB  serial %6.2fs  %d workers %6.2fs%s",
+            name, len(content) / 1e6, serial_s, workers, parallel_s,
+            "" if serial == parallel else "  OUTPUT DIFFERS",
+        )
+    if not documents:
+        log.warning("No PDF documents to benchmark")
+        return 0
+    log.info(
+        "%d documents: serial %.2fs, parallel %.2fs (%.1fx); %d outputs differ",
+        len(documents), serial_total, parallel_total,
+        serial_total / (parallel_total or 1e-9), mismatches,
+    )
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark page-parallel PDF extraction.")
+    parser.add_argument("files", nargs="*", type=Path, help="PDF files to extract instead of stored filings.")
+    parser.add_argument("--store", type=Path, default=None, help="Raw filing store to read (default: DOC_STORE_DIR).")
+    parser.add_argument("--limit", type=int, default=10, help="Largest documents to extract.")
+    parser.add_argument("--workers", type=int, default=0, help="Processes for the parallel run (default: one per CPU).")
+    parser.add_argument("--max-pages", type=int, default=0, help="Page cap for both runs (default: all pages).")
+    args = parser.parse_args()
+    if args.files:
+        documents = [(str(p), p.read_bytes()) for p in args.files]
+    else:
+        documents = list(_from_store(args.store))
+    documents = sorted(documents, key=lambda d: len(d[1]), reverse=True)[: args.limit]
+    sys.exit(1 if bench(documents, args.workers, args.max_pages) else 0)
+
+
+if __name__ == "__main__":
+    main()
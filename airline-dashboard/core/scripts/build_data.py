@@ -12,6 +12,8 @@ Combines three sources:
 Outputs to ``data/generated/``:
 
 * ``financials.json`` - one record per airline / year / period with every metric.
+* ``financials_as_reported.json`` (``--as-reported``) - the same records built
+  from each period's originally filed figures, before any restatement.
 * ``buybacks.json``   - share repurchase and share sale history with derived columns.
 
 Where the manual sheet also carries one of the four auto metrics, a mismatch
@@ -23,6 +25,9 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
 
@@ -30,6 +35,10 @@ import pandas as pd
 
 from sec_pipeline import config
 from sec_pipeline.edgar_client import EdgarClient
+from sec_pipeline.fact_store import FactStore, extract_as_reported
+from sec_pipeline.facts_cache import load_company_facts
+from sec_pipeline.frames import load_frames_facts
+from sec_pipeline.watermarks import Watermarks, extract_periods
 from sec_pipeline.xbrl import extract_financials
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -46,8 +55,11 @@ AUTO_METRICS = [
 ]
 MANUAL_METRICS = ["Passenger Revenue", "RPM", "ASM", "Profit Sharing"]
 MISMATCH_TOLERANCE = 0.02  # 2% relative difference
+# Concurrent companyfacts downloads; the client's rate limiter still applies.
+FETCH_THREADS = 4
 
 FINANCIALS_PATH = config.GENERATED_DIR / "financials.json"
+FINANCIALS_AS_REPORTED_PATH = config.GENERATED_DIR / "financials_as_reported.json"
 BUYBACKS_PATH = config.GENERATED_DIR / "buybacks.json"
 DIAGNOSTICS_DIR = config.GENERATED_DIR / "diagnostics"
 DIAGNOSTICS_SUMMARY_CSV = DIAGNOSTICS_DIR / "coverage_summary.csv"
@@ -93,18 +105,138 @@ def load_manual() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     return metrics, repurchases, sales
 
 
-def load_auto(airlines: list[str], years: list[int], periods: list[str]) -> pd.DataFrame:
-    """Fetch XBRL company facts and extract the four auto metrics per airline."""
-    client = EdgarClient()
+def load_auto(
+    airlines: list[str],
+    years: list[int],
+    periods: list[str],
+    bulk_dir: str | None = None,
+    client: EdgarClient | None = None,
+    store: FactStore | None = None,
+    workers: int | None = None,
+    source: str = "companyfacts",
+    watermarks: Watermarks | None = None,
+) -> pd.DataFrame:
+    """Fetch XBRL company facts and extract the four auto metrics per airline.
+
+    ``bulk_dir`` reads company facts from a local ``companyfacts.zip`` instead
+    of the SEC API. When a ``store`` is given, every fetched payload is also
+    ingested into it for point-in-time queries. ``source="frames"`` builds the
+    payloads from cross-company frames instead of per-airline companyfacts.
+
+    With more than one worker (default: one per CPU), downloads run on a small
+    thread pool while extraction runs in a process pool, so fetching the next
+    airline overlaps with extracting the previous ones. Records are merged in
+    the order of ``airlines`` regardless of completion order.
+
+    With ``watermarks``, only periods never extracted or touched by facts filed
+    past the airline's watermark are re-extracted; the rest come from the
+    records stored with the watermark. An airline whose facts cannot be fetched
+    or extracted is logged and skipped, or falls back to its stored records.
+    """
+    if watermarks is not None and source == "frames":
+        raise ValueError("Incremental extraction needs filing dates, which frames do not carry")
+    if store is not None and source == "frames":
+        raise ValueError("The as-reported fact store needs filing dates, which frames do not carry")
+    client = client or EdgarClient(bulk_dir=bulk_dir)
     ciks = client.resolve_ciks(airlines)
-    rows: list[dict[str, Any]] = []
-    for airline in airlines:
+    workers = workers or os.cpu_count() or 1
+    records: dict[str, list[dict[str, Any]]] = {}
+    stale: dict[str, list[tuple[int, str]]] = {}
+
+    def job(airline: str, facts: dict[str, Any]) -> tuple[Any, tuple[Any, ...]]:
+        """Extraction callable and arguments for one airline's payload."""
+        if store is not None:
+            store.ingest(ciks[airline], facts)
+        if watermarks is None:
+            return extract_financials, (facts, years, periods)
+        stale[airline] = watermarks.stale_periods(ciks[airline], facts, years, periods)
+        log.info(
+            "%s: re-extracting %d of %d periods",
+            airline, len(stale[airline]), len(years) * len(periods),
+        )
+        return extract_periods, (facts, stale[airline])
+
+    def done(airline: str, facts: dict[str, Any], extracted: list[dict[str, Any]]) -> None:
+        if watermarks is None:
+            records[airline] = extracted
+            return
+        watermarks.advance(ciks[airline], facts, stale[airline], extracted)
+        records[airline] = watermarks.records(ciks[airline], years, periods)
+
+    def extract(airline: str, facts: dict[str, Any]) -> None:
         try:
-            facts = client.company_facts(ciks[airline])
+            fn, args = job(airline, facts)
+            done(airline, facts, fn(*args))
         except Exception as exc:  # noqa: BLE001
-            log.error("Could not fetch company facts for %s: %s", airline, exc)
-            continue
-        for rec in extract_financials(facts, years, periods):
+            log.error("Could not extract financials for %s: %s", airline, exc)
+
+    if source == "frames":
+        payloads = load_frames_facts(client, ciks.values(), years)
+        for airline in airlines:
+            extract(airline, payloads[EdgarClient.normalize_cik(ciks[airline])])
+    elif workers <= 1 or len(airlines) <= 1:
+        for airline in airlines:
+            try:
+                facts = load_company_facts(client, ciks[airline])
+            except Exception as exc:  # noqa: BLE001
+                log.error("Could not fetch company facts for %s: %s", airline, exc)
+                continue
+            extract(airline, facts)
+    else:
+        with (
+            ThreadPoolExecutor(max_workers=min(FETCH_THREADS, len(airlines))) as fetch_pool,
+            ProcessPoolExecutor(
+                max_workers=min(workers, len(airlines)),
+                mp_context=multiprocessing.get_context(config.MP_START_METHOD),
+            ) as extract_pool,
+        ):
+            fetches = {
+                fetch_pool.submit(load_company_facts, client, ciks[airline]): airline
+                for airline in airlines
+            }
+            extractions = {}
+            for future in as_completed(fetches):
+                airline = fetches[future]
+                try:
+                    facts = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    log.error("Could not fetch company facts for %s: %s", airline, exc)
+                    continue
+                try:
+                    fn, args = job(airline, facts)
+                except Exception as exc:  # noqa: BLE001
+                    log.error("Could not extract financials for %s: %s", airline, exc)
+                    continue
+                extractions[airline] = (facts, extract_pool.submit(fn, *args))
+            for airline, (facts, future) in extractions.items():
+                try:
+                    done(airline, facts, future.result())
+                except Exception as exc:  # noqa: BLE001
+                    log.error("Could not extract financials for %s: %s", airline, exc)
+
+    if watermarks is not None:
+        for airline in airlines:
+            if airline not in records:
+                records[airline] = watermarks.records(ciks[airline], years, periods)
+
+    rows: list[dict[str, Any]] = []
+    for airline in airlines:
+        for rec in records.get(airline, []):
+            rec["Airline"] = airline
+            rows.append(rec)
+    return pd.DataFrame(rows)
+
+
+def load_as_reported(
+    store: FactStore,
+    ciks: dict[str, str],
+    years: list[int],
+    periods: list[str],
+) -> pd.DataFrame:
+    """Extract the originally filed auto metrics per airline from the fact store."""
+    rows: list[dict[str, Any]] = []
+    for airline, cik in ciks.items():
+        for rec in extract_as_reported(store, cik, years, periods):
             rec["Airline"] = airline
             rows.append(rec)
     return pd.DataFrame(rows)
@@ -485,10 +617,11 @@ def _write_coverage_diagnostics(
     log.info("Wrote %s", DIAGNOSTICS_REPORT_JSON)
 
 
-def _load_existing_financials() -> pd.DataFrame:
-    if not FINANCIALS_PATH.exists():
+def _load_existing_financials(path: Path | None = None) -> pd.DataFrame:
+    path = path or FINANCIALS_PATH
+    if not path.exists():
         return pd.DataFrame()
-    df = pd.DataFrame(json.loads(FINANCIALS_PATH.read_text(encoding="utf-8")))
+    df = pd.DataFrame(json.loads(path.read_text(encoding="utf-8")))
     if df.empty:
         return df
     if "Period" not in df.columns:
@@ -541,14 +674,58 @@ def _merge_buybacks(existing: dict[str, list[dict[str, Any]]], new: dict[str, li
     }
 
 
+def _finalize(
+    auto: pd.DataFrame,
+    manual_metrics: pd.DataFrame,
+    airlines: list[str],
+    years: list[int],
+    periods: list[str],
+) -> pd.DataFrame:
+    """Merge auto and manual metrics, derive ratios, and scope to the slice."""
+    merged = merge_sources(auto, manual_metrics)
+    merged = add_derived(merged)
+
+    drop = [c for c in merged.columns if c.endswith("_manual")]
+    merged = merged.drop(columns=drop).sort_values(["Airline", "Year", "Quarter"])
+
+    # Final guard: only requested keys are eligible to update persisted financials.
+    return _scope_frame(merged, airlines, years, periods)
+
+
 def build(
     airlines: list[str],
     years: list[int],
     periods: list[str],
     overwrite: bool = False,
     share_data: bool = False,
+    bulk_dir: str | None = None,
+    as_reported: bool = False,
+    workers: int | None = None,
+    source: str = "companyfacts",
+    incremental: bool = False,
+    client: EdgarClient | None = None,
 ) -> None:
-    auto = load_auto(airlines, years, periods)
+    """Write financials.json (and optional companions) for the requested slice.
+
+    A ``client`` passed in is shared with the caller, which then reports its
+    cache statistics.
+    """
+    if as_reported and source == "frames":
+        raise ValueError("The as-reported fact store needs filing dates, which frames do not carry")
+    owns_client = client is None
+    client = client or EdgarClient(bulk_dir=bulk_dir)
+    store = FactStore() if as_reported else None
+    watermarks = Watermarks() if incremental else None
+    auto = load_auto(
+        airlines,
+        years,
+        periods,
+        client=client,
+        store=store,
+        workers=workers,
+        source=source,
+        watermarks=watermarks,
+    )
     manual_metrics, repurchases, sales = load_manual()
     repurchases_full = repurchases.copy()
     sales_full = sales.copy()
@@ -556,14 +733,7 @@ def build(
     # Scope manual metrics to the requested slice so subset runs are idempotent.
     manual_metrics = _scope_frame(manual_metrics, airlines, years, periods)
 
-    merged = merge_sources(auto, manual_metrics)
-    merged = add_derived(merged)
-
-    drop = [c for c in merged.columns if c.endswith("_manual")]
-    merged = merged.drop(columns=drop).sort_values(["Airline", "Year", "Quarter"])
-
-    # Final guard: only requested keys are eligible to update persisted financials.
-    merged = _scope_frame(merged, airlines, years, periods)
+    merged = _finalize(auto, manual_metrics, airlines, years, periods)
 
     # Diagnostics are always produced for the requested slice.
     _write_coverage_diagnostics(
@@ -580,11 +750,28 @@ def build(
         merged = _merge_financials(existing_financials, merged)
 
     _write(FINANCIALS_PATH, _records(merged))
+    if watermarks is not None:
+        watermarks.save()
+
+    if store is not None:
+        originals = load_as_reported(store, client.resolve_ciks(airlines), years, periods)
+        store.close()
+        if originals.empty:
+            log.warning("No as-reported facts found for the requested slice")
+        else:
+            reported = _finalize(originals, manual_metrics, airlines, years, periods)
+            if not overwrite:
+                existing = _load_existing_financials(FINANCIALS_AS_REPORTED_PATH)
+                reported = _merge_financials(existing, reported)
+            _write(FINANCIALS_AS_REPORTED_PATH, _records(reported))
 
     if share_data:
         buybacks = build_buybacks(repurchases_full, sales_full)
         _write(BUYBACKS_PATH, buybacks)
 
+    if owns_client:
+        client.log_cache_stats()
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Build the dashboard datasets.")
@@ -593,13 +780,27 @@ def main() -> None:
     parser.add_argument("--periods", nargs="+", default=["Q1", "Q2", "Q3", "Q4", "FY"])
     parser.add_argument("--overwrite", action="store_true", help="Overwrite existing generated outputs instead of merging with existing data.")
     parser.add_argument("--share-data", action="store_true", help="Optionally write full static share repurchase/sale history from manual files (unscoped). If omitted, existing buybacks.json is left unchanged.")
+    parser.add_argument("--bulk-dir", default=None, help="Directory holding SEC bulk companyfacts.zip/submissions.zip; reads facts locally instead of calling the API.")
+    parser.add_argument("--as-reported", action="store_true", help="Also write financials_as_reported.json from each period's originally filed figures, using the point-in-time fact store.")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction processes (default: one per CPU; 1 runs serially in-process).")
+    parser.add_argument("--source", choices=["companyfacts", "frames"], default="companyfacts", help="Auto-metric source: per-airline companyfacts (default) or cross-company XBRL frames.")
+    parser.add_argument("--incremental", action="store_true", help="Re-extract only periods touched by facts filed since the last build (watermarks in xbrl_watermarks.json).")
     args = parser.parse_args()
+    if args.incremental and args.source == "frames":
+        parser.error("--incremental requires --source companyfacts")
+    if args.as_reported and args.source == "frames":
+        parser.error("--as-reported requires --source companyfacts")
     build(
         args.airlines,
         args.years,
         args.periods,
         overwrite=args.overwrite,
         share_data=args.share_data,
+        bulk_dir=args.bulk_dir,
+        as_reported=args.as_reported,
+        workers=args.workers,
+        source=args.source,
+        incremental=args.incremental,
     )
 
 
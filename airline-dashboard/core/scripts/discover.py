@@ -0,0 +1,113 @@
+"""Long-running discovery mode: refresh only what new filings affect.
+
+Polls EDGAR daily master indexes, or a directory of index files standing in
+for the feed, for new 10-Q / 10-K / 8-K filings by the tracked airlines. Each
+poll becomes a refresh plan of (airline, period) keys:
+
+* financial keys are rebuilt with ``build_data.build(..., incremental=True)``;
+* insight keys are re-summarized with ``pipeline.run(..., overwrite=True)`` so
+  a late 8-K or amendment reaches the existing summary.
+
+Both stages run through ``scripts.refresh.execute`` on the polling client.
+
+A poll that finds nothing does no work. A plan that fails is kept and retried
+on the next poll.
+
+    python -m scripts.discover --interval 600
+    python -m scripts.discover --index-dir ./index-mirror --once --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from datetime import date
+from pathlib import Path
+
+from sec_pipeline import config
+from sec_pipeline.discovery import (
+    DailyIndexSource,
+    LocalIndexSource,
+    RefreshPlan,
+    plan_refresh,
+)
+from sec_pipeline.edgar_client import EdgarClient
+
+from scripts.refresh import execute
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger("discover")
+
+DEFAULT_INTERVAL = 600  # seconds between polls
+
+
+def refresh(plan: RefreshPlan, client: EdgarClient | None = None, insights: bool = True) -> None:
+    """Rebuild every key in ``plan``; insight keys are re-summarized."""
+    if not insights:
+        plan = RefreshPlan(plan.financials, {})
+    execute(plan, client, incremental=True, overwrite_insights=True)
+
+
+def discover(
+    airlines: list[str],
+    index_dir: Path | None = None,
+    start: date | None = None,
+    interval: float = DEFAULT_INTERVAL,
+    once: bool = False,
+    dry_run: bool = False,
+    insights: bool = True,
+) -> RefreshPlan:
+    """Poll for new filings and refresh the keys they affect.
+
+    Returns the plan of the last poll (useful with ``once``).
+    """
+    client = EdgarClient()
+    tracked = {cik: airline for airline, cik in client.resolve_ciks(airlines).items()}
+    source = LocalIndexSource(index_dir) if index_dir else DailyIndexSource(client, start)
+    pending = RefreshPlan({}, {})
+    while True:
+        pending.update(plan_refresh(source.poll(), tracked))
+        plan = pending
+        if not pending:
+            log.info("No new filings by tracked airlines")
+        elif dry_run:
+            for spec, who in sorted(pending.financials.items(), key=lambda kv: kv[0].label):
+                log.info("Would rebuild financials %s for %s", spec.label, sorted(who))
+            for spec, who in sorted(pending.insights.items(), key=lambda kv: kv[0].label):
+                log.info("Would re-summarize %s for %s", spec.label, sorted(who))
+            pending = RefreshPlan({}, {})
+        else:
+            try:
+                refresh(pending, client, insights=insights)
+                pending = RefreshPlan({}, {})
+            except Exception as exc:  # noqa: BLE001 - retry the plan next poll
+                log.error("Refresh failed, retrying next poll: %s", exc)
+        if once:
+            return plan
+        time.sleep(interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh data as tracked airlines file.")
+    parser.add_argument("--airlines", nargs="+", default=list(config.AIRLINE_NAMES))
+    parser.add_argument("--index-dir", type=Path, default=None, help="Read master-format .idx files from this directory instead of the EDGAR daily index.")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="First daily index to read on a fresh state (default: today).")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Seconds between polls.")
+    parser.add_argument("--once", action="store_true", help="Poll once, refresh, and exit.")
+    parser.add_argument("--dry-run", action="store_true", help="Log the refresh plan without building anything.")
+    parser.add_argument("--no-insights", action="store_true", help="Rebuild financials only.")
+    args = parser.parse_args()
+    discover(
+        args.airlines,
+        index_dir=args.index_dir,
+        start=args.start,
+        interval=args.interval,
+        once=args.once,
+        dry_run=args.dry_run,
+        insights=not args.no_insights,
+    )
+
+
+if __name__ == "__main__":
+    main()
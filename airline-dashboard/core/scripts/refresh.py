@@ -0,0 +1,172 @@
+"""Refresh financials and insights in one process from one run plan.
+
+The refresh used to run ``build_data`` and ``sec_pipeline.pipeline`` as two
+processes. Each built its own ``EdgarClient``, resolved CIKs through the full
+ticker map, and re-read submissions. ``refresh`` does this instead:
+
+* plans the (airline, period) keys once. Financial keys cover the whole slice
+  and are fully re-extracted; ``--incremental`` re-extracts only periods
+  touched by new filings. Insight keys are only those without a summary,
+  unless ``--overwrite-insights`` is given.
+* shares one warmed client between the stages: CIKs are resolved once, each
+  airline's filing index is loaded up front, and both stages use one HTTP
+  session, document store, and rate budget.
+* runs the financial build and the insights pipeline concurrently. Neither
+  reads the other's output.
+
+    python -m scripts.refresh --years 2024 --periods Q2
+    python -m scripts.refresh --airlines AAL UAL --years 2024 --periods Q4 FY --no-insights
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from sec_pipeline import config, pipeline
+from sec_pipeline.discovery import RefreshPlan
+from sec_pipeline.edgar_client import EdgarClient
+
+from scripts import build_data
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger("refresh")
+
+
+def plan_run(
+    airlines: list[str],
+    years: list[int],
+    periods: list[str],
+    insights: bool = True,
+    overwrite_insights: bool = False,
+) -> RefreshPlan:
+    """Keys to rebuild for a slice: every financial key, unsummarized insight keys."""
+    specs = config.build_periods(years, periods)
+    plan = RefreshPlan({spec: set(airlines) for spec in specs}, {})
+    if insights:
+        for airline, spec in pipeline.pending_keys(airlines, specs, overwrite_insights):
+            plan.insights.setdefault(spec, set()).add(airline)
+    return plan
+
+
+def _grouped(keys: dict[config.PeriodSpec, set[str]]) -> dict[tuple[str, ...], list[config.PeriodSpec]]:
+    """``{spec: airlines}`` regrouped as ``{airlines: specs}``."""
+    groups: dict[tuple[str, ...], list[config.PeriodSpec]] = {}
+    for spec, airlines in sorted(keys.items(), key=lambda kv: kv[0].label):
+        groups.setdefault(tuple(sorted(airlines)), []).append(spec)
+    return groups
+
+
+def _blocks(specs: list[config.PeriodSpec]) -> list[tuple[list[int], list[str]]]:
+    """``specs`` as ``(years, periods)`` cross products covering exactly them."""
+    by_year: dict[int, set[str]] = {}
+    for spec in specs:
+        by_year.setdefault(spec.year, set()).add(spec.period)
+    blocks: dict[tuple[str, ...], list[int]] = {}
+    for year, periods in sorted(by_year.items()):
+        blocks.setdefault(tuple(p for p in config.QUARTERS if p in periods), []).append(year)
+    return [(years, list(periods)) for periods, years in blocks.items()]
+
+
+def _financials(plan: RefreshPlan, client: EdgarClient, incremental: bool, workers: int | None) -> None:
+    # One build per airline group and per block of years sharing the same
+    # periods, so no build extracts a key the plan does not hold.
+    for airlines, specs in _grouped(plan.financials).items():
+        for years, periods in _blocks(specs):
+            log.info("Building financials %s x %s for %s", years, periods, list(airlines))
+            build_data.build(
+                list(airlines), years, periods,
+                incremental=incremental, workers=workers, client=client,
+            )
+
+
+def _insights(plan: RefreshPlan, client: EdgarClient, overwrite: bool) -> None:
+    # One run per period, so only planned keys are summarized.
+    for spec, airlines in sorted(plan.insights.items(), key=lambda kv: kv[0].label):
+        log.info("Summarizing %s for %s", spec.label, sorted(airlines))
+        pipeline.run(
+            sorted(airlines), [spec.year], [spec.period],
+            overwrite=overwrite, client=client,
+        )
+
+
+def execute(
+    plan: RefreshPlan,
+    client: EdgarClient | None = None,
+    incremental: bool = False,
+    overwrite_insights: bool = False,
+    workers: int | None = None,
+) -> None:
+    """Run both stages of ``plan`` concurrently on one shared client."""
+    client = client or EdgarClient()
+    airlines = sorted(set().union(*plan.financials.values(), *plan.insights.values()))
+    if not airlines:
+        log.info("Nothing to refresh")
+        return
+    ciks = client.resolve_ciks(airlines)
+    if plan.insights:
+        # Warm the filing indexes the insights stage queries per period.
+        insight_airlines = sorted(set().union(*plan.insights.values()))
+        with ThreadPoolExecutor(max_workers=config.SEC_MAX_CONCURRENCY) as pool:
+            list(pool.map(client.filing_index, (ciks[a] for a in insight_airlines)))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        stages = [pool.submit(_financials, plan, client, incremental, workers)]
+        if plan.insights:
+            stages.append(pool.submit(_insights, plan, client, overwrite_insights))
+        for stage in stages:
+            stage.result()
+    client.log_cache_stats()
+
+
+def refresh(
+    airlines: list[str],
+    years: list[int],
+    periods: list[str],
+    insights: bool = True,
+    overwrite_insights: bool = False,
+    incremental: bool = False,
+    bulk_dir: str | None = None,
+    workers: int | None = None,
+) -> RefreshPlan:
+    """Plan and run a refresh of one slice; returns the plan."""
+    plan = plan_run(airlines, years, periods, insights, overwrite_insights)
+    log.info(
+        "Plan: %d financial keys, %d insight keys",
+        sum(map(len, plan.financials.values())), sum(map(len, plan.insights.values())),
+    )
+    execute(
+        plan,
+        EdgarClient(bulk_dir=bulk_dir),
+        incremental=incremental,
+        overwrite_insights=overwrite_insights,
+        workers=workers,
+    )
+    return plan
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh financials and insights together.")
+    parser.add_argument("--airlines", nargs="+", default=list(config.AIRLINE_NAMES))
+    parser.add_argument("--years", nargs="+", type=int, required=True)
+    parser.add_argument("--periods", nargs="+", default=list(config.QUARTERS))
+    parser.add_argument("--no-insights", action="store_true", help="Rebuild financials only.")
+    parser.add_argument("--overwrite-insights", action="store_true", help="Re-summarize periods that already have a summary.")
+    parser.add_argument("--incremental", action="store_true", help="Re-extract only financial periods touched by filings since the last build (watermarks in xbrl_watermarks.json).")
+    parser.add_argument("--bulk-dir", default=None, help="Directory holding SEC bulk companyfacts.zip/submissions.zip.")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction processes for the financial build.")
+    args = parser.parse_args()
+    refresh(
+        args.airlines,
+        args.years,
+        args.periods,
+        insights=not args.no_insights,
+        overwrite_insights=args.overwrite_insights,
+        incremental=args.incremental,
+        bulk_dir=args.bulk_dir,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
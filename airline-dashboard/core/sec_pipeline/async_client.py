@@ -0,0 +1,350 @@
+"""Asyncio front end to ``EdgarClient`` with many requests in flight.
+
+``AsyncEdgarClient`` mirrors the public surface of ``EdgarClient``:
+``list_filings``, ``filings_in_window``, ``fetch_document``, ``company_facts``,
+``resolve_ciks``, and friends are coroutines. It wraps a sync client and shares
+its cached session, bulk archives, and token-bucket limiter, so sync and async
+callers draw on one SEC rate budget and one HTTP cache.
+
+* Up to ``SEC_MAX_CONCURRENCY`` requests run at once on worker threads.
+* Live requests take a token from the shared bucket, which allows short bursts
+  and sleeps outside its lock. Cache hits bypass the limiter.
+* Concurrent requests for the same URL share one fetch. Requests run on one
+  background event loop, so callers on other loops and threads share it too;
+  a fetch is cancelled once every caller waiting on it is.
+
+``AsyncEdgarClient.of(client)`` returns the one async client kept per sync
+client; the module's sync entry points all use it.
+
+``fetch_documents`` is the sync entry point for downloading a batch of filing
+documents concurrently. ``iter_documents`` yields them as they finish, so
+callers can start on early documents while later ones download.
+``with_exhibits`` reads filing index pages concurrently to add the exhibits
+configured for each form.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Coroutine, Iterator, TypeVar
+
+import requests
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+from . import config
+from .edgar_client import EdgarClient, Filing, _is_retryable
+
+log = logging.getLogger("async_client")
+
+T = TypeVar("T")
+
+_shared_lock = threading.Lock()
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_pid: int | None = None
+
+
+def _fetch_loop() -> asyncio.AbstractEventLoop:
+    """The event loop all requests run on, started in a daemon thread on first use.
+
+    Callers await its results from their own loops, so requests made from
+    separate sync entry points and threads can share one fetch.
+    """
+    global _loop, _loop_pid
+    with _shared_lock:
+        # A forked child inherits the loop but not the thread running it.
+        if _loop is None or _loop_pid != os.getpid():
+            _loop, _loop_pid = asyncio.new_event_loop(), os.getpid()
+            threading.Thread(target=_loop.run_forever, name="edgar-fetch-loop", daemon=True).start()
+        return _loop
+
+
+class AsyncEdgarClient:
+    """Coroutine version of ``EdgarClient`` sharing its session and limiter."""
+
+    def __init__(
+        self,
+        client: EdgarClient | None = None,
+        max_concurrency: int | None = None,
+        **client_kwargs: Any,
+    ) -> None:
+        self.sync = client or EdgarClient(**client_kwargs)
+        self._max_concurrency = max_concurrency or config.SEC_MAX_CONCURRENCY
+        self._executor = ThreadPoolExecutor(self._max_concurrency, thread_name_prefix="edgar-fetch")
+        # Used only on the fetch loop; the semaphore is created there lazily.
+        self._semaphore: asyncio.Semaphore | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._waiters: Counter[str] = Counter()
+
+    @classmethod
+    def of(cls, client: EdgarClient) -> AsyncEdgarClient:
+        """The async client shared by every caller of ``client``.
+
+        Created on first use. Callers that share it, from any thread or event
+        loop, join each other's in-flight requests and one concurrency cap.
+        """
+        with _shared_lock:
+            if client._async_client is None:
+                client._async_client = cls(client)
+            return client._async_client
+
+    # -- low-level ---------------------------------------------------------
+    async def _get(self, url: str) -> requests.Response:
+        """GET ``url`` on the fetch loop, joining an identical request in flight."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._join(url), _fetch_loop()))
+
+    async def _join(self, url: str) -> requests.Response:
+        # Runs on the fetch loop, which owns the in-flight map and semaphore.
+        task = self._inflight.get(url)
+        if task is None:
+            task = self._inflight[url] = asyncio.ensure_future(self._fetch(url))
+
+            def forget(done: asyncio.Future) -> None:
+                if self._inflight.get(url) is done:
+                    del self._inflight[url]
+
+            task.add_done_callback(forget)
+        self._waiters[url] += 1
+        try:
+            # Shielded so one cancelled waiter does not cancel the shared fetch.
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[url] -= 1
+            if not self._waiters[url]:
+                del self._waiters[url]
+                if not task.done():
+                    # Every caller gave up on it; a new request starts afresh.
+                    del self._inflight[url]
+                    task.cancel()
+
+    @retry(
+        retry=retry_if_exception(_is_retryable),
+        stop=stop_after_attempt(4),
+        wait=wait_exponential(multiplier=1, min=1, max=20),
+        reraise=True,
+    )
+    async def _fetch(self, url: str) -> requests.Response:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        async with self._semaphore:
+            # Only throttle on live requests, not cache hits.
+            if not await loop.run_in_executor(self._executor, self.sync._is_cached, url):
+                await self.sync._limiter.acquire()
+            resp = await loop.run_in_executor(
+                self._executor, functools.partial(self.sync._session.get, url, timeout=30)
+            )
+        resp.raise_for_status()
+        self.sync._record(resp)
+        return resp
+
+    async def _get_json(self, url: str) -> dict[str, Any]:
+        return (await self._get(url)).json()
+
+    # -- public API --------------------------------------------------------
+    normalize_cik = staticmethod(EdgarClient.normalize_cik)
+
+    @property
+    def is_bulk(self) -> bool:
+        return self.sync.is_bulk
+
+    async def fetch_ticker_to_cik(self) -> dict[str, str]:
+        """Return an uppercase ticker -> zero-padded CIK map from SEC."""
+        return EdgarClient._ticker_map(await self._get_json(self.sync.TICKER_MAP_URL))
+
+    async def resolve_ciks(self, tickers: list[str]) -> dict[str, str]:
+        """Resolve tickers to CIKs, preferring live SEC data with a fallback."""
+        try:
+            needed = self.sync._needs_ticker_map(tickers)
+            live = await self.fetch_ticker_to_cik() if needed else {}
+        except Exception:
+            live = {}
+        return EdgarClient._merge_ciks(tickers, live)
+
+    async def _submissions(self, cik10: str) -> dict[str, Any]:
+        if self.sync._bulk_submissions is not None:
+            return await asyncio.to_thread(self.sync._submissions, cik10)
+        return await self._get_json(self.sync.SUBMISSIONS_URL.format(cik=cik10))
+
+    async def list_filings(self, cik: str) -> list[Filing]:
+        """Return the recent filing history for a CIK as Filing objects."""
+        return EdgarClient._parse_filings(await self._submissions(self.normalize_cik(cik)))
+
+    async def filings_in_window(
+        self, cik: str, start: datetime, end: datetime, forms: tuple[str, ...]
+    ) -> list[Filing]:
+        """Filings whose filing date falls within [start, end] and match forms.
+
+        Served from the sync client's per-CIK filing index.
+        """
+        return await asyncio.to_thread(self.sync.filings_in_window, cik, start, end, forms)
+
+    def document_url(self, cik: str, filing: Filing) -> str:
+        return self.sync.document_url(cik, filing)
+
+    async def fetch_document(self, cik: str, filing: Filing) -> bytes:
+        """Download the document a filing names: its primary document or an exhibit.
+
+        Reads through the sync client's document store when one is configured.
+        """
+        store = self.sync.doc_store
+        key = (self.normalize_cik(cik), filing.accession, filing.primary_document)
+        if store is not None:
+            stored = await asyncio.to_thread(store.get, *key)
+            if stored is not None:
+                self.sync._record_store_hit(self.document_url(cik, filing), stored)
+                return stored
+        content = (await self._get(self.document_url(cik, filing))).content
+        if store is not None:
+            await asyncio.to_thread(store.put, *key, content)
+        return content
+
+    async def fetch_documents(
+        self, cik: str, filings: list[Filing]
+    ) -> list[bytes | BaseException]:
+        """Download several documents concurrently; failures are returned in place."""
+        return await asyncio.gather(
+            *(self.fetch_document(cik, f) for f in filings), return_exceptions=True
+        )
+
+    async def company_facts(self, cik: str) -> dict[str, Any]:
+        """Return the XBRL companyfacts payload for a CIK."""
+        return json.loads(await self.company_facts_bytes(cik))
+
+    async def company_facts_bytes(self, cik: str) -> bytes:
+        """Return the undecoded companyfacts JSON body for a CIK."""
+        cik10 = self.normalize_cik(cik)
+        if self.sync._bulk_facts is not None:
+            return await asyncio.to_thread(self.sync.company_facts_bytes, cik10)
+        return (await self._get(self.sync.COMPANY_FACTS_URL.format(cik=cik10))).content
+
+    async def frame(self, tag: str, unit: str, frame: str) -> list[dict[str, Any]]:
+        """Return one us-gaap tag for one calendar frame across all filers."""
+        try:
+            return (await self._get_json(self.sync.frame_url(tag, unit, frame))).get("data", [])
+        except requests.HTTPError as exc:
+            if exc.response is not None and exc.response.status_code == 404:
+                return []
+            raise
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` to completion from sync code, even inside a running loop.
+
+    Notebooks already run an event loop, where ``asyncio.run`` refuses to
+    start; there the coroutine runs on a fresh loop in a helper thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def fetch_documents(
+    client: EdgarClient, cik: str, filings: list[Filing]
+) -> list[bytes | BaseException]:
+    """Download ``filings`` concurrently through ``client``'s session and limiter."""
+    return run_sync(AsyncEdgarClient.of(client).fetch_documents(cik, filings))
+
+
+def with_exhibits(
+    client: EdgarClient,
+    cik: str,
+    filings: list[Filing],
+    exhibits: dict[str, tuple[str, ...]] | None = None,
+) -> list[Filing]:
+    """``filings``, each followed by the exhibits configured for its form.
+
+    ``exhibits`` maps a form to the exhibit types to fetch with it and
+    defaults to ``config.FORM_EXHIBITS``. Index pages are downloaded
+    concurrently, for filings whose form lists exhibit types. A filing whose
+    index page cannot be read keeps only its primary document.
+    """
+    exhibits = config.FORM_EXHIBITS if exhibits is None else exhibits
+
+    def types(filing: Filing) -> tuple[str, ...]:
+        return exhibits.get(filing.form.split("/")[0], ())
+
+    wanted = [f for f in filings if types(f)]
+    if not wanted:
+        return list(filings)
+    pages = fetch_documents(client, cik, [EdgarClient.index_page(f) for f in wanted])
+    found: dict[str, list[Filing]] = {}
+    for filing, page in zip(wanted, pages):
+        if isinstance(page, BaseException):
+            log.warning("No index page for %s %s: %s", filing.form, filing.accession, page)
+            continue
+        found[filing.accession] = EdgarClient.exhibits(filing, page, types(filing))
+    return [d for f in filings for d in (f, *found.get(f.accession, ()))]
+
+
+def iter_documents(
+    client: EdgarClient, cik: str, filings: list[Filing], buffer: int = 0
+) -> Iterator[tuple[int, bytes | BaseException]]:
+    """Yield ``(position, content)`` for ``filings`` in completion order.
+
+    Downloads run concurrently on an event loop in a helper thread; a failed
+    download yields its exception in place of the content. With ``buffer``,
+    at most that many downloaded documents wait for the consumer, and further
+    downloads hold off until it catches up (0 = no limit). Closing the
+    iterator early cancels the downloads not yet started.
+    """
+    if not filings:
+        return
+    done: queue.Queue[tuple[int, bytes | BaseException]] = queue.Queue()
+    started = threading.Event()
+    loop: asyncio.AbstractEventLoop | None = None
+    task: asyncio.Task | None = None
+    slots: asyncio.Semaphore | None = None
+
+    async def download() -> None:
+        nonlocal loop, task, slots
+        loop, task = asyncio.get_running_loop(), asyncio.current_task()
+        slots = asyncio.Semaphore(buffer) if buffer > 0 else None
+        started.set()
+        aclient = AsyncEdgarClient.of(client)
+
+        async def one(i: int, filing: Filing) -> None:
+            if slots is not None:
+                await slots.acquire()
+            try:
+                done.put((i, await aclient.fetch_document(cik, filing)))
+            except Exception as exc:  # noqa: BLE001 - handed to the consumer
+                done.put((i, exc))
+
+        try:
+            await asyncio.gather(*(one(i, f) for i, f in enumerate(filings)))
+        except asyncio.CancelledError:
+            pass
+
+    def call(callback: Callable[[], Any]) -> None:
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:  # the loop already finished its downloads
+            pass
+
+    worker = threading.Thread(target=asyncio.run, args=(download(),), daemon=True)
+    worker.start()
+    started.wait()
+    received = 0
+    try:
+        for _ in filings:
+            item = done.get()
+            received += 1
+            if slots is not None:
+                call(slots.release)
+            yield item
+    finally:
+        if received < len(filings):
+            call(task.cancel)
+        worker.join()
@@ -1,71 +1,154 @@
-"""Split cleaned filing text into overlapping chunks for embedding."""
+"""Split cleaned filing text into overlapping, token-sized chunks for embedding.
+
+Chunks are ``(start, end, tokens)`` spans into the parsed document, not
+copied strings. The text of a chunk is ``text[start:end]``, and ``tokens``
+is its size in the chat model's tokens. Callers slice the text only when
+they build a chunk, and the token count travels in chunk metadata, so
+context assembly never re-tokenizes.
+"""
 
 from __future__ import annotations
 
 import re
+from functools import lru_cache
+from typing import Callable
+
+from . import config
 
 # Prefer to break on paragraph boundaries, then sentences, then hard length.
 _PARAGRAPH_RE = re.compile(r"\n\s*\n")
 _SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
 
+Span = tuple[int, int, int]
+
+
+@lru_cache(maxsize=1)
+def token_counter() -> Callable[[str], int]:
+    """Return a token-counting function, using ``tiktoken`` when available."""
+    try:
+        import tiktoken
+
+        try:
+            enc = tiktoken.encoding_for_model(config.OPENAI_CHAT_MODEL)
+        except Exception:
+            enc = tiktoken.get_encoding("o200k_base")
+        return lambda s: len(enc.encode(s, disallowed_special=()))
+    except Exception:
+        # Rough fallback: ~4 characters per token.
+        return lambda s: max(1, len(s) // 4)
+
+
+def strip_span(text: str, start: int, end: int) -> tuple[int, int]:
+    """Narrow ``[start, end)`` past surrounding whitespace without copying."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
 
-def _split_units(text: str) -> list[str]:
-    units: list[str] = []
-    for para in _PARAGRAPH_RE.split(text):
-        para = para.strip()
-        if not para:
-            continue
-        if len(para) <= 2000:
-            units.append(para)
-        else:
-            units.extend(s.strip() for s in _SENTENCE_RE.split(para) if s.strip())
-    return units
 
+def _pieces(text: str, pattern: re.Pattern[str], start: int, end: int) -> list[tuple[int, int]]:
+    """Non-blank spans of ``text[start:end]`` between ``pattern`` matches."""
+    spans = []
+    for match in pattern.finditer(text, start, end):
+        spans.append(strip_span(text, start, match.start()))
+        start = match.end()
+    spans.append(strip_span(text, start, end))
+    return [(s, e) for s, e in spans if s < e]
 
-def _hard_wrap(unit: str, chunk_size: int, overlap: int) -> list[str]:
-    """Slice an oversized unit into fixed windows no larger than ``chunk_size``.
+
+def _hard_wrap(
+    text: str,
+    start: int,
+    end: int,
+    tokens: int,
+    max_tokens: int,
+    overlap: int,
+    count: Callable[[str], int],
+) -> list[Span]:
+    """Cut an oversized unit into windows of at most ``max_tokens`` tokens.
 
     Some filing text (tables, exhibits) has no paragraph or sentence breaks, so a
-    single unit can exceed the embedding model's input limit. Windows carry
-    ``overlap`` characters of context between them.
+    single unit can exceed the embedding model's input limit. Windows are sized
+    in characters from the unit's own characters-per-token ratio, then counted
+    with the tokenizer and narrowed until they fit. Each window repeats about
+    ``overlap`` tokens of the one before it.
     """
-    step = max(1, chunk_size - overlap)
-    pieces: list[str] = []
-    for start in range(0, len(unit), step):
-        pieces.append(unit[start : start + chunk_size])
-        if start + chunk_size >= len(unit):
+    per_token = (end - start) / tokens
+    width = max(1, int(max_tokens * per_token))
+    back = int(overlap * per_token)
+    spans: list[Span] = []
+    s = start
+    while True:
+        e = min(s + width, end)
+        n = count(text[s:e])
+        while n > max_tokens and e - s > 1:
+            e = s + max(1, (e - s) * max_tokens // n)
+            n = count(text[s:e])
+        spans.append((s, e, n))
+        if e >= end:
             break
-    return pieces
+        s = max(s + 1, e - back)
+    return spans
+
+
+def _units(text: str, start: int, end: int, max_tokens: int, overlap: int) -> list[Span]:
+    count = token_counter()
+    units: list[Span] = []
+    for ps, pe in _pieces(text, _PARAGRAPH_RE, start, end):
+        tokens = count(text[ps:pe])
+        if tokens <= max_tokens:
+            units.append((ps, pe, tokens))
+            continue
+        for ss, se in _pieces(text, _SENTENCE_RE, ps, pe):
+            tokens = count(text[ss:se])
+            if tokens <= max_tokens:
+                units.append((ss, se, tokens))
+            else:
+                units.extend(_hard_wrap(text, ss, se, tokens, max_tokens, overlap, count))
+    return units
 
 
-def chunk_text(text: str, chunk_size: int = 1200, overlap: int = 150) -> list[str]:
-    """Chunk text to roughly ``chunk_size`` characters with ``overlap`` carryover.
+def chunk_spans(
+    text: str,
+    start: int = 0,
+    end: int | None = None,
+    max_tokens: int = 300,
+    overlap_tokens: int = 40,
+) -> list[Span]:
+    """Chunk ``text[start:end]`` into spans of at most ``max_tokens`` tokens.
 
-    Chunks respect paragraph and sentence boundaries where possible, keeping each
-    chunk to a size that is comfortable for embeddings and LLM context.
+    Chunks respect paragraph and sentence boundaries where possible, and each
+    chunk repeats up to ``overlap_tokens`` tokens of trailing whole units from
+    the chunk before it. A chunk's token count is the sum of its units'
+    counts.
     """
-    if not text:
-        return []
-    units = _split_units(text)
-    chunks: list[str] = []
-    current = ""
+    end = len(text) if end is None else end
+    units = _units(text, start, end, max_tokens, overlap_tokens)
+    chunks: list[Span] = []
+    current: list[Span] = []
+    total = 0
     for unit in units:
-        # A unit larger than the target is hard-split so no single chunk can
-        # exceed the embedding model's input limit.
-        if len(unit) > chunk_size:
-            if current:
-                chunks.append(current)
-                current = ""
-            chunks.extend(_hard_wrap(unit, chunk_size, overlap))
-            continue
-        if not current:
-            current = unit
-        elif len(current) + 1 + len(unit) <= chunk_size:
-            current = f"{current}\n{unit}"
-        else:
-            chunks.append(current)
-            tail = current[-overlap:] if overlap else ""
-            current = f"{tail}\n{unit}".strip() if tail else unit
+        if current and total + unit[2] > max_tokens:
+            chunks.append((current[0][0], current[-1][1], total))
+            # Carry whole trailing units as overlap, if they leave room for this one.
+            carried: list[Span] = []
+            kept = 0
+            for prev in reversed(current):
+                if kept + prev[2] > overlap_tokens:
+                    break
+                carried.insert(0, prev)
+                kept += prev[2]
+            if carried and (len(carried) == len(current) or kept + unit[2] > max_tokens):
+                carried, kept = [], 0
+            current, total = carried, kept
+        current.append(unit)
+        total += unit[2]
     if current:
-        chunks.append(current)
+        chunks.append((current[0][0], current[-1][1], total))
     return chunks
+
+
+def chunk_text(text: str, max_tokens: int = 300, overlap_tokens: int = 40) -> list[str]:
+    """Chunk text into strings; ``chunk_spans`` without the offsets."""
+    return [text[s:e] for s, e, _ in chunk_spans(text, 0, None, max_tokens, overlap_tokens)]
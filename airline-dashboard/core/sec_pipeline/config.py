@@ -7,6 +7,7 @@ this module should contain credentials.
 from __future__ import annotations
 
 import calendar
+import multiprocessing
 import os
 from dataclasses import dataclass
 from datetime import datetime
@@ -27,6 +28,14 @@ def _env_flag(name: str, default: bool) -> bool:
         return default
     return raw.strip().lower() in {"1", "true", "yes", "on"}
 
+
+def _env_list(name: str, default: Iterable[str]) -> tuple[str, ...]:
+    """Return a comma-separated environment list; an empty value means none."""
+    raw = os.getenv(name)
+    if raw is None:
+        return tuple(default)
+    return tuple(v.strip() for v in raw.split(",") if v.strip())
+
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
@@ -56,13 +65,103 @@ LOCAL_EMBEDDING_MODEL = os.getenv(
     "LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
 )
 XBRL_ENABLE_FP_FALLBACK = _env_flag("XBRL_ENABLE_FP_FALLBACK", True)
+# "columnar" (vectorized FactTable) or "scalar" (per-lookup list scans).
+XBRL_ENGINE = os.getenv("XBRL_ENGINE", "columnar").lower()
+# "soup" (BeautifulSoup tree) or "stream" (lxml parser events, no tree).
+HTML_PARSER = os.getenv("HTML_PARSER", "soup").lower()
 DIAGNOSTICS_EXCLUDE_FUTURE_PERIODS = _env_flag(
     "DIAGNOSTICS_EXCLUDE_FUTURE_PERIODS",
     True,
 )
 
+# Alternative root for both SEC hosts, e.g. a local stand-in or replay server.
+SEC_BASE_URL = os.getenv("SEC_BASE_URL", "")
+
+# Directory holding SEC bulk archives (companyfacts.zip, submissions.zip). When
+# set, facts and submissions are read from the archives instead of the API.
+SEC_BULK_DIR = os.getenv("SEC_BULK_DIR", "")
+
+# Content-addressed store of raw filing documents (see doc_store.py). When
+# enabled, archive documents are read through it instead of the HTTP cache.
+DOC_STORE_ENABLED = _env_flag("DOC_STORE_ENABLED", True)
+DOC_STORE_DIR = Path(os.getenv("DOC_STORE_DIR", str(RAW_DIR / "filings")))
+
+# Cache of parsed filing text keyed by accession and parser version (see
+# text_cache.py); build_period_chunks reads it before downloading documents.
+TEXT_CACHE_ENABLED = _env_flag("TEXT_CACHE_ENABLED", True)
+
+# Processes that parse and chunk filing documents (0 = one per CPU, 1 = parse
+# in-process).
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+
+# Filing documents downloaded or parsing but not yet chunked and handed to the
+# embedder (0 = twice the CPU count). Bounds memory however many filings a
+# period holds: downloads wait while this many documents are in the pipeline.
+STREAM_BUFFER = int(os.getenv("STREAM_BUFFER", "0"))
+
+# Embedding vectors cached by model and text (see embed_cache.py), capped at
+# EMBED_CACHE_MAX_MB per model; the least recently read are evicted first.
+EMBED_CACHE_ENABLED = _env_flag("EMBED_CACHE_ENABLED", True)
+EMBED_CACHE_DIR = Path(os.getenv("EMBED_CACHE_DIR", str(CACHE_DIR / "embeddings")))
+EMBED_CACHE_MAX_MB = int(os.getenv("EMBED_CACHE_MAX_MB", "1024"))
+
+# 10-K/10-Q Items embedded (see sections.py for the names). A non-empty
+# SECTION_ALLOW keeps only the Items it lists; SECTION_DENY drops Items. The
+# default denies boilerplate the retrieval queries never target. 8-Ks and
+# filings whose Items cannot be found are embedded whole.
+SECTIONS_ENABLED = _env_flag("SECTIONS_ENABLED", True)
+SECTION_ALLOW = _env_list("SECTION_ALLOW", ())
+SECTION_DENY = _env_list(
+    "SECTION_DENY",
+    (
+        "cover", "risk_factors", "unresolved_staff_comments", "cybersecurity",
+        "mine_safety", "reserved", "accountant_changes", "controls",
+        "foreign_inspections", "accountant_fees", "exhibits", "form_summary",
+        "defaults",
+    ),
+)
+
+# Exhibit types fetched with each form's primary document, found through the
+# filing's index page. An 8-K's primary document is often a cover page; the
+# results are in its EX-99.1 press release.
+FORM_EXHIBITS: dict[str, tuple[str, ...]] = {
+    "8-K": _env_list("EXHIBITS_8K", ("EX-99.1",)),
+    "10-Q": _env_list("EXHIBITS_10Q", ()),
+    "10-K": _env_list("EXHIBITS_10K", ()),
+}
+
+# When a period's earnings release (an 8-K Item 2.02 exhibit filed after the
+# period closed) is among its documents, retrieval for the period skips the
+# financial statements Item of the 10-K/10-Q filed after it closed: the release
+# carries the same results.
+PREFER_EARNINGS_RELEASE = _env_flag("PREFER_EARNINGS_RELEASE", True)
+
+# Largest SimHash distance (of 64 bits) at which two chunks of a period count
+# as near-duplicates and only the first is embedded (see dedup.py); -1 turns the
+# filter off. One changed word in a full chunk moves ~5 bits; unrelated chunks
+# sit near 32.
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "6"))
+
+# Pages a PDF filing is read to (0 = all) and the processes that extract them
+# (0 = one per CPU, 1 = in-process). Only PDFs of PDF_PARALLEL_MIN_PAGES or
+# more are split across processes, and never inside a parse worker.
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "0"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+
+# Start method for worker process pools. Not "fork": pools can start while
+# other threads hold locks (``scripts.refresh`` runs two stages at once).
+MP_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
 # SEC rate limit: no more than 10 requests per second.
 SEC_MAX_REQUESTS_PER_SECOND = 8.0
+# Token-bucket depth: requests that may go out back to back after an idle spell.
+# Rate plus burst stays within the 10 req/s allowance over any one-second window.
+SEC_RATE_BURST = int(os.getenv("SEC_RATE_BURST", "2"))
+# Requests the async client keeps in flight at once.
+SEC_MAX_CONCURRENCY = int(os.getenv("SEC_MAX_CONCURRENCY", "8"))
 
 # ---------------------------------------------------------------------------
 # Airlines
@@ -140,15 +239,18 @@ class PeriodSpec:
         (up to ~2 months for annual, ~1 month for quarterly).
         """
         if self.period == "FY":
-            start_month, end_month = 1, 12
+            start_month = 1
             pad = relativedelta(months=2)
         else:
-            end_month = int(self.period[-1]) * 3
-            start_month = end_month - 2
+            start_month = int(self.period[-1]) * 3 - 2
             pad = relativedelta(months=1, days=1)
-        start = datetime(self.year, start_month, 1)
-        end = datetime(self.year, end_month, calendar.monthrange(self.year, end_month)[1]) + pad
-        return start, end
+        return datetime(self.year, start_month, 1), self.period_end + pad
+
+    @property
+    def period_end(self) -> datetime:
+        """Last day of the period itself, before any filing-lag padding."""
+        end_month = 12 if self.period == "FY" else int(self.period[-1]) * 3
+        return datetime(self.year, end_month, calendar.monthrange(self.year, end_month)[1])
 
 
 def build_periods(years: Iterable[int], periods: Iterable[str]) -> list[PeriodSpec]:
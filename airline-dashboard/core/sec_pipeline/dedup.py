@@ -0,0 +1,141 @@
+"""Near-duplicate chunk filter applied before embedding.
+
+A period's filings repeat much of each other's text. The 10-Q, the earnings
+release and the next 10-K share forward-looking statement boilerplate,
+segment tables and the same quarter's numbers. Exact duplicates are already
+collapsed after retrieval (``embed._dedup_key``), but near-identical chunks
+(a changed date, one reworded sentence) are still each embedded and stored.
+
+Each chunk gets a 64-bit SimHash over its word 3-shingles. Two chunks whose
+fingerprints differ in at most ``config.DEDUP_MAX_DISTANCE`` bits are treated
+as the same passage. Candidates are found by splitting fingerprints into
+``distance + 1`` bands: by pigeonhole, a pair within the distance matches
+exactly on at least one band. The first chunk of a group is kept, in filing
+order. It records the other filings that carried the passage in an ``also_in``
+metadata field, so their provenance is not lost.
+
+Only chunks with the same ``filing_ts`` are compared. Retrieval filters on
+filing date, so two chunks filed the same day are visible in exactly the same
+periods, and dropping either loses nothing. A chunk dropped in favor of one
+filed on another day would be missing from any window that holds its own
+filing but not the kept one.
+
+``Deduplicator`` filters a chunk stream as it passes, so chunks can be
+embedded while later filings are still parsing. A kept chunk that gains an
+``also_in`` entry after it was embedded is listed in ``merged`` so the store
+can update its metadata.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+from . import config
+from .embed import Chunk
+
+log = logging.getLogger("dedup")
+
+_BITS = 64
+_SHINGLE = 3
+_SHIFTS = np.arange(_BITS, dtype=np.uint64)
+
+
+def _features(text: str) -> list[str]:
+    words = text.lower().split()
+    if len(words) <= _SHINGLE:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i : i + _SHINGLE]) for i in range(len(words) - _SHINGLE + 1)]
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of ``text`` over lowercased word 3-shingles."""
+    features = _features(text)
+    if not features:
+        return 0
+    hashes = np.array(
+        [
+            int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+            for f in features
+        ],
+        dtype=np.uint64,
+    )
+    ones = ((hashes[:, None] >> _SHIFTS) & np.uint64(1)).sum(axis=0)
+    bits = ones * 2 > len(hashes)
+    return int(sum(1 << i for i in np.flatnonzero(bits)))
+
+
+def _bands(fingerprint: int, count: int) -> list[tuple[int, int]]:
+    width = -(-_BITS // count)
+    mask = (1 << width) - 1
+    return [(band, (fingerprint >> (band * width)) & mask) for band in range(count)]
+
+
+class Deduplicator:
+    """Streaming near-duplicate filter; one instance per period.
+
+    ``max_distance`` (default ``config.DEDUP_MAX_DISTANCE``) is the largest
+    Hamming distance between fingerprints that counts as a duplicate; a
+    negative value disables the filter. A chunk is only compared with earlier
+    chunks of the same ``filing_ts``. After ``filter`` is exhausted,
+    ``dropped`` counts the chunks it dropped and ``merged`` maps the position
+    of each kept chunk whose ``also_in`` changed to its metadata.
+    """
+
+    def __init__(self, max_distance: int | None = None) -> None:
+        self.max_distance = config.DEDUP_MAX_DISTANCE if max_distance is None else max_distance
+        self.dropped = 0
+        self.merged: dict[int, dict] = {}
+        self._buckets: dict[tuple[Any, int, int], list[int]] = defaultdict(list)
+        self._prints: list[int] = []
+        self._metadata: list[dict] = []
+
+    def filter(self, chunks: Iterable[Chunk]) -> Iterator[Chunk]:
+        """Yield the chunks of ``chunks`` that do not near-duplicate an earlier one."""
+        if self.max_distance < 0:
+            yield from chunks
+            return
+        for chunk in chunks:
+            fingerprint = simhash(chunk.text)
+            scope = chunk.metadata.get("filing_ts")
+            bands = [(scope, *band) for band in _bands(fingerprint, self.max_distance + 1)]
+            match = next(
+                (
+                    k
+                    for band in bands
+                    for k in self._buckets.get(band, ())
+                    if (self._prints[k] ^ fingerprint).bit_count() <= self.max_distance
+                ),
+                None,
+            )
+            if match is None:
+                for band in bands:
+                    self._buckets[band].append(len(self._prints))
+                self._prints.append(fingerprint)
+                self._metadata.append(chunk.metadata)
+                yield chunk
+                continue
+            self.dropped += 1
+            original = self._metadata[match]
+            accession = chunk.metadata.get("accession")
+            if accession and accession != original.get("accession"):
+                also = [a for a in str(original.get("also_in", "")).split(",") if a]
+                if accession not in also:
+                    original["also_in"] = ",".join([*also, str(accession)])
+                    self.merged[match] = original
+
+
+def dedup_chunks(
+    chunks: list[Chunk], max_distance: int | None = None
+) -> tuple[list[Chunk], int]:
+    """Drop chunks that near-duplicate an earlier one; return the rest and the drop count.
+
+    The list form of ``Deduplicator``; order is preserved.
+    """
+    dedup = Deduplicator(max_distance)
+    kept = list(dedup.filter(chunks))
+    return kept, dedup.dropped
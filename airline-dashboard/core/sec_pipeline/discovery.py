@@ -0,0 +1,216 @@
+"""Discover new filings by tracked airlines from EDGAR form indexes.
+
+The scheduled refresh rebuilds a guessed period whether or not anything was
+filed. Discovery reads the list of what *was* filed and derives only the
+(airline, period) keys those filings affect:
+
+* ``DailyIndexSource`` walks the EDGAR daily ``master.YYYYMMDD.idx`` files from
+  a persisted cursor up to today. SEC publishes each day's index the evening of
+  that day.
+* ``LocalIndexSource`` reads index files dropped into a directory, in the same
+  pipe-delimited format. It serves as a stand-in feed for fixtures, or for
+  files mirrored from the quarterly ``full-index``.
+
+Both sources report each accession once, using state kept in
+``DISCOVERY_STATE_PATH``. ``affected_keys`` maps a filing to the financial
+periods whose XBRL it may change (10-Q/10-K and amendments). It also maps the
+filing to the insight periods whose filing window contains it, the same
+windows ``pipeline.build_period_chunks`` selects by.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterable
+
+from . import config
+from .edgar_client import EdgarClient
+
+log = logging.getLogger("discovery")
+
+DISCOVERY_STATE_PATH = config.CACHE_DIR / "discovery_state.json"
+
+# A day whose index is still missing this long afterwards had no filings
+# (weekends, holidays) rather than an index that is not yet published.
+_INDEX_GRACE = timedelta(days=3)
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """One filing line from an EDGAR master index."""
+
+    cik: str
+    company: str
+    form: str
+    filing_date: datetime
+    accession: str
+
+
+def parse_master_index(text: str) -> list[IndexEntry]:
+    """Parse a pipe-delimited ``master`` index (daily or quarterly)."""
+    entries: list[IndexEntry] = []
+    for line in text.splitlines():
+        parts = line.split("|")
+        if len(parts) != 5 or not parts[0].strip().isdigit():
+            continue
+        cik, company, form, filed, filename = (p.strip() for p in parts)
+        try:
+            fmt = "%Y%m%d" if "-" not in filed else "%Y-%m-%d"
+            filing_date = datetime.strptime(filed, fmt)
+        except ValueError:
+            continue
+        accession = Path(filename).name.removesuffix(".txt")
+        entries.append(
+            IndexEntry(EdgarClient.normalize_cik(cik), company, form, filing_date, accession)
+        )
+    return entries
+
+
+def affected_keys(
+    form: str, filing_date: datetime
+) -> tuple[list[config.PeriodSpec], list[config.PeriodSpec]]:
+    """``(financial, insight)`` periods a filing of ``form`` on ``filing_date`` affects.
+
+    A 10-Q reports the latest March/June/September quarter ended before it was
+    filed. A 10-K reports the latest calendar year, which also feeds the
+    derived Q4. Insight periods are every period whose filing window contains
+    the date.
+    """
+    financial: list[config.PeriodSpec] = []
+    base = form.removesuffix("/A")
+    if base == "10-Q":
+        for year in (filing_date.year, filing_date.year - 1):
+            ended = [m for m in (9, 6, 3) if datetime(year, m + 1, 1) <= filing_date]
+            if ended:
+                financial.append(config.PeriodSpec(year, f"Q{ended[0] // 3}"))
+                break
+    elif base == "10-K":
+        year = filing_date.year - 1
+        financial += [config.PeriodSpec(year, "Q4"), config.PeriodSpec(year, "FY")]
+    insight: list[config.PeriodSpec] = []
+    if form in config.RELEVANT_FORMS:
+        for year in (filing_date.year - 1, filing_date.year):
+            for period in config.QUARTERS:
+                spec = config.PeriodSpec(year, period)
+                start, end = spec.date_window()
+                if start <= filing_date <= end:
+                    insight.append(spec)
+    return financial, insight
+
+
+class _State:
+    """Persisted cursor and reported accessions shared by the sources."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or DISCOVERY_STATE_PATH
+        data = json.loads(self.path.read_text(encoding="utf-8")) if self.path.exists() else {}
+        self.cursor: str | None = data.get("cursor")
+        # accession -> index day (or file name) it was reported from.
+        self.seen: dict[str, str] = data.get("seen", {})
+        self.files: set[str] = set(data.get("files", []))
+
+    def save(self) -> None:
+        payload = {"cursor": self.cursor, "seen": self.seen, "files": sorted(self.files)}
+        self.path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+
+
+class DailyIndexSource:
+    """New entries from the EDGAR daily master indexes since the last poll.
+
+    The cursor is the first day whose index may still change: today, or an
+    earlier day that is missing but still within ``_INDEX_GRACE``. Each poll
+    re-reads the days from the cursor to today. Accessions already reported
+    from those days are skipped.
+    """
+
+    def __init__(
+        self,
+        client: EdgarClient,
+        start: date | None = None,
+        state_path: Path | None = None,
+    ) -> None:
+        self.client = client
+        self.state = _State(state_path)
+        if self.state.cursor is None:
+            self.state.cursor = (start or date.today()).isoformat()
+
+    def poll(self, today: date | None = None) -> list[IndexEntry]:
+        today = today or date.today()
+        day = date.fromisoformat(self.state.cursor)
+        cursor: date | None = None
+        entries: list[IndexEntry] = []
+        while day <= today:
+            text = self.client.daily_index(day)
+            final = day < today if text is not None else today - day >= _INDEX_GRACE
+            if not final and cursor is None:
+                cursor = day
+            for entry in parse_master_index(text or ""):
+                if entry.accession not in self.state.seen:
+                    self.state.seen[entry.accession] = day.isoformat()
+                    entries.append(entry)
+            day += timedelta(days=1)
+        self.state.cursor = (cursor or today).isoformat()
+        self.state.seen = {
+            acc: seen_on for acc, seen_on in self.state.seen.items()
+            if seen_on >= self.state.cursor
+        }
+        self.state.save()
+        return entries
+
+
+class LocalIndexSource:
+    """New entries from index files placed in a directory (fixtures, mirrors)."""
+
+    def __init__(self, directory: Path, state_path: Path | None = None) -> None:
+        self.directory = Path(directory)
+        self.state = _State(state_path or DISCOVERY_STATE_PATH.with_name("discovery_local_state.json"))
+
+    def poll(self, today: date | None = None) -> list[IndexEntry]:
+        entries: list[IndexEntry] = []
+        for path in sorted(self.directory.glob("*.idx")):
+            if path.name in self.state.files:
+                continue
+            self.state.files.add(path.name)
+            for entry in parse_master_index(path.read_text(encoding="latin-1")):
+                if entry.accession not in self.state.seen:
+                    self.state.seen[entry.accession] = path.name
+                    entries.append(entry)
+        self.state.save()
+        return entries
+
+
+@dataclass
+class RefreshPlan:
+    """(airline, period) keys to rebuild, grouped for batch calls."""
+
+    financials: dict[config.PeriodSpec, set[str]]
+    insights: dict[config.PeriodSpec, set[str]]
+
+    def __bool__(self) -> bool:
+        return bool(self.financials or self.insights)
+
+    def update(self, other: RefreshPlan) -> None:
+        for mine, theirs in ((self.financials, other.financials), (self.insights, other.insights)):
+            for spec, airlines in theirs.items():
+                mine.setdefault(spec, set()).update(airlines)
+
+
+def plan_refresh(entries: Iterable[IndexEntry], tracked: dict[str, str]) -> RefreshPlan:
+    """Keys affected by ``entries`` from tracked CIKs (``{cik10: airline}``)."""
+    plan = RefreshPlan({}, {})
+    for entry in entries:
+        airline = tracked.get(entry.cik)
+        if airline is None:
+            continue
+        financial, insight = affected_keys(entry.form, entry.filing_date)
+        if financial or insight:
+            log.info("%s filed %s %s on %s", airline, entry.form, entry.accession, entry.filing_date.date())
+        for spec in financial:
+            plan.financials.setdefault(spec, set()).add(airline)
+        for spec in insight:
+            plan.insights.setdefault(spec, set()).add(airline)
+    return plan
@@ -0,0 +1,291 @@
+"""Content-addressed, compressed store of raw filing documents.
+
+Filing bytes otherwise live only inside the requests-cache SQLite file,
+uncompressed and mixed in with HTTP metadata. The store keeps each document
+once, compressed, under ``objects/<aa>/<digest>``. A small SQLite index maps
+``(CIK, accession, document)`` to the content digest. Identical bodies filed
+under several accessions (exhibits re-filed with amendments) share one object.
+
+Objects are zstd-compressed when ``zstandard`` is installed, otherwise zlib.
+The codec is recorded in the file suffix. A zstd object read without
+``zstandard`` is a miss: the document is refetched and stored again with
+zlib. Reads memory-map the object and decompress straight from the mapping.
+Writes go to a temporary file and are renamed into place. Concurrent pipeline
+runs and parallel shards can therefore share one store: the same document
+always lands on the same path, and the index is a WAL-mode database.
+Sweeping unreferenced objects skips any modified in the last hour, since
+another run may have written it and not yet indexed it.
+
+``python -m sec_pipeline.doc_store stats`` reports counts and sizes.
+``python -m sec_pipeline.doc_store evict`` trims the least recently read
+documents by age and/or total size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable
+
+from . import config
+
+log = logging.getLogger("doc_store")
+
+# Unreferenced objects this recent are kept by the sweep: a ``put`` in another
+# process may have written or touched one and not yet added its ref.
+_SWEEP_GRACE_SECONDS = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS refs (
+    cik         TEXT    NOT NULL,
+    accession   TEXT    NOT NULL,
+    document    TEXT    NOT NULL,
+    digest      TEXT    NOT NULL,
+    raw_size    INTEGER NOT NULL,
+    stored      REAL    NOT NULL,
+    last_access REAL    NOT NULL,
+    PRIMARY KEY (cik, accession, document)
+);
+CREATE INDEX IF NOT EXISTS refs_digest ON refs (digest);
+CREATE INDEX IF NOT EXISTS refs_last_access ON refs (last_access);
+"""
+
+
+def _codec() -> tuple[str, Callable[[bytes], bytes]]:
+    """Return ``(suffix, compress)``, using ``zstandard`` when available."""
+    try:
+        import zstandard
+
+        compressor = zstandard.ZstdCompressor(level=10)
+        return ".zst", compressor.compress
+    except Exception:
+        return ".z", lambda data: zlib.compress(data, 6)
+
+
+def _decompress(suffix: str, buf: Any) -> bytes:
+    if suffix == ".zst":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(buf)
+    return zlib.decompress(buf)
+
+
+def parse_size(text: str) -> int:
+    """``"500MB"`` -> bytes; a bare number is taken as bytes."""
+    text = text.strip().upper()
+    for unit, scale in (("GB", 1 << 30), ("MB", 1 << 20), ("KB", 1 << 10), ("B", 1)):
+        if text.endswith(unit):
+            return int(float(text[: -len(unit)]) * scale)
+    return int(text)
+
+
+class DocStore:
+    """Filing documents keyed by CIK and accession, stored once per content."""
+
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = Path(root or config.DOC_STORE_DIR)
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        self._suffix, self._compress = _codec()
+        # zstd objects are only readable with ``zstandard`` installed.
+        self._suffixes = (".zst", ".z") if self._suffix == ".zst" else (".z",)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.root / "index.sqlite3", timeout=30, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _object_path(self, digest: str, suffix: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}{suffix}"
+
+    def _find_object(self, digest: str) -> Path | None:
+        for suffix in self._suffixes:
+            path = self._object_path(digest, suffix)
+            if path.exists():
+                return path
+        return None
+
+    # -- read / write --------------------------------------------------------
+    def get(self, cik: str, accession: str, document: str) -> bytes | None:
+        """Stored bytes of one document, or None when absent."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM refs WHERE cik=? AND accession=? AND document=?",
+                (cik, accession, document),
+            ).fetchone()
+        if row is None:
+            return None
+        path = self._find_object(row[0])
+        if path is None:
+            if self._object_path(row[0], ".zst").exists():
+                log.warning(
+                    "%s %s is stored zstd-compressed but zstandard is not installed; refetching",
+                    accession, document,
+                )
+            return None
+        with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = _decompress(path.suffix, mm)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE refs SET last_access=? WHERE cik=? AND accession=? AND document=?",
+                (time.time(), cik, accession, document),
+            )
+        return data
+
+    def put(self, cik: str, accession: str, document: str, data: bytes) -> str:
+        """Store ``data`` for one document and return its content digest."""
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        if not self._touch_object(digest):
+            self._write_object(digest, data)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO refs VALUES (?,?,?,?,?,?,?)",
+                (cik, accession, document, digest, len(data), now, now),
+            )
+            # An eviction may have deleted the object before the ref landed.
+            if self._find_object(digest) is None:
+                self._write_object(digest, data)
+        return digest
+
+    def _touch_object(self, digest: str) -> bool:
+        """Mark an existing object as fresh so a sweep keeps it; False if absent."""
+        path = self._find_object(digest)
+        try:
+            if path is not None:
+                os.utime(path)
+                return True
+        except FileNotFoundError:
+            pass
+        return False
+
+    def _write_object(self, digest: str, data: bytes) -> None:
+        path = self._object_path(digest, self._suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(self._compress(data))
+        os.replace(tmp, path)
+
+    def keys(self) -> list[tuple[str, str, str]]:
+        """Every stored ``(cik, accession, document)``, most recently read first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT cik, accession, document FROM refs ORDER BY last_access DESC"
+            ).fetchall()
+
+    # -- maintenance -----------------------------------------------------------
+    def stats(self) -> dict[str, int]:
+        """Document and object counts with raw and on-disk byte totals."""
+        with self._lock:
+            documents, raw = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0) FROM refs"
+            ).fetchone()
+        objects = list((self.root / "objects").glob("*/*.z*"))
+        return {
+            "documents": documents,
+            "objects": len(objects),
+            "raw_bytes": raw,
+            "stored_bytes": sum(p.stat().st_size for p in objects),
+        }
+
+    def evict(self, max_bytes: int | None = None, older_than_days: float | None = None) -> int:
+        """Drop least recently read documents; return how many were removed.
+
+        Documents unread for ``older_than_days`` go first. Then the oldest are
+        dropped until objects fit in ``max_bytes``. Objects no longer
+        referenced are deleted.
+        """
+        removed = 0
+        with self._lock, self._conn:
+            if older_than_days is not None:
+                cutoff = time.time() - older_than_days * 86400
+                removed += self._conn.execute(
+                    "DELETE FROM refs WHERE last_access < ?", (cutoff,)
+                ).rowcount
+        self._sweep()
+        if max_bytes is not None:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT cik, accession, document, digest FROM refs ORDER BY last_access"
+                ).fetchall()
+            total = self.stats()["stored_bytes"]
+            for cik, accession, document, digest in rows:
+                if total <= max_bytes:
+                    break
+                with self._lock, self._conn:
+                    self._conn.execute(
+                        "DELETE FROM refs WHERE cik=? AND accession=? AND document=?",
+                        (cik, accession, document),
+                    )
+                    shared = self._conn.execute(
+                        "SELECT 1 FROM refs WHERE digest=? LIMIT 1", (digest,)
+                    ).fetchone()
+                    path = self._find_object(digest)
+                    if not shared and path is not None:
+                        total -= path.stat().st_size
+                        path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def _sweep(self) -> None:
+        """Delete objects no document refers to.
+
+        The lock is held throughout, so a ``put`` in this process either lands
+        its ref before the snapshot or re-creates its object after the sweep.
+        Objects modified within ``_SWEEP_GRACE_SECONDS`` of the snapshot are
+        kept for puts in other processes.
+        """
+        with self._lock:
+            cutoff = time.time() - _SWEEP_GRACE_SECONDS
+            live = {row[0] for row in self._conn.execute("SELECT DISTINCT digest FROM refs")}
+            for path in (self.root / "objects").glob("*/*.z*"):
+                if path.name.split(".")[0] in live:
+                    continue
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                except FileNotFoundError:
+                    pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or trim the raw filing store.")
+    parser.add_argument("--root", type=Path, default=None, help="Store directory (default: DOC_STORE_DIR).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Print document/object counts and sizes.")
+    evict = sub.add_parser("evict", help="Drop least recently read documents.")
+    evict.add_argument("--max-size", default=None, help="Target on-disk size, e.g. 500MB or 2GB.")
+    evict.add_argument("--older-than", type=float, default=None, help="Drop documents unread for this many days.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    store = DocStore(args.root)
+    if args.command == "evict":
+        max_bytes = parse_size(args.max_size) if args.max_size else None
+        removed = store.evict(max_bytes=max_bytes, older_than_days=args.older_than)
+        log.info("Evicted %d documents", removed)
+    stats = store.stats()
+    ratio = stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0.0
+    log.info(
+        "%d documents in %d objects: %.1f MB raw, %.1f MB stored (%.1fx)",
+        stats["documents"], stats["objects"],
+        stats["raw_bytes"] / 1e6, stats["stored_bytes"] / 1e6, ratio,
+    )
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,52 +3,234 @@
 Wraps the SEC submissions, company facts, and archive endpoints. All requests go
 through a single throttled, on-disk-cached session so repeated pipeline runs do
 not re-download unchanged data and never exceed the SEC rate limit.
+
+With a bulk directory (``bulk_dir`` or ``SEC_BULK_DIR``) holding the nightly
+``companyfacts.zip`` and/or ``submissions.zip`` archives, company facts and
+submissions are served from the zip members instead, with no HTTP requests.
+Filing documents always come from the archive endpoint, read through the
+content-addressed ``DocStore`` when it is enabled. A filing's index page,
+itself an archive document, lists its exhibits by type (EX-99.1 and so on).
 """
 
 from __future__ import annotations
 
+import asyncio
+import bisect
+import io
+import json
+import logging
+import re
 import threading
 import time
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Any
+import zipfile
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator
 
+import requests
 import requests_cache
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from . import config
+from .doc_store import DocStore
+
+log = logging.getLogger("edgar_client")
+
+_SEC_HOST_RE = re.compile(r"^https://(data|www)\.sec\.gov")
+
+# The ticker -> CIK map changes rarely; refetch it weekly.
+TICKER_MAP_TTL = 60 * 60 * 24 * 7
 
 
 class _RateLimiter:
-    """Simple thread-safe minimum-interval limiter."""
+    """Thread-safe token bucket shared by the sync and async clients.
 
-    def __init__(self, max_per_second: float) -> None:
-        self._min_interval = 1.0 / max_per_second
+    Holds up to ``burst`` tokens refilled at ``max_per_second``. A caller
+    reserves a token under the lock and sleeps for its delay *outside* it, so
+    waiters queue by reservation order instead of serializing on the lock.
+    ``burst=1`` degrades to a plain minimum-interval limiter.
+    """
+
+    def __init__(self, max_per_second: float, burst: int = 1) -> None:
+        self._rate = max_per_second
+        self._burst = float(burst)
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
         self._lock = threading.Lock()
-        self._last = 0.0
 
-    def wait(self) -> None:
+    def reserve(self) -> float:
+        """Take one token and return how long to wait before using it."""
         with self._lock:
             now = time.monotonic()
-            delta = now - self._last
-            if delta < self._min_interval:
-                time.sleep(self._min_interval - delta)
-            self._last = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._stamp) * self._rate)
+            self._stamp = now
+            self._tokens -= 1.0
+            return max(0.0, -self._tokens / self._rate)
+
+    def wait(self) -> None:
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry transport errors, throttling, and server errors, not other 4xx.
+
+    Cancellation and other non-``Exception`` errors are never retried.
+    """
+    if not isinstance(exc, Exception):
+        return False
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return True
+
+
+class _BulkArchive:
+    """Lazily opened SEC bulk zip whose members are read on demand.
+
+    Opening only parses the central directory, so a multi-GB archive costs a
+    few MB of memory and each lookup decompresses a single member.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._zip: zipfile.ZipFile | None = None
+        self._lock = threading.Lock()
+
+    def info(self, member: str) -> zipfile.ZipInfo:
+        with self._lock:
+            if self._zip is None:
+                self._zip = zipfile.ZipFile(self.path)
+            try:
+                return self._zip.getinfo(member)
+            except KeyError:
+                raise LookupError(f"{member} not found in {self.path}") from None
+
+    def read(self, member: str) -> bytes:
+        info = self.info(member)
+        with self._lock:
+            return self._zip.read(info)
+
+    def open(self, member: str) -> BinaryIO:
+        """A decompressing stream over one member."""
+        info = self.info(member)
+        with self._lock:
+            return self._zip.open(info)
 
 
 @dataclass(frozen=True)
 class Filing:
-    """A single filing within a company's submission history."""
+    """A single filing within a company's submission history.
+
+    ``items`` holds an 8-K's item numbers as SEC lists them, e.g. "2.02,9.01".
+    A filing whose ``document_type`` is set refers to one of its exhibits
+    rather than to the primary document (see ``EdgarClient.exhibits``).
+    """
 
     accession: str
     form: str
     filing_date: datetime
     primary_document: str
+    items: str = ""
+    document_type: str = ""
 
     @property
     def accession_nodashes(self) -> str:
         return self.accession.replace("-", "")
 
+    @property
+    def item_numbers(self) -> tuple[str, ...]:
+        return tuple(i.strip() for i in self.items.split(",") if i.strip())
+
+
+class FilingIndex:
+    """One CIK's filings sorted by filing date, for binary-searched window queries.
+
+    Each filing carries a form-type bitmask, so a window query costs two bisects
+    plus a mask test per filing inside the window. The index starts from the
+    ``filings.recent`` block. The older, paged ``filings.files`` shards are only
+    fetched when a query window reaches before the loaded history and overlaps
+    the shard's ``filingFrom``/``filingTo`` range.
+    """
+
+    def __init__(
+        self,
+        recent: list[Filing],
+        shards: list[dict[str, Any]],
+        load_shard: Callable[[str], list[Filing]],
+    ) -> None:
+        self._load_shard = load_shard
+        self._pending = list(shards)
+        self._lock = threading.Lock()
+        self._form_bits: dict[str, int] = {}
+        # Feed order (newest first) breaks ties between same-day filings.
+        self._seq = 0
+        self._rows: list[tuple[datetime, int, Filing, int]] = []
+        self._accessions: set[str] = set()
+        self._add(recent)
+        self._loaded_from = self._dates[0] if self._dates else datetime.max
+
+    def _add(self, filings: list[Filing]) -> None:
+        for f in filings:
+            if f.accession in self._accessions:
+                continue
+            self._accessions.add(f.accession)
+            bit = self._form_bits.setdefault(f.form, 1 << len(self._form_bits))
+            self._rows.append((f.filing_date, -self._seq, f, bit))
+            self._seq += 1
+        self._rows.sort(key=lambda row: row[:2])
+        self._dates = [row[0] for row in self._rows]
+
+    def _mask(self, forms: tuple[str, ...]) -> int:
+        mask = 0
+        for form in forms:
+            mask |= self._form_bits.get(form, 0)
+        return mask
+
+    def _page_in(self, start: datetime, end: datetime) -> None:
+        """Load the shards overlapping a window that predates the loaded history."""
+        if start >= self._loaded_from or not self._pending:
+            return
+        keep: list[dict[str, Any]] = []
+        for shard in self._pending:
+            try:
+                first = datetime.strptime(shard.get("filingFrom", ""), "%Y-%m-%d")
+                last = datetime.strptime(shard.get("filingTo", ""), "%Y-%m-%d")
+            except ValueError:
+                first, last = datetime.min, datetime.max
+            if last < start or first > end:
+                keep.append(shard)
+                continue
+            log.info("Paging in submissions shard %s", shard.get("name"))
+            self._add(self._load_shard(shard["name"]))
+        self._pending = keep
+        if not any(
+            shard.get("filingTo", "") >= start.strftime("%Y-%m-%d") for shard in keep
+        ):
+            self._loaded_from = min(self._loaded_from, start)
+
+    def window(self, start: datetime, end: datetime, forms: tuple[str, ...]) -> list[Filing]:
+        """Filings dated within [start, end] whose form is in ``forms``, newest first."""
+        with self._lock:
+            self._page_in(start, end)
+            lo = bisect.bisect_left(self._dates, start)
+            hi = bisect.bisect_right(self._dates, end)
+            mask = self._mask(forms)
+            rows = self._rows[lo:hi]
+        return [f for _, _, f, bit in reversed(rows) if bit & mask]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
 
 class EdgarClient:
     """Thin, polite wrapper over the SEC EDGAR APIs."""
@@ -57,53 +239,224 @@ class EdgarClient:
     COMPANY_FACTS_URL = "https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
     TICKER_MAP_URL = "https://www.sec.gov/files/company_tickers.json"
     ARCHIVE_URL = "https://www.sec.gov/Archives/edgar/data/{cik_int}/{acc}/{doc}"
+    FRAMES_URL = "https://data.sec.gov/api/xbrl/frames/us-gaap/{tag}/{unit}/{frame}.json"
+    SUBMISSIONS_SHARD_URL = "https://data.sec.gov/submissions/{name}"
+    DAILY_INDEX_URL = "https://www.sec.gov/Archives/edgar/daily-index/{year}/QTR{qtr}/master.{ymd}.idx"
+    _URL_ATTRS = (
+        "SUBMISSIONS_URL",
+        "SUBMISSIONS_SHARD_URL",
+        "DAILY_INDEX_URL",
+        "COMPANY_FACTS_URL",
+        "TICKER_MAP_URL",
+        "ARCHIVE_URL",
+        "FRAMES_URL",
+    )
+
+    BULK_FACTS_ARCHIVE = "companyfacts.zip"
+    BULK_SUBMISSIONS_ARCHIVE = "submissions.zip"
 
-    def __init__(self, user_agent: str | None = None) -> None:
-        self._limiter = _RateLimiter(config.SEC_MAX_REQUESTS_PER_SECOND)
+    def __init__(
+        self,
+        user_agent: str | None = None,
+        bulk_dir: str | Path | None = None,
+        base_url: str | None = None,
+        doc_store: DocStore | None = None,
+    ) -> None:
+        # A base URL (e.g. a local stand-in server) replaces both SEC hosts;
+        # their paths do not overlap, so one server can answer for both.
+        base_url = base_url or config.SEC_BASE_URL
+        if base_url:
+            base = base_url.rstrip("/")
+            for name in self._URL_ATTRS:
+                setattr(self, name, _SEC_HOST_RE.sub(lambda _: base, getattr(self, name)))
+        bulk_dir = bulk_dir or config.SEC_BULK_DIR
+        self._bulk_facts = self._bulk_archive(bulk_dir, self.BULK_FACTS_ARCHIVE)
+        self._bulk_submissions = self._bulk_archive(bulk_dir, self.BULK_SUBMISSIONS_ARCHIVE)
+        if doc_store is None and config.DOC_STORE_ENABLED:
+            doc_store = DocStore()
+        self.doc_store = doc_store
+        self._limiter = _RateLimiter(config.SEC_MAX_REQUESTS_PER_SECOND, config.SEC_RATE_BURST)
         self._session = requests_cache.CachedSession(
             cache_name=str(config.CACHE_DIR / "edgar_http_cache"),
             backend="sqlite",
-            expire_after=60 * 60 * 24,  # 24h; filings are immutable, facts update slowly
-        )
-        self._session.headers.update(
-            {
-                "User-Agent": user_agent or config.SEC_USER_AGENT,
-                "Accept-Encoding": "gzip, deflate",
-            }
+            expire_after=60 * 60 * 24,  # 24h for anything without a policy below
+            urls_expire_after=self._cache_policy(),
         )
+        self._stats: Counter[str] = Counter()
+        self._stats_lock = threading.Lock()
+        self._indexes: dict[str, FilingIndex] = {}
+        self._indexes_lock = threading.Lock()
+        self._ticker_to_cik: dict[str, str] | None = None
+        # A ``replay.FixtureRecorder`` to copy every served response into.
+        self.recorder: Any = None
+        # The ``AsyncEdgarClient`` shared by this client's callers; see ``AsyncEdgarClient.of``.
+        self._async_client: Any = None
+        # Streamed bodies bypass the HTTP cache, which would read them whole.
+        self._stream_session = requests.Session()
+        # Size the connection pool for the async client's concurrent requests.
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=config.SEC_MAX_CONCURRENCY)
+        for session in (self._session, self._stream_session):
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(
+                {
+                    "User-Agent": user_agent or config.SEC_USER_AGENT,
+                    "Accept-Encoding": "gzip, deflate",
+                }
+            )
 
     # -- low-level ---------------------------------------------------------
-    @retry(stop=stop_after_attempt(4), wait=wait_exponential(multiplier=1, min=1, max=20))
+    @staticmethod
+    def _bulk_archive(bulk_dir: str | Path | None, name: str) -> _BulkArchive | None:
+        if not bulk_dir:
+            return None
+        path = Path(bulk_dir) / name
+        if not path.exists():
+            log.warning("Bulk archive %s not found; using the live API instead", path)
+            return None
+        return _BulkArchive(path)
+
+    def _cache_policy(self) -> dict[str, Any]:
+        """Per-URL-class expiration, keyed by each endpoint's fixed prefix.
+
+        Archive documents are immutable and never expire, or bypass the HTTP
+        cache entirely when the document store holds them. Submissions, facts
+        and frames are revalidated on every use: the cached copy is sent with
+        ``If-None-Match``/``If-Modified-Since`` and an unchanged payload comes
+        back as a body-less 304. The ticker map changes rarely.
+        """
+        policy = {
+            self.ARCHIVE_URL: (
+                requests_cache.DO_NOT_CACHE if self.doc_store else requests_cache.NEVER_EXPIRE
+            ),
+            self.SUBMISSIONS_URL: requests_cache.EXPIRE_IMMEDIATELY,
+            self.COMPANY_FACTS_URL: requests_cache.EXPIRE_IMMEDIATELY,
+            self.FRAMES_URL: requests_cache.EXPIRE_IMMEDIATELY,
+            # The current day's index grows until SEC closes it.
+            self.DAILY_INDEX_URL: requests_cache.EXPIRE_IMMEDIATELY,
+            self.TICKER_MAP_URL: TICKER_MAP_TTL,
+        }
+        return {url.split("{")[0].split("://")[-1]: ttl for url, ttl in policy.items()}
+
+    def _is_cached(self, url: str) -> bool:
+        """True when ``url`` can be answered from the cache without a request."""
+        cache = self._session.cache
+        key = cache.create_key(requests.Request("GET", url).prepare())
+        cached = cache.get_response(key)
+        return cached is not None and not cached.is_expired
+
+    def _count(self, outcome: str) -> None:
+        with self._stats_lock:
+            self._stats[outcome] += 1
+
+    def _record(self, resp: Any) -> None:
+        if not getattr(resp, "from_cache", False):
+            outcome = "misses"
+        elif getattr(resp, "revalidated", False):
+            outcome = "revalidated"
+        else:
+            outcome = "hits"
+        self._count(outcome)
+        if self.recorder is not None:
+            self.recorder.add(resp.url, resp.content, resp.headers.get("Content-Type"))
+
+    def _record_store_hit(self, url: str, content: bytes) -> None:
+        self._count("hits")
+        if self.recorder is not None:
+            self.recorder.add(url, content)
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """Responses served fresh from cache, revalidated with a 304, or fetched."""
+        with self._stats_lock:
+            return {k: self._stats[k] for k in ("hits", "revalidated", "misses")}
+
+    def log_cache_stats(self) -> None:
+        stats = self.cache_stats
+        log.info(
+            "EDGAR cache: %d hits, %d revalidated (304), %d misses",
+            stats["hits"], stats["revalidated"], stats["misses"],
+        )
+
+    @retry(
+        retry=retry_if_exception(_is_retryable),
+        stop=stop_after_attempt(4),
+        wait=wait_exponential(multiplier=1, min=1, max=20),
+        reraise=True,
+    )
     def _get(self, url: str) -> Any:
         # Only throttle on live requests, not cache hits.
-        if not getattr(self._session.cache, "contains", lambda **_: False)(url=url):
+        if not self._is_cached(url):
             self._limiter.wait()
         resp = self._session.get(url, timeout=30)
         resp.raise_for_status()
+        self._record(resp)
         return resp
 
     def _get_json(self, url: str) -> dict[str, Any]:
         return self._get(url).json()
 
+    @retry(
+        retry=retry_if_exception(_is_retryable),
+        stop=stop_after_attempt(4),
+        wait=wait_exponential(multiplier=1, min=1, max=20),
+        reraise=True,
+    )
+    def _get_stream(self, url: str, headers: dict[str, str]) -> Any:
+        """GET ``url`` around the HTTP cache, leaving the body unread."""
+        self._limiter.wait()
+        resp = self._stream_session.get(url, headers=headers, stream=True, timeout=30)
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError:
+            resp.close()
+            raise
+        return resp
+
     # -- public API --------------------------------------------------------
     @staticmethod
     def normalize_cik(cik: str | int) -> str:
         return str(int(str(cik).lstrip("CIK").lstrip("0") or "0")).zfill(10)
 
     def fetch_ticker_to_cik(self) -> dict[str, str]:
-        """Return an uppercase ticker -> zero-padded CIK map from SEC."""
-        data = self._get_json(self.TICKER_MAP_URL)
+        """Return an uppercase ticker -> zero-padded CIK map from SEC.
+
+        Parsed once per client; stages sharing a client share the map.
+        """
+        if self._ticker_to_cik is None:
+            self._ticker_to_cik = self._ticker_map(self._get_json(self.TICKER_MAP_URL))
+        return self._ticker_to_cik
+
+    @staticmethod
+    def _ticker_map(data: dict[str, Any]) -> dict[str, str]:
         return {
             row["ticker"].upper(): str(row["cik_str"]).zfill(10)
             for row in data.values()
         }
 
+    @property
+    def is_bulk(self) -> bool:
+        """True when facts or submissions are served from local bulk archives."""
+        return self._bulk_facts is not None or self._bulk_submissions is not None
+
     def resolve_ciks(self, tickers: list[str]) -> dict[str, str]:
-        """Resolve tickers to CIKs, preferring live SEC data with a fallback."""
+        """Resolve tickers to CIKs, preferring live SEC data with a fallback.
+
+        Bulk-mode clients skip the live ticker map when the fallback map covers
+        every ticker, so offline builds make no requests at all.
+        """
         try:
-            live = self.fetch_ticker_to_cik()
+            live = self.fetch_ticker_to_cik() if self._needs_ticker_map(tickers) else {}
         except Exception:
             live = {}
+        return self._merge_ciks(tickers, live)
+
+    def _needs_ticker_map(self, tickers: list[str]) -> bool:
+        known = all(t.upper() in config.AIRLINE_CIK_FALLBACK for t in tickers)
+        return not (self.is_bulk and known)
+
+    @staticmethod
+    def _merge_ciks(tickers: list[str], live: dict[str, str]) -> dict[str, str]:
         out: dict[str, str] = {}
         for t in tickers:
             t = t.upper()
@@ -113,17 +466,31 @@ class EdgarClient:
             raise ValueError(f"Could not resolve CIK for: {missing}")
         return out
 
+    def _submissions(self, cik10: str) -> dict[str, Any]:
+        if self._bulk_submissions is not None:
+            return json.loads(self._bulk_submissions.read(f"CIK{cik10}.json"))
+        return self._get_json(self.SUBMISSIONS_URL.format(cik=cik10))
+
     def list_filings(self, cik: str) -> list[Filing]:
         """Return the recent filing history for a CIK as Filing objects."""
-        cik10 = self.normalize_cik(cik)
-        data = self._get_json(self.SUBMISSIONS_URL.format(cik=cik10))
-        recent = data.get("filings", {}).get("recent", {})
+        return self._parse_filings(self._submissions(self.normalize_cik(cik)))
+
+    @staticmethod
+    def _parse_filings(data: dict[str, Any]) -> list[Filing]:
+        return EdgarClient._parse_columns(data.get("filings", {}).get("recent", {}))
+
+    @staticmethod
+    def _parse_columns(columns: dict[str, Any]) -> list[Filing]:
+        """Filings from the column arrays of a submissions block or shard."""
         filings: list[Filing] = []
-        for acc, form, date_str, doc in zip(
-            recent.get("accessionNumber", []),
-            recent.get("form", []),
-            recent.get("filingDate", []),
-            recent.get("primaryDocument", []),
+        accessions = columns.get("accessionNumber", [])
+        for acc, form, date_str, doc, items in zip(
+            accessions,
+            columns.get("form", []),
+            columns.get("filingDate", []),
+            columns.get("primaryDocument", []),
+            # Older shards and hand-built payloads may lack the items column.
+            columns.get("items") or [""] * len(accessions),
         ):
             try:
                 filing_date = datetime.strptime(date_str, "%Y-%m-%d")
@@ -135,19 +502,44 @@ class EdgarClient:
                     form=form,
                     filing_date=filing_date,
                     primary_document=doc,
+                    items=items or "",
                 )
             )
         return filings
 
+    def _submissions_shard(self, name: str) -> list[Filing]:
+        """Filings in one paged ``filings.files`` submissions shard."""
+        if self._bulk_submissions is not None:
+            data = json.loads(self._bulk_submissions.read(name))
+        else:
+            data = self._get_json(self.SUBMISSIONS_SHARD_URL.format(name=name))
+        return self._parse_columns(data)
+
+    def filing_index(self, cik: str) -> FilingIndex:
+        """The CIK's filing index, built on first use and reused for the run."""
+        cik10 = self.normalize_cik(cik)
+        with self._indexes_lock:
+            index = self._indexes.get(cik10)
+        if index is None:
+            data = self._submissions(cik10)
+            index = FilingIndex(
+                self._parse_filings(data),
+                data.get("filings", {}).get("files", []),
+                self._submissions_shard,
+            )
+            with self._indexes_lock:
+                index = self._indexes.setdefault(cik10, index)
+        return index
+
     def filings_in_window(
         self, cik: str, start: datetime, end: datetime, forms: tuple[str, ...]
     ) -> list[Filing]:
-        """Filings whose filing date falls within [start, end] and match forms."""
-        return [
-            f
-            for f in self.list_filings(cik)
-            if f.form in forms and start <= f.filing_date <= end
-        ]
+        """Filings whose filing date falls within [start, end] and match forms.
+
+        Newest first, like the submissions feed. Windows older than the recent
+        block page in the matching history shards.
+        """
+        return self.filing_index(cik).window(start, end, forms)
 
     def document_url(self, cik: str, filing: Filing) -> str:
         cik_int = int(self.normalize_cik(cik))
@@ -155,11 +547,153 @@ class EdgarClient:
             cik_int=cik_int, acc=filing.accession_nodashes, doc=filing.primary_document
         )
 
+    @staticmethod
+    def index_page(filing: Filing) -> Filing:
+        """The filing's index page, addressed as one of its documents."""
+        return replace(filing, primary_document=f"{filing.accession}-index.htm", document_type="")
+
+    @staticmethod
+    def _parse_index_page(html: bytes) -> list[tuple[str, str]]:
+        """``(document type, document name)`` rows of a filing index page."""
+        from lxml import etree, html as lxml_html
+
+        try:
+            tree = lxml_html.fromstring(html)
+        except (etree.ParserError, ValueError):
+            return []
+        rows: list[tuple[str, str]] = []
+        for table in tree.iter("table"):
+            header = [th.text_content().strip().lower() for th in table.iter("th")]
+            if "document" not in header or "type" not in header:
+                continue
+            doc_col, type_col = header.index("document"), header.index("type")
+            for tr in table.iter("tr"):
+                cells = tr.findall("td")
+                link = cells[doc_col].find(".//a") if len(cells) > max(doc_col, type_col) else None
+                if link is None:
+                    continue
+                # iXBRL documents link through the viewer: /ix?doc=/Archives/...
+                name = link.get("href", "").rsplit("/", 1)[-1]
+                if name:
+                    rows.append((cells[type_col].text_content().strip().upper(), name))
+        return rows
+
+    @staticmethod
+    def exhibits(filing: Filing, index_html: bytes, types: tuple[str, ...]) -> list[Filing]:
+        """Exhibits of ``filing`` whose type is in ``types``, in ``types`` order.
+
+        ``index_html`` is the body of ``index_page(filing)``. Each exhibit is
+        returned as a ``Filing`` naming the exhibit as its document, so it is
+        fetched, stored and cached like a primary document.
+        """
+        listed = EdgarClient._parse_index_page(index_html)
+        found: list[Filing] = []
+        for wanted in types:
+            for doc_type, name in listed:
+                if doc_type == wanted.upper() and name != filing.primary_document:
+                    found.append(replace(filing, primary_document=name, document_type=doc_type))
+        return found
+
     def fetch_document(self, cik: str, filing: Filing) -> bytes:
-        """Download the primary document bytes for a filing."""
-        return self._get(self.document_url(cik, filing)).content
+        """Download the document a filing names: its primary document or an exhibit.
+
+        Reads through the document store when one is configured.
+        """
+        key = (self.normalize_cik(cik), filing.accession, filing.primary_document)
+        if self.doc_store is not None:
+            stored = self.doc_store.get(*key)
+            if stored is not None:
+                self._record_store_hit(self.document_url(cik, filing), stored)
+                return stored
+        content = self._get(self.document_url(cik, filing)).content
+        if self.doc_store is not None:
+            self.doc_store.put(*key, content)
+        return content
 
     def company_facts(self, cik: str) -> dict[str, Any]:
         """Return the XBRL companyfacts payload for a CIK."""
         cik10 = self.normalize_cik(cik)
+        if self._bulk_facts is not None:
+            return json.loads(self.company_facts_bytes(cik10))
         return self._get_json(self.COMPANY_FACTS_URL.format(cik=cik10))
+
+    def company_facts_bytes(self, cik: str) -> bytes:
+        """Return the undecoded companyfacts JSON body for a CIK."""
+        cik10 = self.normalize_cik(cik)
+        if self._bulk_facts is not None:
+            return self._bulk_facts.read(f"CIK{cik10}.json")
+        return self._get(self.COMPANY_FACTS_URL.format(cik=cik10)).content
+
+    @contextmanager
+    def open_company_facts(
+        self, cik: str, validators: dict[str, str] | None = None
+    ) -> Iterator[tuple[dict[str, str], BinaryIO | None]]:
+        """Stream the companyfacts JSON body for a CIK unless it is unchanged.
+
+        ``validators`` are the conditional request headers an earlier call
+        yielded. Yields the validators of the current body with a stream over
+        it, or with ``None`` when the body still matches ``validators`` (a
+        304). The body bypasses the HTTP cache and is never held whole. A bulk
+        member is validated by its CRC and size.
+        """
+        cik10 = self.normalize_cik(cik)
+        validators = validators or {}
+        if self._bulk_facts is not None:
+            member = f"CIK{cik10}.json"
+            info = self._bulk_facts.info(member)
+            current = {"If-None-Match": f'"{info.CRC:08x}-{info.file_size}"'}
+            if current == validators:
+                yield current, None
+                return
+            with self._bulk_facts.open(member) as stream:
+                yield current, stream
+            return
+        url = self.COMPANY_FACTS_URL.format(cik=cik10)
+        # A recording needs the whole body, so it never revalidates.
+        with self._get_stream(url, {} if self.recorder is not None else validators) as resp:
+            if resp.status_code == 304:
+                self._count("revalidated")
+                yield validators, None
+                return
+            self._count("misses")
+            current = {}
+            if resp.headers.get("ETag"):
+                current["If-None-Match"] = resp.headers["ETag"]
+            elif resp.headers.get("Last-Modified"):
+                current["If-Modified-Since"] = resp.headers["Last-Modified"]
+            if self.recorder is not None:
+                self.recorder.add(url, resp.content, resp.headers.get("Content-Type"))
+                yield current, io.BytesIO(resp.content)
+                return
+            resp.raw.decode_content = True
+            yield current, resp.raw
+
+    def frame(self, tag: str, unit: str, frame: str) -> list[dict[str, Any]]:
+        """Return one us-gaap tag for one calendar frame across all filers.
+
+        ``frame`` is ``CY2024`` (annual), ``CY2024Q2`` (quarter), or
+        ``CY2024Q2I`` (instant). A frame that SEC has not published yields an
+        empty list.
+        """
+        try:
+            return self._get_json(self.frame_url(tag, unit, frame)).get("data", [])
+        except requests.HTTPError as exc:
+            if exc.response is not None and exc.response.status_code == 404:
+                return []
+            raise
+
+    def daily_index(self, day: date) -> str | None:
+        """The EDGAR daily master index for ``day``, or None if not published."""
+        url = self.DAILY_INDEX_URL.format(
+            year=day.year, qtr=(day.month - 1) // 3 + 1, ymd=day.strftime("%Y%m%d")
+        )
+        try:
+            return self._get(url).text
+        except requests.HTTPError as exc:
+            # SEC answers 403 as well as 404 for index files that do not exist.
+            if exc.response is not None and exc.response.status_code in (403, 404):
+                return None
+            raise
+
+    def frame_url(self, tag: str, unit: str, frame: str) -> str:
+        return self.FRAMES_URL.format(tag=tag, unit=unit.replace("/", "-per-"), frame=frame)
@@ -4,12 +4,21 @@ LangChain is intentionally not used. We talk to ``chromadb`` and the OpenAI SDK
 directly, which keeps the dependency surface small and the data flow explicit.
 The embedding backend is selectable via ``EMBEDDING_BACKEND`` (``openai`` or
 ``local``).
+
+Each airline has one persistent collection per embedding model, since vectors
+of different models cannot be searched together. Filing documents are added once,
+by accession and document name, and a period's retrieval is scoped to its
+filing window with a ``filing_ts`` metadata filter.
 """
 
 from __future__ import annotations
 
+import calendar
+import re
 from dataclasses import dataclass
-from typing import Protocol, Sequence
+from datetime import datetime
+from itertools import islice
+from typing import Any, Container, Iterable, Protocol, Sequence
 
 import chromadb
 from chromadb.api.models.Collection import Collection
@@ -53,60 +62,174 @@ def _local_embedder() -> EmbeddingFn:
     return embed
 
 
-def get_embedder() -> EmbeddingFn:
-    """Return the configured embedding function."""
+def embedding_model() -> str:
+    """The configured backend and model, such as ``local:<model name>``."""
     if config.EMBEDDING_BACKEND == "openai":
-        return _openai_embedder()
-    return _local_embedder()
+        return f"openai:{config.OPENAI_EMBEDDING_MODEL}"
+    return f"local:{config.LOCAL_EMBEDDING_MODEL}"
+
+
+def get_embedder() -> EmbeddingFn:
+    """Return the configured embedding function.
+
+    With ``config.EMBED_CACHE_ENABLED`` it reads through the embedding cache
+    (see embed_cache.py), so text embedded before by the same model is not
+    sent to the backend again.
+    """
+    embed = _openai_embedder() if config.EMBEDDING_BACKEND == "openai" else _local_embedder()
+    if not config.EMBED_CACHE_ENABLED:
+        return embed
+    from .embed_cache import CachedEmbedder
+
+    return CachedEmbedder(embed, embedding_model())
 
 
 def _client() -> chromadb.ClientAPI:
     return chromadb.PersistentClient(path=str(config.CHROMA_DIR))
 
 
-def build_collection(
+def collection_for(airline: str) -> str:
+    """Name of the collection holding every filing of ``airline`` indexed by the configured model."""
+    model = re.sub(r"[^A-Za-z0-9._-]+", "-", embedding_model()).strip("-._")
+    return f"{airline.lower()}-filings-{model}"
+
+
+def filing_ts(filing_date: datetime) -> int:
+    """``filing_ts`` metadata: the filing date as UTC epoch seconds."""
+    return calendar.timegm(filing_date.timetuple())
+
+
+def filing_window(start: datetime, end: datetime) -> dict[str, Any]:
+    """Chroma ``where`` filter for chunks filed within [start, end]."""
+    return {
+        "$and": [
+            {"filing_ts": {"$gte": filing_ts(start)}},
+            {"filing_ts": {"$lte": filing_ts(end)}},
+        ]
+    }
+
+
+def _collection(collection_name: str) -> Collection:
+    return _client().get_or_create_collection(
+        name=collection_name, metadata={"hnsw:space": "cosine"}
+    )
+
+
+def _document_key(metadata: dict) -> tuple[str, str]:
+    """``(accession, document)`` of a chunk; the document is empty if not recorded."""
+    return str(metadata["accession"]), str(metadata.get("document", ""))
+
+
+def _chunk_id(metadata: dict) -> str:
+    accession, document = _document_key(metadata)
+    if document:
+        return f"{accession}-{document}-{metadata['chunk']}"
+    return f"{accession}-{metadata['chunk']}"
+
+
+def indexed_documents(collection_name: str, page: int = 5000) -> set[tuple[str, str]]:
+    """``(accession, document)`` pairs with chunks in the collection (empty if it does not exist yet)."""
+    collection = _collection(collection_name)
+    documents: set[tuple[str, str]] = set()
+    for offset in range(0, collection.count(), page):
+        result = collection.get(include=["metadatas"], limit=page, offset=offset)
+        documents.update(_document_key(m) for m in result["metadatas"] or [] if m)
+    return documents
+
+
+def index_chunks(
     collection_name: str,
-    chunks: list[Chunk],
+    chunks: Iterable[Chunk],
     embedder: EmbeddingFn,
     batch_size: int = 100,
-) -> Collection:
-    """Create (or replace) a Chroma collection and add embedded chunks."""
-    client = _client()
-    # Rebuild from scratch so re-runs are deterministic.
+) -> dict[tuple[str, str], int]:
+    """Embed and add chunks to a persistent collection; return chunks added per document.
+
+    The collection is created on first use and kept across runs. Each chunk
+    gets a ``chunk`` index within its ``(accession, document)``, in stream
+    order, and the id ``f"{accession}-{document}-{chunk}"``. ``chunks`` may be
+    a generator: each batch is embedded and stored as soon as ``batch_size``
+    chunks arrive, so at most one batch is held at a time. If the stream
+    fails, the chunks this call added are removed again, so no document is
+    left half indexed.
+    """
+    collection = _collection(collection_name)
+    added: dict[tuple[str, str], int] = {}
+    ids: list[str] = []
+    chunks = iter(chunks)
     try:
-        client.delete_collection(collection_name)
-    except Exception:
-        pass
-    collection = client.create_collection(
-        name=collection_name, metadata={"hnsw:space": "cosine"}
+        while batch := list(islice(chunks, batch_size)):
+            for chunk in batch:
+                key = _document_key(chunk.metadata)
+                chunk.metadata["chunk"] = added.get(key, 0)
+                added[key] = chunk.metadata["chunk"] + 1
+            texts = [c.text for c in batch]
+            batch_ids = [_chunk_id(c.metadata) for c in batch]
+            collection.add(
+                ids=batch_ids,
+                documents=texts,
+                embeddings=embedder(texts),
+                metadatas=[c.metadata for c in batch],
+            )
+            ids.extend(batch_ids)
+    except BaseException:
+        if ids:
+            collection.delete(ids=ids)
+        raise
+    return added
+
+
+def delete_documents(
+    collection_name: str, where: dict[str, Any], keep: Container[tuple[str, str]] = ()
+) -> set[tuple[str, str]]:
+    """Delete the chunks ``where`` matches, except those of documents in ``keep``.
+
+    Returns the ``(accession, document)`` pairs deleted.
+    """
+    collection = _collection(collection_name)
+    result = collection.get(where=where, include=["metadatas"])
+    doomed = [
+        (chunk_id, _document_key(meta))
+        for chunk_id, meta in zip(result["ids"], result["metadatas"] or [])
+        if meta and _document_key(meta) not in keep
+    ]
+    if doomed:
+        collection.delete(ids=[chunk_id for chunk_id, _ in doomed])
+    return {key for _, key in doomed}
+
+
+def update_metadata(collection_name: str, metadatas: Iterable[dict]) -> None:
+    """Replace the stored metadata of chunks added by ``index_chunks``."""
+    metadatas = list(metadatas)
+    if not metadatas:
+        return
+    _collection(collection_name).update(
+        ids=[_chunk_id(m) for m in metadatas], metadatas=metadatas
     )
-    for start in range(0, len(chunks), batch_size):
-        batch = chunks[start : start + batch_size]
-        texts = [c.text for c in batch]
-        collection.add(
-            ids=[f"{collection_name}-{start + i}" for i in range(len(batch))],
-            documents=texts,
-            embeddings=embedder(texts),
-            metadatas=[c.metadata for c in batch],
-        )
-    return collection
 
 
 def retrieve(
-    collection_name: str, query: str, embedder: EmbeddingFn, k: int = 12
+    collection_name: str,
+    query: str,
+    embedder: EmbeddingFn,
+    k: int = 12,
+    where: dict[str, Any] | None = None,
 ) -> list[str]:
     """Return the ``k`` most relevant chunk texts for ``query``."""
     collection = _client().get_collection(collection_name)
     result = collection.query(
-        query_embeddings=embedder([query]), n_results=k, include=["documents"]
+        query_embeddings=embedder([query]), n_results=k, where=where, include=["documents"]
     )
     documents = result.get("documents") or [[]]
     return documents[0]
 
 
-def collection_size(collection_name: str) -> int:
-    """Return the number of stored chunks in a collection."""
-    return _client().get_collection(collection_name).count()
+def collection_size(collection_name: str, where: dict[str, Any] | None = None) -> int:
+    """Return the number of stored chunks in a collection, or those ``where`` matches."""
+    collection = _client().get_collection(collection_name)
+    if where is None:
+        return collection.count()
+    return len(collection.get(where=where, include=[])["ids"])
 
 
 def _dedup_key(text: str) -> str:
@@ -119,18 +242,22 @@ def retrieve_passages(
     queries: Sequence[str],
     embedder: EmbeddingFn,
     k: int,
+    where: dict[str, Any] | None = None,
 ) -> list[tuple[str, dict]]:
     """Retrieve unique ``(text, metadata)`` passages across one or more queries.
 
     All queries are embedded and searched in a single call. Results are merged by
     interleaving each query's ranked hits (so every query contributes coverage
     before any one query dominates) and de-duplicated by normalized text.
+    ``where`` narrows the search to matching chunks, such as a period's
+    ``filing_window``.
     """
     collection = _client().get_collection(collection_name)
     embeddings = embedder(list(queries))
     result = collection.query(
         query_embeddings=embeddings,
         n_results=k,
+        where=where,
         include=["documents", "metadatas"],
     )
     docs_per_query = result.get("documents") or []
@@ -0,0 +1,344 @@
+"""Persistent embedding cache keyed by model and normalized text.
+
+Every run re-embeds the same text. Overlapping period windows (Q4 and FY)
+select the same 10-K, ``--overwrite`` reruns select everything again,
+boilerplate repeats across filings, and the retrieval queries are the same
+templates for every period. ``CachedEmbedder`` wraps an ``EmbeddingFn`` and
+only sends text it has not embedded before to the backend.
+
+Each model gets a directory under ``config.EMBED_CACHE_DIR``. Vectors live in
+``vectors.f32``, a memory-mapped ``float32`` array with one row per entry. A
+SQLite index (``index.sqlite3``) maps the BLAKE2b hash of the
+whitespace-normalized text to its row and last-read time. The array is capped
+at ``config.EMBED_CACHE_MAX_MB``: when it is full, the least recently read
+entries are evicted and their rows reused.
+
+Several runs can share one cache. Each operation holds an ``fcntl`` lock on the
+model's ``lock`` file: shared while reading vectors, exclusive while writing
+them, so no process reads a row that another is reusing before its index
+update commits. ``evict`` writes the compacted array to a new file, and other
+processes remap it on their next operation. Without ``fcntl`` (Windows) there
+is no cross-process lock, and a cache directory must not be shared.
+
+``python -m sec_pipeline.embed_cache stats`` reports entries and sizes per
+model. ``python -m sec_pipeline.embed_cache evict`` trims and compacts them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from . import config
+from .doc_store import parse_size
+from .embed import EmbeddingFn
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+log = logging.getLogger("embed_cache")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    key         TEXT    PRIMARY KEY,
+    row         INTEGER NOT NULL,
+    last_access REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vectors_last_access ON vectors (last_access);
+CREATE TABLE IF NOT EXISTS free (row INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value NOT NULL);
+"""
+
+# SQLite's default limit on bound parameters is 999 in older builds.
+_BATCH = 500
+# Share of the cache freed at once when it is full, so eviction is not per put.
+_EVICT_FRACTION = 0.05
+
+
+def text_key(text: str) -> str:
+    """Hash of ``text`` with runs of whitespace collapsed."""
+    return hashlib.blake2b(" ".join(text.split()).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _model_dir(model: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model).strip("_")
+    return f"{slug}-{hashlib.blake2b(model.encode('utf-8'), digest_size=4).hexdigest()}"
+
+
+class EmbeddingCache:
+    """Vectors of one embedding model, keyed by ``text_key``."""
+
+    def __init__(self, model: str, root: Path | None = None, max_bytes: int | None = None) -> None:
+        self.model = model
+        self.root = Path(root or config.EMBED_CACHE_DIR) / _model_dir(model)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = config.EMBED_CACHE_MAX_MB << 20 if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._path = self.root / "vectors.f32"
+        self._path.touch()
+        self._array: np.memmap | None = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._lock_fd = os.open(self.root / "lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._conn = sqlite3.connect(
+            self.root / "index.sqlite3", timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('model', ?)", (model,))
+
+    def close(self) -> None:
+        self._array = None
+        self._conn.close()
+        os.close(self._lock_fd)
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Hold the thread lock and the shared or exclusive process lock."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                # Another process compacted the array since it was last mapped.
+                generation = self._meta("generation")
+                if generation != self._generation:
+                    self._array = None
+                    self._generation = generation
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _meta(self, name: str) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE name=?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def _lookup(self, keys: Sequence[str]) -> dict[str, int]:
+        """Rows of the ``keys`` in the index."""
+        found: dict[str, int] = {}
+        for start in range(0, len(keys), _BATCH):
+            batch = list(keys[start : start + _BATCH])
+            marks = ",".join("?" * len(batch))
+            found.update(
+                self._conn.execute(f"SELECT key, row FROM vectors WHERE key IN ({marks})", batch)
+            )
+        return found
+
+    def _rows(self, dim: int, need: int) -> np.memmap:
+        """The vector array mapped to at least ``need`` rows, growing the file."""
+        if self._array is None or self._array.shape[0] < need or self._array.shape[1] != dim:
+            size = need * dim * 4
+            with open(self._path, "r+b") as fh:
+                fh.seek(0, 2)
+                if fh.tell() < size:
+                    fh.truncate(size)
+                rows = max(fh.tell(), size) // (dim * 4)
+            self._array = np.memmap(self._path, dtype=np.float32, mode="r+", shape=(rows, dim))
+        return self._array
+
+    # -- read / write --------------------------------------------------------
+    def get_many(self, keys: Sequence[str]) -> dict[str, np.ndarray]:
+        """Cached vectors for ``keys``; keys not in the cache are left out."""
+        with self._locked(exclusive=False):
+            found = self._lookup(keys)
+            vectors: dict[str, np.ndarray] = {}
+            if found:
+                array = self._rows(self._meta("dim"), max(found.values()) + 1)
+                vectors = {key: np.array(array[row]) for key, row in found.items()}
+                hit = list(found)
+                now = time.time()
+                for start in range(0, len(hit), _BATCH):
+                    batch = hit[start : start + _BATCH]
+                    marks = ",".join("?" * len(batch))
+                    self._conn.execute(
+                        f"UPDATE vectors SET last_access=? WHERE key IN ({marks})", [now, *batch]
+                    )
+            hits = sum(key in found for key in keys)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return vectors
+
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """Store ``vectors[i]`` under ``keys[i]``, evicting old entries when full."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(keys):
+            return
+        dim = vectors.shape[1]
+        capacity = self.max_bytes // (dim * 4)
+        with self._locked(exclusive=True):
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                stored = self._meta("dim")
+                if stored and stored != dim:
+                    log.warning(
+                        "Not caching %d-dim embeddings for %s: the cache holds %d-dim vectors",
+                        dim, self.model, stored,
+                    )
+                    self._conn.execute("ROLLBACK")
+                    return
+                present = self._lookup(keys)
+                first = {key: i for i, key in reversed(list(enumerate(keys))) if key not in present}
+                new = sorted(first.values())[:capacity]
+                rows = self._allocate(len(new), capacity)
+                if rows:
+                    array = self._rows(dim, max(rows) + 1)
+                    array[rows] = vectors[new]
+                    array.flush()
+                now = time.time()
+                self._conn.executemany(
+                    "INSERT INTO vectors VALUES (?,?,?)",
+                    [(keys[i], row, now) for i, row in zip(new, rows)],
+                )
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('dim', ?)", (dim,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _allocate(self, count: int, capacity: int) -> list[int]:
+        """Rows for ``count`` new entries: free rows, then new ones, then evicted ones."""
+        rows = [r for (r,) in self._conn.execute("SELECT row FROM free ORDER BY row LIMIT ?", (count,))]
+        self._conn.executemany("DELETE FROM free WHERE row=?", [(r,) for r in rows])
+        used = self._meta("rows")
+        grow = min(count - len(rows), max(0, capacity - used))
+        rows.extend(range(used, used + grow))
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('rows', ?)", (used + grow,))
+        short = count - len(rows)
+        if short:
+            evict = max(short, int(capacity * _EVICT_FRACTION))
+            victims = self._conn.execute(
+                "SELECT key, row FROM vectors ORDER BY last_access LIMIT ?", (evict,)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM vectors WHERE key=?", [(k,) for k, _ in victims])
+            freed = [row for _, row in victims]
+            rows.extend(freed[:short])
+            self._conn.executemany("INSERT INTO free VALUES (?)", [(r,) for r in freed[short:]])
+        return rows
+
+    # -- maintenance -----------------------------------------------------------
+    def stats(self) -> dict[str, float]:
+        """Entry count, array size on disk, and this instance's hits and misses."""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": self._path.stat().st_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def log_stats(self) -> None:
+        stats = self.stats()
+        log.info(
+            "Embedding cache (%s): %d hits, %d misses (%.0f%% hit rate), %d entries, %.1f MB",
+            self.model, stats["hits"], stats["misses"], stats["hit_rate"] * 100,
+            stats["entries"], stats["bytes"] / 1e6,
+        )
+
+    def evict(self, max_bytes: int) -> int:
+        """Drop least recently read entries to fit ``max_bytes`` and compact the array.
+
+        Returns how many entries were removed.
+        """
+        with self._locked(exclusive=True):
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                dim = self._meta("dim")
+                keep = max_bytes // (dim * 4) if dim else 0
+                live = self._conn.execute(
+                    "SELECT key, row, last_access FROM vectors ORDER BY last_access DESC"
+                ).fetchall()
+                removed = max(0, len(live) - keep)
+                live = live[:keep]
+                if live:
+                    array = self._rows(dim, max(row for _, row, _ in live) + 1)
+                    compacted = np.array(array[[row for _, row, _ in live]])
+                else:
+                    compacted = np.empty(0, dtype=np.float32)
+                self._array = None
+                # A new file: other processes may still have the old one mapped.
+                tmp = self._path.with_name(self._path.name + ".tmp")
+                compacted.tofile(tmp)
+                tmp.replace(self._path)
+                self._generation += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (self._generation,)
+                )
+                self._conn.execute("DELETE FROM vectors")
+                self._conn.execute("DELETE FROM free")
+                self._conn.executemany(
+                    "INSERT INTO vectors VALUES (?,?,?)",
+                    [(key, row, last) for row, (key, _, last) in enumerate(live)],
+                )
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('rows', ?)", (len(live),))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return removed
+
+
+class CachedEmbedder:
+    """An ``EmbeddingFn`` that embeds only text the cache has not seen.
+
+    Repeated texts within one call are embedded once. Vectors round-trip
+    through ``float32``.
+    """
+
+    def __init__(self, embed: EmbeddingFn, model: str, cache: EmbeddingCache | None = None) -> None:
+        self.embed = embed
+        self.cache = cache or EmbeddingCache(model)
+
+    def __call__(self, texts: Sequence[str]) -> list[list[float]]:
+        keys = [text_key(text) for text in texts]
+        vectors = self.cache.get_many(keys)
+        pending = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if pending:
+            fresh = np.asarray(self.embed(list(pending.values())), dtype=np.float32)
+            self.cache.put_many(list(pending), fresh)
+            vectors.update(zip(pending, fresh))
+        return [vectors[key].tolist() for key in keys]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or trim the embedding cache.")
+    parser.add_argument("--root", type=Path, default=None, help="Cache directory (default: EMBED_CACHE_DIR).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Print entries and size per model.")
+    evict = sub.add_parser("evict", help="Drop least recently read vectors and compact.")
+    evict.add_argument("--max-size", required=True, help="Target size per model, e.g. 200MB.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    root = Path(args.root or config.EMBED_CACHE_DIR)
+    for index in sorted(root.glob("*/index.sqlite3")):
+        conn = sqlite3.connect(index)
+        (model,) = conn.execute("SELECT value FROM meta WHERE name='model'").fetchone()
+        conn.close()
+        cache = EmbeddingCache(model, root=root)
+        if args.command == "evict":
+            removed = cache.evict(parse_size(args.max_size))
+            log.info("%s: evicted %d vectors", model, removed)
+        stats = cache.stats()
+        log.info("%s: %d vectors, %.1f MB", model, stats["entries"], stats["bytes"] / 1e6)
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
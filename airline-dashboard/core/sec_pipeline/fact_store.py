@@ -0,0 +1,216 @@
+"""Persisted, indexed point-in-time store of XBRL facts.
+
+``xbrl._latest_value`` keeps only the fact from the highest accession, so a
+restatement silently replaces the figure a filer originally reported. The
+store keeps every fact it has seen, keyed by (CIK, tag, unit, period end,
+duration, accession), in a SQLite database under ``data/raw/``. Facts persist
+across runs even if SEC later drops them from companyfacts.
+
+B-tree indexes answer "latest value" and "value as of filing date D" for one
+context in O(log n). ``snapshot`` rebuilds a companyfacts-shaped payload as it
+stood on a given date, which lets the unchanged extractor produce as-reported
+financials: each period is extracted from the snapshot taken on the day that
+period was first filed.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from . import config
+from .xbrl import XBRL_TAGS, _fp_candidates, extract_financials
+
+FACT_STORE_PATH = config.RAW_DIR / "xbrl_facts.sqlite3"
+
+# Duration recorded for instant (balance sheet) facts.
+INSTANT = -1
+
+# Original periodic reports; amendments and 8-Ks do not define "as reported".
+_ORIGINAL_FORMS = ("10-Q", "10-K")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS facts (
+    cik        TEXT    NOT NULL,
+    tag        TEXT    NOT NULL,
+    unit       TEXT    NOT NULL,
+    period_end TEXT    NOT NULL,
+    duration   INTEGER NOT NULL,
+    accn       TEXT    NOT NULL,
+    start      TEXT,
+    filed      TEXT    NOT NULL,
+    fy         INTEGER,
+    fp         TEXT,
+    form       TEXT,
+    frame      TEXT,
+    val        REAL,
+    seq        INTEGER NOT NULL,
+    PRIMARY KEY (cik, tag, unit, period_end, duration, accn)
+);
+CREATE INDEX IF NOT EXISTS facts_as_of
+    ON facts (cik, tag, unit, period_end, duration, filed, accn);
+CREATE INDEX IF NOT EXISTS facts_filed ON facts (cik, filed);
+CREATE INDEX IF NOT EXISTS facts_period_end ON facts (cik, period_end, filed);
+"""
+
+# Payload keys and the columns that hold them.
+_FACT_FIELDS = ("start", "end", "val", "accn", "fy", "fp", "form", "filed", "frame")
+_FACT_COLUMNS = ("start", "period_end", "val", "accn", "fy", "fp", "form", "filed", "frame")
+
+
+def _duration(start: str | None, end: str) -> int:
+    if not start:
+        return INSTANT
+    try:
+        return (datetime.strptime(end, "%Y-%m-%d") - datetime.strptime(start, "%Y-%m-%d")).days
+    except ValueError:
+        return INSTANT
+
+
+class FactStore:
+    """SQLite-backed history of every XBRL fact ingested per CIK."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or FACT_STORE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # -- ingest --------------------------------------------------------------
+    def ingest(self, cik: str, facts: dict[str, Any]) -> int:
+        """Upsert every us-gaap fact in a companyfacts payload; return row count."""
+        rows = []
+        for tag, node in facts.get("facts", {}).get("us-gaap", {}).items():
+            for unit, unit_facts in (node or {}).get("units", {}).items():
+                for seq, f in enumerate(unit_facts):
+                    end = f.get("end")
+                    if not end or not f.get("accn"):
+                        continue
+                    rows.append(
+                        (
+                            cik, tag, unit, end, _duration(f.get("start"), end),
+                            f["accn"], f.get("start"), str(f.get("filed", "")),
+                            f.get("fy"), f.get("fp"), f.get("form"), f.get("frame"),
+                            f.get("val"), seq,
+                        )
+                    )
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO facts VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)", rows
+            )
+        return len(rows)
+
+    # -- point lookups -------------------------------------------------------
+    def value_as_of(
+        self,
+        cik: str,
+        tag: str,
+        end: str,
+        duration: int = INSTANT,
+        as_of: date | str | None = None,
+        unit: str = "USD",
+    ) -> float | None:
+        """Value of one context as known on filing date ``as_of`` (latest if None)."""
+        sql = (
+            "SELECT val FROM facts"
+            " WHERE cik=? AND tag=? AND unit=? AND period_end=? AND duration=?"
+        )
+        params: list[Any] = [cik, tag, unit, end, duration]
+        if as_of is not None:
+            sql += " AND filed <= ?"
+            params.append(str(as_of))
+        # The extractor's preference (``xbrl._latest_value``): highest
+        # accession, then latest filing date.
+        sql += " ORDER BY accn DESC, filed DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return None if row is None else row[0]
+
+    def latest_value(
+        self, cik: str, tag: str, end: str, duration: int = INSTANT, unit: str = "USD"
+    ) -> float | None:
+        """Most recently filed value of one context, reflecting any restatement."""
+        return self.value_as_of(cik, tag, end, duration, None, unit)
+
+    def first_filed(self, cik: str, year: int, period: str) -> str | None:
+        """Date the period was first reported in an original 10-Q or 10-K.
+
+        Matches on the calendar quarter-end month first, then on the SEC ``fp``
+        label, mirroring the extractor's two-stage period matcher.
+        """
+        month_end = config.PeriodSpec(year, period).period_end.date()
+        forms = ",".join("?" * len(_ORIGINAL_FORMS))
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT MIN(filed) FROM facts WHERE cik=? AND period_end BETWEEN ? AND ?"
+                f" AND form IN ({forms})",
+                [
+                    cik, month_end.replace(day=1).isoformat(), month_end.isoformat(),
+                    *_ORIGINAL_FORMS,
+                ],
+            ).fetchone()
+            if row[0] is None:
+                fps = sorted(_fp_candidates(period))
+                row = self._conn.execute(
+                    f"SELECT MIN(filed) FROM facts WHERE cik=? AND period_end BETWEEN ? AND ?"
+                    f" AND form IN ({forms}) AND fp IN ({','.join('?' * len(fps))})",
+                    [
+                        cik, date(year, 1, 1).isoformat(), date(year, 12, 31).isoformat(),
+                        *_ORIGINAL_FORMS, *fps,
+                    ],
+                ).fetchone()
+        return row[0]
+
+    # -- snapshots -----------------------------------------------------------
+    def snapshot(
+        self, cik: str, as_of: date | str | None = None, tags: Iterable[str] | None = None
+    ) -> dict[str, Any]:
+        """Companyfacts-shaped payload of the facts filed on or before ``as_of``."""
+        sql = f"SELECT tag, unit, {', '.join(_FACT_COLUMNS)} FROM facts WHERE cik=?"
+        params: list[Any] = [cik]
+        if as_of is not None:
+            sql += " AND filed <= ?"
+            params.append(str(as_of))
+        if tags is not None:
+            tags = list(tags)
+            sql += f" AND tag IN ({','.join('?' * len(tags))})"
+            params.extend(tags)
+        sql += " ORDER BY tag, unit, seq"
+        gaap: dict[str, Any] = {}
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        for tag, unit, *values in rows:
+            fact = {k: v for k, v in zip(_FACT_FIELDS, values) if v is not None}
+            gaap.setdefault(tag, {"units": {}})["units"].setdefault(unit, []).append(fact)
+        return {"facts": {"us-gaap": gaap}}
+
+
+def extract_as_reported(
+    store: FactStore, cik: str, years: list[int], periods: list[str]
+) -> list[dict[str, Any]]:
+    """Extract each period from the snapshot taken when it was first filed.
+
+    Periods first reported in the same filing (Q4 and FY) share one snapshot.
+    Records carry an ``As Of`` column with the snapshot date.
+    """
+    snapshots: dict[str, dict[str, Any]] = {}
+    records: list[dict[str, Any]] = []
+    for year in years:
+        for period in periods:
+            as_of = store.first_filed(cik, year, period)
+            if as_of is None:
+                continue
+            if as_of not in snapshots:
+                snapshots[as_of] = store.snapshot(cik, as_of, XBRL_TAGS)
+            for rec in extract_financials(snapshots[as_of], [year], [period]):
+                rec["As Of"] = as_of
+                records.append(rec)
+    return records
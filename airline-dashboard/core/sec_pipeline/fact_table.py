@@ -0,0 +1,212 @@
+"""Columnar view of an XBRL companyfacts payload for vectorized fact selection.
+
+The scalar extractor in ``xbrl.py`` rescans a tag's fact list for every
+year/period it resolves. ``FactTable`` flattens the payload once into numpy
+columns (tag, unit, start/end day ordinals, duration days, fp, accn, filed, val)
+and answers the same selection questions for *every* year of a tag at once with
+grouped, vectorized masks. Results are memoized, so the repeated lookups made by
+Q4 derivation and the YTD paths cost a dictionary hit.
+
+Selection semantics mirror ``xbrl._pick_duration_window`` and
+``xbrl._pick_instant`` exactly, including their tie-breaking: the winning fact
+is the one with the greatest ``(accn, filed)`` and, among equal keys, the one
+that appears first in the candidate list (unit candidates in order, then source
+order within each unit).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from . import config
+
+_QUARTER_END_MONTH = {"Q1": 3, "Q2": 6, "Q3": 9, "Q4": 12, "FY": 12}
+
+# Sentinel for a missing or unparseable date ordinal.
+_NO_DATE = -1
+
+
+@lru_cache(maxsize=8192)
+def _date_parts(d: str | None) -> tuple[int, int, int]:
+    """Return ``(ordinal, year, month)`` for an ISO date, or sentinels."""
+    try:
+        parsed = datetime.strptime(d, "%Y-%m-%d") if d else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        return _NO_DATE, 0, 0
+    return parsed.toordinal(), parsed.year, parsed.month
+
+
+def _fp_candidates(period: str) -> tuple[str, ...]:
+    """Preferred SEC fiscal period labels for a logical period."""
+    if period == "Q4":
+        # Year-end filings usually carry FY in companyfacts.
+        return ("Q4", "FY")
+    return (period,)
+
+
+class FactView:
+    """Facts for one tag across an ordered list of unit candidates."""
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        # Rank facts once: latest (accn, filed) first, then earliest candidate
+        # position, matching ``max`` over the scalar candidate list.
+        frame = frame.sort_values(
+            ["accn", "filed", "pos"], ascending=[False, False, True], kind="stable"
+        )
+        self._n = len(frame)
+        self._rank = np.arange(self._n, dtype=np.int64)
+        self._end_year = frame["end_year"].to_numpy()
+        self._end_month = frame["end_month"].to_numpy()
+        self._days = frame["days"].to_numpy()
+        self._has_end = frame["end"].to_numpy() != _NO_DATE
+        self._has_span = self._has_end & (frame["start"].to_numpy() != _NO_DATE)
+        self._fp = frame["fp"].to_numpy()
+        self._val = frame["val"].to_numpy()
+        self._memo: dict[tuple, dict[int, Any]] = {}
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _best_by_year(self, mask: np.ndarray, key: np.ndarray) -> dict[int, Any]:
+        """Return ``{end_year: val}`` for the minimum ``key`` within ``mask``."""
+        if not mask.any():
+            return {}
+        years = self._end_year[mask]
+        keys = key[mask]
+        vals = self._val[mask]
+        order = np.lexsort((keys, years))
+        years, vals = years[order], vals[order]
+        first = np.ones(len(years), dtype=bool)
+        first[1:] = years[1:] != years[:-1]
+        return dict(zip(years[first].tolist(), vals[first].tolist()))
+
+    def _resolve(
+        self, base: np.ndarray, window: np.ndarray, period: str | None
+    ) -> dict[int, Any]:
+        """Calendar match (fp-preferred first), then the optional fp-only fallback."""
+        fp_pref = (
+            np.isin(self._fp, _fp_candidates(period))
+            if period
+            else np.zeros(self._n, dtype=bool)
+        )
+        key = np.where(fp_pref, self._rank, self._rank + self._n)
+        resolved = self._best_by_year(base & window, key)
+        if not config.XBRL_ENABLE_FP_FALLBACK or not period:
+            return resolved
+        fp_only = self._best_by_year(base & fp_pref, self._rank)
+        for year, val in fp_only.items():
+            resolved.setdefault(year, val)
+        return resolved
+
+    def duration_window(
+        self,
+        year: int,
+        end_month: int,
+        min_days: int,
+        max_days: int,
+        period: str | None = None,
+    ) -> float | None:
+        """Vectorized equivalent of ``xbrl._pick_duration_window``."""
+        memo_key = ("duration", end_month, min_days, max_days, period)
+        by_year = self._memo.get(memo_key)
+        if by_year is None:
+            base = self._has_span & (self._days >= min_days) & (self._days <= max_days)
+            by_year = self._resolve(base, self._end_month == end_month, period)
+            self._memo[memo_key] = by_year
+        return float(by_year[year]) if year in by_year else None
+
+    def instant(self, year: int, period: str) -> float | None:
+        """Vectorized equivalent of ``xbrl._pick_instant``."""
+        memo_key = ("instant", period)
+        by_year = self._memo.get(memo_key)
+        if by_year is None:
+            end_month = _QUARTER_END_MONTH[period]
+            by_year = self._resolve(self._has_end, self._end_month == end_month, period)
+            self._memo[memo_key] = by_year
+        return float(by_year[year]) if year in by_year else None
+
+
+class FactTable:
+    """A companyfacts payload flattened once into a columnar table."""
+
+    COLUMNS = ["tag", "unit", "pos", "start", "end", "end_year", "end_month", "days", "fp", "accn", "filed", "val"]
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.frame = frame
+        self._groups = {
+            key: group for key, group in frame.groupby(["tag", "unit"], sort=False)
+        }
+        self._views: dict[tuple[str, tuple[str, ...]], FactView] = {}
+
+    @classmethod
+    def from_companyfacts(
+        cls, facts: dict[str, Any], tags: Iterable[str] | None = None
+    ) -> "FactTable":
+        """Flatten the us-gaap section of a companyfacts payload.
+
+        ``tags`` limits flattening to the tags the caller will query; by default
+        every us-gaap tag is included.
+        """
+        gaap = facts.get("facts", {}).get("us-gaap", {})
+        wanted = gaap.keys() if tags is None else [t for t in dict.fromkeys(tags) if t in gaap]
+        cols: dict[str, list[Any]] = {c: [] for c in ("tag", "unit", "pos", "start", "end", "end_year", "end_month", "fp", "accn", "filed", "val")}
+        for tag in wanted:
+            for unit, rows in (gaap[tag] or {}).get("units", {}).items():
+                for pos, f in enumerate(rows):
+                    end, end_year, end_month = _date_parts(f.get("end"))
+                    cols["tag"].append(tag)
+                    cols["unit"].append(unit)
+                    cols["pos"].append(pos)
+                    cols["start"].append(_date_parts(f.get("start"))[0])
+                    cols["end"].append(end)
+                    cols["end_year"].append(end_year)
+                    cols["end_month"].append(end_month)
+                    cols["fp"].append(str(f.get("fp", "")))
+                    cols["accn"].append(str(f.get("accn", "")))
+                    cols["filed"].append(str(f.get("filed", "")))
+                    cols["val"].append(f.get("val"))
+
+        vals = cols.pop("val")
+        frame = pd.DataFrame(cols)
+        for col in ("pos", "start", "end", "end_year", "end_month"):
+            frame[col] = frame[col].astype(np.int64)
+        # Keep raw values untouched so conversion matches the scalar float(val).
+        frame["val"] = pd.Series(vals, index=frame.index, dtype=object)
+        frame["days"] = np.where(
+            (frame["start"] != _NO_DATE) & (frame["end"] != _NO_DATE),
+            frame["end"] - frame["start"],
+            np.iinfo(np.int64).min,
+        )
+        return cls(frame[cls.COLUMNS])
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def view(self, tag: str, unit_candidates: list[str] | None = None) -> FactView:
+        """Return the (memoized) facts for ``tag`` across ``unit_candidates``."""
+        units = tuple(unit_candidates) if unit_candidates is not None else ("USD",)
+        key = (tag, units)
+        view = self._views.get(key)
+        if view is None:
+            parts = []
+            offset = 0
+            for unit in units:
+                group = self._groups.get((tag, unit))
+                if group is None:
+                    continue
+                part = group.copy()
+                # Candidate-list position: units in order, then source order.
+                part["pos"] = part["pos"] + offset
+                offset += len(group)
+                parts.append(part)
+            frame = pd.concat(parts, ignore_index=True) if parts else self.frame.iloc[0:0]
+            view = FactView(frame)
+            self._views[key] = view
+        return view
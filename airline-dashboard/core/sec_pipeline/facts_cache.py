@@ -0,0 +1,125 @@
+"""Tag-pruned companyfacts ingest backed by a compact on-disk cache.
+
+A companyfacts payload carries thousands of us-gaap tags, of which ``xbrl.py``
+reads a few dozen. ``load_company_facts`` parses the raw JSON body event by
+event as it streams off the connection (or out of the bulk zip) and keeps only
+the requested tags. Neither the body nor the full decoded payload is ever in
+memory; peak memory is the pruned tags. The pruned payload keeps the
+companyfacts shape, which means every consumer of
+``EdgarClient.company_facts`` can use it unchanged.
+
+Pruned payloads are cached as zlib-compressed pickles under
+``.cache/facts/``, keyed by CIK and the tag set. Each entry keeps the HTTP
+validator (ETag or Last-Modified) of the body it came from. The next load
+revalidates with it, and an unchanged payload comes back as a body-less 304
+and loads without any download or JSON parsing.
+
+Incremental parsing uses the optional ``ijson`` package. Without it, the body
+is decoded with ``json`` and pruned afterwards, which gives the same result at
+a higher peak memory cost.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import pickle
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable
+
+from . import config
+from .edgar_client import EdgarClient
+from .xbrl import XBRL_TAGS
+
+log = logging.getLogger("facts_cache")
+
+FACTS_CACHE_DIR = config.CACHE_DIR / "facts"
+
+# Bump when the cached payload layout changes.
+_CACHE_FORMAT = 2
+
+
+def prune_company_facts(stream: BinaryIO, tags: Iterable[str]) -> dict[str, Any]:
+    """Parse a companyfacts JSON body, keeping only the us-gaap ``tags``."""
+    wanted = set(tags)
+    try:
+        import ijson
+    except ImportError:
+        gaap = json.load(stream).get("facts", {}).get("us-gaap", {})
+        return {"facts": {"us-gaap": {t: node for t, node in gaap.items() if t in wanted}}}
+
+    # Only one tag's subtree is materialized at a time; unwanted ones are
+    # dropped immediately.
+    pruned = {
+        tag: node
+        for tag, node in ijson.kvitems(stream, "facts.us-gaap", use_float=True)
+        if tag in wanted
+    }
+    return {"facts": {"us-gaap": pruned}}
+
+
+def _tag_key(tags: Iterable[str]) -> str:
+    digest = hashlib.blake2b(f"v{_CACHE_FORMAT}|".encode(), digest_size=16)
+    digest.update("\n".join(sorted(set(tags))).encode())
+    return digest.hexdigest()
+
+
+class PrunedFactsCache:
+    """Compressed pickles of pruned companyfacts, one current entry per CIK.
+
+    An entry is ``(validators, facts)``: the conditional request headers of
+    the body ``facts`` was pruned from, and the pruned payload.
+    """
+
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = root or FACTS_CACHE_DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, cik10: str, tags: Iterable[str]) -> Path:
+        return self.root / f"CIK{cik10}-{_tag_key(tags)}.pkl.z"
+
+    def get(self, cik10: str, tags: Iterable[str]) -> tuple[dict[str, str], dict[str, Any]] | None:
+        path = self._path(cik10, tags)
+        if not path.exists():
+            return None
+        try:
+            return pickle.loads(zlib.decompress(path.read_bytes()))
+        except Exception as exc:  # noqa: BLE001 - a corrupt entry is a cache miss
+            log.warning("Discarding unreadable facts cache %s: %s", path.name, exc)
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(
+        self, cik10: str, tags: Iterable[str], validators: dict[str, str], facts: dict[str, Any]
+    ) -> None:
+        path = self._path(cik10, tags)
+        # Entries for other tag sets of this CIK are superseded.
+        for stale in self.root.glob(f"CIK{cik10}-*.pkl.z"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        entry = (validators, facts)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL), 6))
+        tmp.replace(path)
+
+
+def load_company_facts(
+    client: EdgarClient,
+    cik: str,
+    tags: Iterable[str] = XBRL_TAGS,
+    cache: PrunedFactsCache | None = None,
+) -> dict[str, Any]:
+    """Return a companyfacts payload pruned to ``tags``, using the cache."""
+    tags = tuple(tags)
+    cache = cache or PrunedFactsCache()
+    cik10 = EdgarClient.normalize_cik(cik)
+    cached = cache.get(cik10, tags)
+    validators = cached[0] if cached is not None else None
+    with client.open_company_facts(cik10, validators) as (current, stream):
+        if stream is None:
+            return cached[1]
+        facts = prune_company_facts(stream, tags)
+    cache.put(cik10, tags, current, facts)
+    return facts
@@ -0,0 +1,84 @@
+"""Cross-company XBRL ingestion through the SEC ``frames`` API.
+
+Companyfacts costs one request per filer, so coverage grows linearly with the
+number of companies tracked. A frame returns one tag for one calendar period
+across *every* filer, so the request count depends only on the tags and years
+requested. ``load_frames_facts`` pulls every candidate tag the extractor reads
+for each calendar frame of the requested years. It then pivots the rows into
+one companyfacts-shaped payload per CIK, which ``extract_financials`` consumes
+unchanged.
+
+Frames are SEC's de-duplicated, calendar-aligned view. Each filer contributes at
+most one fact per frame, and facts carry no fiscal-period labels, filing dates,
+or year-to-date durations. The ``fp`` label is inferred from the frame name.
+Metrics that some filers report only year-to-date in Q2/Q3 (cash flow, CapEx)
+therefore resolve only where a discrete quarter fact exists.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Iterable
+
+from .edgar_client import EdgarClient
+from .xbrl import (
+    DURATION_METRICS,
+    EPS_SHARE_TAGS,
+    EPS_SHARE_UNIT_CANDIDATES,
+    INSTANT_METRICS,
+    METRIC_UNIT_CANDIDATES,
+    XBRL_TAGS,
+)
+
+log = logging.getLogger("frames")
+
+_INSTANT_TAGS = {tag for tags in INSTANT_METRICS.values() for tag in tags}
+_EPS_TAGS = set(DURATION_METRICS["Earnings Per Share"])
+
+
+def _tag_units(tag: str) -> list[str]:
+    """Units the extractor reads for ``tag``."""
+    if tag in EPS_SHARE_TAGS:
+        return EPS_SHARE_UNIT_CANDIDATES
+    if tag in _EPS_TAGS:
+        return METRIC_UNIT_CANDIDATES["Earnings Per Share"]
+    return ["USD"]
+
+
+def frame_names(year: int, instant: bool) -> list[tuple[str, str]]:
+    """``(frame, fp)`` pairs covering one calendar year."""
+    if instant:
+        return [(f"CY{year}Q{q}I", f"Q{q}") for q in range(1, 5)]
+    return [(f"CY{year}Q{q}", f"Q{q}") for q in range(1, 5)] + [(f"CY{year}", "FY")]
+
+
+def load_frames_facts(
+    client: EdgarClient,
+    ciks: Iterable[str],
+    years: Iterable[int],
+    tags: Iterable[str] = XBRL_TAGS,
+) -> dict[str, dict[str, Any]]:
+    """Return ``{cik10: companyfacts-shaped payload}`` built from frames."""
+    wanted = {EdgarClient.normalize_cik(c) for c in ciks}
+    payloads: dict[str, dict[str, Any]] = {
+        cik: {"facts": {"us-gaap": {}}} for cik in wanted
+    }
+    for tag in dict.fromkeys(tags):
+        instant = tag in _INSTANT_TAGS
+        for unit in _tag_units(tag):
+            for year in years:
+                for frame, fp in frame_names(year, instant):
+                    try:
+                        rows = client.frame(tag, unit, frame)
+                    except Exception as exc:  # noqa: BLE001 - one bad frame is not fatal
+                        log.warning("Skipping frame %s %s %s: %s", tag, unit, frame, exc)
+                        continue
+                    for row in rows:
+                        cik = EdgarClient.normalize_cik(row.get("cik", 0))
+                        if cik not in wanted:
+                            continue
+                        fact = {k: row[k] for k in ("start", "end", "val", "accn") if k in row}
+                        fact.update({"fy": year, "fp": fp, "frame": frame})
+                        units = payloads[cik]["facts"]["us-gaap"].setdefault(tag, {"units": {}})
+                        units["units"].setdefault(unit, []).append(fact)
+    return payloads
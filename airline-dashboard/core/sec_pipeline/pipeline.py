@@ -10,14 +10,34 @@ from __future__ import annotations
 import argparse
 import json
 import logging
-from typing import Iterable
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from functools import partial
+from typing import Any, Container, Iterable, Iterator
 
 from . import config
-from .chunk import chunk_text
-from .edgar_client import EdgarClient
-from .embed import Chunk, build_collection, get_embedder
+from .async_client import iter_documents, with_exhibits
+from .chunk import chunk_spans
+from .dedup import Deduplicator, dedup_chunks
+from .edgar_client import EdgarClient, Filing
+from .embed import (
+    Chunk,
+    collection_for,
+    collection_size,
+    delete_documents,
+    filing_ts,
+    filing_window,
+    get_embedder,
+    index_chunks,
+    indexed_documents,
+    update_metadata,
+)
 from .parse import document_to_text
+from .sections import Section, segment, select
 from .summarize import summarize_period
+from .text_cache import ParsedTextCache
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 log = logging.getLogger("sec_pipeline")
@@ -45,32 +65,264 @@ def _store_summary(summaries: dict, airline: str, spec: config.PeriodSpec, text:
     summaries.setdefault(airline, {}).setdefault(str(spec.year), {})[spec.period] = text
 
 
-def build_period_chunks(
-    client: EdgarClient, cik: str, spec: config.PeriodSpec
-) -> list[Chunk]:
-    """Download and chunk every relevant filing for one airline-period."""
+def pending_keys(
+    airlines: Iterable[str], specs: Iterable[config.PeriodSpec], overwrite: bool = False
+) -> list[tuple[str, config.PeriodSpec]]:
+    """(airline, period) keys ``run`` would summarize, skipping summarized ones."""
+    summaries = _load_summaries()
+    specs = list(specs)
+    return [
+        (airline, spec)
+        for airline in airlines
+        for spec in specs
+        if overwrite or not _has_summary(summaries, airline, spec)
+    ]
+
+
+# (Item name or None, start, end, tokens) of one chunk of a parsed document.
+Piece = tuple[str | None, int, int, int]
+
+
+def _section_chunks(text: str, form: str) -> tuple[list[Piece], dict[str, int]]:
+    """Chunk the Items of ``text`` that the section filter keeps.
+
+    Returns chunk spans in document order, with an Item name of None for
+    unsegmented text, and the characters dropped per Item.
+    """
+    if config.SECTIONS_ENABLED:
+        sections, dropped = select(segment(text, form))
+    else:
+        sections, dropped = [Section(None, 0, len(text))], {}
+    return [(s.item, *span) for s in sections for span in chunk_spans(text, s.start, s.end)], dropped
+
+
+def _parse_and_chunk(
+    content: bytes, primary_document: str, form: str
+) -> tuple[str, list[Piece], dict[str, int]]:
+    """Parse one document and chunk its kept Items (runs in a parse worker)."""
+    text = document_to_text(content, primary_document)
+    return (text, *_section_chunks(text, form))
+
+
+def period_filings(client: EdgarClient, cik: str, spec: config.PeriodSpec) -> list[Filing]:
+    """Documents of the relevant filings in ``spec``'s window, exhibits included."""
     start, end = spec.date_window()
-    filings = client.filings_in_window(cik, start, end, config.RELEVANT_FORMS)
-    chunks: list[Chunk] = []
+    return with_exhibits(
+        client, cik, client.filings_in_window(cik, start, end, config.RELEVANT_FORMS)
+    )
+
+
+def _earnings_release(filings: list[Filing], spec: config.PeriodSpec) -> Filing | None:
+    """The press release reporting ``spec``'s results, if ``filings`` hold one.
+
+    That is an EX-99 exhibit of an 8-K under Item 2.02 (Results of Operations)
+    filed after the period closed; releases for the prior period fall inside
+    the same window before it.
+    """
     for filing in filings:
+        if (
+            filing.document_type.startswith("EX-99")
+            and "2.02" in filing.item_numbers
+            and filing.filing_date > spec.period_end
+        ):
+            return filing
+    return None
+
+
+def period_filter(spec: config.PeriodSpec, release: Filing | None = None) -> dict[str, Any]:
+    """Chroma ``where`` filter for the chunks retrieval uses for ``spec``.
+
+    That is every chunk filed in the period's window. When ``release`` (the
+    period's earnings release) is set, the financial statements Item of
+    periodic reports filed after the period closed is left out: the release
+    carries the same results. Only 10-K and 10-Q chunks carry that Item. The
+    preference is applied here rather than when indexing, so a filing's stored
+    chunks do not depend on which period indexed it first.
+    """
+    window = filing_window(*spec.date_window())
+    if release is None:
+        return window
+    statements = {
+        "$or": [
+            {"item": {"$ne": "financial_statements"}},
+            {"filing_ts": {"$lte": filing_ts(spec.period_end)}},
+        ]
+    }
+    return {"$and": [*window["$and"], statements]}
+
+
+def parse_pool(workers: int | None = None) -> ProcessPoolExecutor | None:
+    """A process pool for ``iter_period_chunks``, or None to parse in-process.
+
+    ``workers`` defaults to ``config.PARSE_WORKERS`` (0 = one per CPU).
+    """
+    workers = workers if workers is not None else config.PARSE_WORKERS
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context(config.MP_START_METHOD)
+    )
+
+
+def _filing_chunks(filing: Filing, result: tuple[str, list[Piece]] | BaseException) -> Iterator[Chunk]:
+    """Chunks of one parsed filing document, or a warning if it failed."""
+    if isinstance(result, BaseException):
+        log.warning("Skipping %s %s: %s", filing.form, filing.accession, result)
+        return
+    metadata = {
+        "form": filing.form,
+        "accession": filing.accession,
+        "document": filing.primary_document,
+        "filing_date": filing.filing_date.strftime("%Y-%m-%d"),
+        "filing_ts": filing_ts(filing.filing_date),
+    }
+    if filing.document_type:
+        metadata["exhibit"] = filing.document_type
+    text, pieces = result
+    for item, start, end, tokens in pieces:
+        meta = {**metadata, "tokens": tokens}
+        if item is not None:
+            meta["item"] = item
+        yield Chunk(text=text[start:end], metadata=meta)
+
+
+def iter_period_chunks(
+    client: EdgarClient,
+    cik: str,
+    spec: config.PeriodSpec,
+    pool: ProcessPoolExecutor | None = None,
+    ordered: bool = False,
+    skip: Container[tuple[str, str]] = (),
+    filings: list[Filing] | None = None,
+) -> Iterator[Chunk]:
+    """Download and chunk every relevant filing for one airline-period, as a stream.
+
+    Each filing brings the exhibits ``config.FORM_EXHIBITS`` lists for its
+    form, such as an 8-K's EX-99.1 press release. Parsed text is read from the
+    text cache first. The remaining documents are downloaded concurrently, and
+    each is handed to a parse worker as soon as it arrives. Pass a ``pool``
+    from ``parse_pool`` to reuse workers across periods; without one, a
+    temporary pool is started when several documents need parsing. 10-K and
+    10-Q chunks carry the Item they came from, and Items the section filter
+    denies are not chunked. ``filings`` defaults to ``period_filings``; pass
+    it when the caller has already listed them.
+
+    A filing's chunks are yielded as soon as it is parsed, in completion order
+    unless ``ordered`` is set. At most ``config.STREAM_BUFFER`` documents are
+    downloaded or parsing ahead of the consumer, so memory stays flat however
+    many filings the window holds. ``ordered`` keeps filing order by holding
+    finished filings until the ones before them are done. Documents whose
+    ``(accession, document)`` is in ``skip`` (already indexed) are neither
+    downloaded nor parsed.
+    """
+    filings = period_filings(client, cik, spec) if filings is None else filings
+    if skip:
+        kept = [
+            i for i, filing in enumerate(filings)
+            if (filing.accession, filing.primary_document) not in skip
+        ]
+        if len(kept) < len(filings):
+            log.info("Already indexed: %d of %d filing documents", len(filings) - len(kept), len(filings))
+        filings = [filings[i] for i in kept]
+    cache = ParsedTextCache() if config.TEXT_CACHE_ENABLED else None
+    limit = config.STREAM_BUFFER or 2 * (os.cpu_count() or 1)
+    dropped: Counter[str] = Counter()
+    finished: dict[int, tuple[str, list[Piece]] | BaseException] = {}
+    following = 0  # next filing to yield when ordered
+
+    def ready(i: int, result: tuple[str, list[Piece]] | BaseException) -> Iterator[Chunk]:
+        nonlocal following
+        if not ordered:
+            yield from _filing_chunks(filings[i], result)
+            return
+        finished[i] = result
+        while following in finished:
+            yield from _filing_chunks(filings[following], finished.pop(following))
+            following += 1
+
+    def parsed(i: int, job: Any) -> tuple[str, list[Piece]] | BaseException:
         try:
-            content = client.fetch_document(cik, filing)
-            text = document_to_text(content, filing.primary_document)
-        except Exception as exc:  # noqa: BLE001 - log and continue on a bad doc
-            log.warning("Skipping %s %s: %s", filing.form, filing.accession, exc)
+            text, pieces, skipped = job.result() if isinstance(job, Future) else job()
+        except Exception as exc:  # noqa: BLE001 - reported with the filing's chunks
+            return exc
+        dropped.update(skipped)
+        if cache is not None:
+            cache.put(filings[i].accession, filings[i].primary_document, text)
+        return text, pieces
+
+    missing: list[int] = []
+    for i, filing in enumerate(filings):
+        cached = cache.get(filing.accession, filing.primary_document) if cache is not None else None
+        if cached is None:
+            missing.append(i)
             continue
-        for piece in chunk_text(text):
-            chunks.append(
-                Chunk(
-                    text=piece,
-                    metadata={
-                        "form": filing.form,
-                        "accession": filing.accession,
-                        "filing_date": filing.filing_date.strftime("%Y-%m-%d"),
-                    },
-                )
-            )
-    return chunks
+        pieces, skipped = _section_chunks(cached, filing.form)
+        dropped.update(skipped)
+        yield from ready(i, (cached, pieces))
+
+    own_pool = pool is None and len(missing) > 1
+    if own_pool:
+        pool = parse_pool()
+    downloads = iter_documents(client, cik, [filings[i] for i in missing], buffer=limit)
+    parsing: dict[Future, int] = {}
+    try:
+        for pos, content in downloads:
+            i = missing[pos]
+            args = (content, filings[i].primary_document, filings[i].form)
+            if isinstance(content, BaseException):
+                yield from ready(i, content)
+            elif pool is None:
+                yield from ready(i, parsed(i, partial(_parse_and_chunk, *args)))
+            else:
+                parsing[pool.submit(_parse_and_chunk, *args)] = i
+                # Backpressure: stop taking downloads while the workers are full.
+                while len(parsing) >= limit:
+                    done, _ = wait(parsing, return_when=FIRST_COMPLETED)
+                    for job in done:
+                        i = parsing.pop(job)
+                        yield from ready(i, parsed(i, job))
+        for job in as_completed(list(parsing)):
+            i = parsing.pop(job)
+            yield from ready(i, parsed(i, job))
+    finally:
+        downloads.close()
+        for job in parsing:
+            job.cancel()
+        if own_pool and pool is not None:
+            pool.shutdown()
+    if cache is not None and filings:
+        log.info("Parsed text: %d cached, %d parsed", len(filings) - len(missing), len(missing))
+    if dropped:
+        log.info(
+            "Items not embedded: %s",
+            ", ".join(f"{item} ({chars:,} chars)" for item, chars in dropped.most_common()),
+        )
+
+
+def build_period_chunks(
+    client: EdgarClient,
+    cik: str,
+    spec: config.PeriodSpec,
+    pool: ProcessPoolExecutor | None = None,
+) -> list[Chunk]:
+    """Every chunk of one airline-period as a list, in filing order.
+
+    The list form of ``iter_period_chunks``. Near-duplicate chunks, within and
+    across filings, are dropped before they are returned (see dedup.py).
+    """
+    chunks = list(iter_period_chunks(client, cik, spec, pool, ordered=True))
+    unique, dropped_chunks = dedup_chunks(chunks)
+    _log_dedup(dropped_chunks, len(chunks))
+    return unique
+
+
+def _log_dedup(dropped: int, total: int) -> None:
+    if dropped:
+        log.info(
+            "Near-duplicate filter: %d of %d chunks dropped (%d embeddings saved)",
+            dropped, total, dropped,
+        )
 
 
 def run(
@@ -78,34 +330,84 @@ def run(
     years: Iterable[int],
     periods: Iterable[str],
     overwrite: bool = False,
+    bulk_dir: str | None = None,
+    client: EdgarClient | None = None,
+    reindex: bool = False,
 ) -> dict:
-    """Run the pipeline for the given airlines/years/periods and persist results."""
-    client = EdgarClient()
+    """Run the pipeline for the given airlines/years/periods and persist results.
+
+    ``bulk_dir`` serves filing lists from a local ``submissions.zip``; filing
+    documents are still downloaded. A ``client`` passed in is shared with the
+    caller, which then reports its cache statistics. ``reindex`` deletes and
+    re-embeds the documents in each period's filing window (once per run), so
+    parsing, section filter and dedup changes reach filings indexed before;
+    it implies ``overwrite``.
+    """
+    overwrite = overwrite or reindex
+    owns_client = client is None
+    client = client or EdgarClient(bulk_dir=bulk_dir)
     ciks = client.resolve_ciks(list(airlines))
     embedder = get_embedder()
     summaries = _load_summaries()
     specs = config.build_periods(list(years), list(periods))
 
-    for airline in airlines:
-        cik = ciks[airline]
-        for spec in specs:
-            if not overwrite and _has_summary(summaries, airline, spec):
-                log.info("Skip %s %s (already summarized)", airline, spec.label)
-                continue
-            log.info("Processing %s %s", airline, spec.label)
-            chunks = build_period_chunks(client, cik, spec)
-            if not chunks:
-                log.warning("No filings found for %s %s", airline, spec.label)
-                continue
-            collection_name = f"{airline}{spec.label}".lower()
-            build_collection(collection_name, chunks, embedder)
-            try:
-                text = summarize_period(airline, spec.label, collection_name, embedder)
-            except Exception as exc:  # noqa: BLE001
-                log.error("Summarization failed for %s %s: %s", airline, spec.label, exc)
-                continue
-            _store_summary(summaries, airline, spec, text)
-            _save_summaries(summaries)  # persist incrementally
+    # One parse pool for every period of the run; workers start on first use.
+    pool = parse_pool()
+    try:
+        for airline in airlines:
+            cik = ciks[airline]
+            collection_name = collection_for(airline)
+            indexed: set[tuple[str, str]] | None = None
+            reindexed: set[tuple[str, str]] = set()  # documents this run re-embedded
+            for spec in specs:
+                if not overwrite and _has_summary(summaries, airline, spec):
+                    log.info("Skip %s %s (already summarized)", airline, spec.label)
+                    continue
+                log.info("Processing %s %s", airline, spec.label)
+                if indexed is None:
+                    indexed = indexed_documents(collection_name)
+                window = filing_window(*spec.date_window())
+                if reindex:
+                    indexed -= delete_documents(collection_name, window, keep=reindexed)
+                filings = period_filings(client, cik, spec)
+                release = _earnings_release(filings, spec) if config.PREFER_EARNINGS_RELEASE else None
+                if release is not None:
+                    log.info(
+                        "Earnings release %s (%s, filed %s) stands in for financial statements",
+                        release.primary_document, release.document_type,
+                        release.filing_date.strftime("%Y-%m-%d"),
+                    )
+                # Chunks are embedded batch by batch as filings finish parsing,
+                # and only for documents no earlier period has indexed. A
+                # document that failed adds nothing, so a later period retries it.
+                dedup = Deduplicator()
+                chunks = iter_period_chunks(client, cik, spec, pool, skip=indexed, filings=filings)
+                added = index_chunks(collection_name, dedup.filter(chunks), embedder)
+                indexed.update(added)
+                if reindex:
+                    reindexed.update(added)
+                # Chunks embedded before a later duplicate named its filing.
+                update_metadata(collection_name, dedup.merged.values())
+                _log_dedup(dedup.dropped, sum(added.values()) + dedup.dropped)
+                where = period_filter(spec, release)
+                if not collection_size(collection_name, where):
+                    log.warning("No filings found for %s %s", airline, spec.label)
+                    continue
+                try:
+                    text = summarize_period(airline, spec.label, collection_name, embedder, where=where)
+                except Exception as exc:  # noqa: BLE001
+                    log.error("Summarization failed for %s %s: %s", airline, spec.label, exc)
+                    continue
+                _store_summary(summaries, airline, spec, text)
+                _save_summaries(summaries)  # persist incrementally
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if owns_client:
+        client.log_cache_stats()
+    cache = getattr(embedder, "cache", None)
+    if cache is not None:
+        cache.log_stats()
     return summaries
 
 
@@ -115,8 +417,25 @@ def main() -> None:
     parser.add_argument("--years", nargs="+", type=int, required=True)
     parser.add_argument("--periods", nargs="+", default=list(config.QUARTERS))
     parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Delete and re-embed each period's filings; implies --overwrite.",
+    )
+    parser.add_argument(
+        "--bulk-dir",
+        default=None,
+        help="Directory holding SEC bulk submissions.zip for offline filing lists.",
+    )
     args = parser.parse_args()
-    run(args.airlines, args.years, args.periods, overwrite=args.overwrite)
+    run(
+        args.airlines,
+        args.years,
+        args.periods,
+        overwrite=args.overwrite,
+        bulk_dir=args.bulk_dir,
+        reindex=args.reindex,
+    )
 
 
 if __name__ == "__main__":
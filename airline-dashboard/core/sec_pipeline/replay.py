@@ -0,0 +1,277 @@
+"""Record EDGAR responses to a fixture directory and replay them offline.
+
+A fixture directory holds every response one run needed: submissions,
+companyfacts, and archive documents. It is laid out as::
+
+    <fixtures>/manifest.json            format version and one entry per path
+    <fixtures>/responses/<url path>.gz  gzip-compressed response bodies
+
+Responses are keyed by URL path alone. ``EdgarClient(base_url=...)`` maps both
+SEC hosts onto one server, and their paths do not overlap.
+
+* Recording: set ``client.recorder = FixtureRecorder(path)``. Every response
+  the client serves is then written to ``path``, whether it came from the
+  network, the HTTP cache, or the document store. ``record`` does this for the
+  filings and facts a build of some airlines and periods reads.
+* Replaying: ``ReplayServer(path)`` serves the recorded bodies over HTTP with
+  ETags, so conditional revalidation behaves as it does against SEC. Point a
+  client at it with ``base_url``, or set ``SEC_BASE_URL`` for whole runs. An
+  optional per-response latency stands in for the network in timing runs.
+
+The ticker map is not recorded. Replayed runs resolve CIKs from
+``AIRLINE_CIK_FALLBACK`` after the server answers 404.
+
+    python -m sec_pipeline.replay record --out fixtures/edgar-2024q2 --years 2024 --periods Q2
+    python -m sec_pipeline.replay serve --fixtures fixtures/edgar-2024q2 --port 8765
+    SEC_BASE_URL=http://127.0.0.1:8765 python -m scripts.build_data --years 2024 --periods Q2
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterable
+from urllib.parse import urlsplit
+
+from . import config
+from .edgar_client import EdgarClient
+
+log = logging.getLogger("replay")
+
+# Bump when the manifest or body layout changes; replay refuses other formats.
+FIXTURE_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def _url_path(url: str) -> str:
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def _load_manifest(root: Path) -> dict[str, Any]:
+    path = root / MANIFEST_NAME
+    if not path.exists():
+        return {"format": FIXTURE_FORMAT, "responses": {}}
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("format") != FIXTURE_FORMAT:
+        raise ValueError(
+            f"{path} has fixture format {manifest.get('format')!r}; expected {FIXTURE_FORMAT}"
+        )
+    return manifest
+
+
+class FixtureRecorder:
+    """Write each response a client serves into a fixture directory.
+
+    Recording into an existing directory adds to it; a path recorded again is
+    overwritten with the newer body.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._manifest = _load_manifest(self.root)
+        self._lock = threading.Lock()
+
+    def add(self, url: str, body: bytes, content_type: str | None = None) -> None:
+        path = _url_path(url)
+        target = self.root / "responses" / f"{path.lstrip('/')}.gz"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            # mtime=0 keeps re-recordings of unchanged bodies byte-identical.
+            fh.write(gzip.compress(body, compresslevel=9, mtime=0))
+        os.replace(tmp, target)
+        entry = {
+            "file": target.relative_to(self.root).as_posix(),
+            "content_type": content_type or "application/octet-stream",
+            "etag": f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            "size": len(body),
+        }
+        with self._lock:
+            self._manifest["responses"][path] = entry
+
+    def __len__(self) -> int:
+        return len(self._manifest["responses"])
+
+    def save(self) -> Path:
+        with self._lock:
+            self._manifest["format"] = FIXTURE_FORMAT
+            self._manifest["recorded"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self._manifest["responses"] = dict(sorted(self._manifest["responses"].items()))
+            payload = json.dumps(self._manifest, indent=2)
+        path = self.root / MANIFEST_NAME
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        tmp.replace(path)
+        return path
+
+
+def record(
+    root: str | Path,
+    airlines: Iterable[str],
+    years: Iterable[int],
+    periods: Iterable[str],
+    client: EdgarClient | None = None,
+    documents: bool = True,
+) -> Path:
+    """Record what a build of ``airlines`` x ``periods`` reads from EDGAR.
+
+    Captures each airline's companyfacts and submissions and, with
+    ``documents``, every filing document and index page
+    ``pipeline.build_period_chunks`` would read. Returns the manifest path.
+    """
+    from .async_client import fetch_documents, with_exhibits
+
+    client = client or EdgarClient()
+    ciks = client.resolve_ciks(list(airlines))
+    recorder = FixtureRecorder(root)
+    client.recorder = recorder
+    try:
+        specs = config.build_periods(list(years), list(periods))
+        for airline, cik in ciks.items():
+            log.info("Recording %s (CIK %s)", airline, cik)
+            client.company_facts_bytes(cik)
+            client.list_filings(cik)
+            if documents:
+                for spec in specs:
+                    start, end = spec.date_window()
+                    filings = client.filings_in_window(cik, start, end, config.RELEVANT_FORMS)
+                    fetch_documents(client, cik, with_exhibits(client, cik, filings))
+    finally:
+        client.recorder = None
+    log.info("Recorded %d responses into %s", len(recorder), recorder.root)
+    return recorder.save()
+
+
+class ReplayServer:
+    """Serve a fixture directory as a stand-in for both SEC hosts.
+
+    ``requests`` counts answers by ``(path, status)``; ``missing`` lists paths
+    that had no recording (answered 404). ``on_request``, if set, is called
+    with each path as its request arrives, before latency and the answer.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        on_request: Callable[[str], None] | None = None,
+    ) -> None:
+        self.root = Path(root)
+        self.responses: dict[str, dict[str, Any]] = _load_manifest(self.root)["responses"]
+        self.latency = latency
+        self.on_request = on_request
+        self.requests: Counter[tuple[str, int]] = Counter()
+        self.missing: list[str] = []
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802 - http.server API
+                if server.on_request is not None:
+                    server.on_request(self.path)
+                if server.latency:
+                    time.sleep(server.latency)
+                entry = server.responses.get(self.path)
+                if entry is None:
+                    server.missing.append(self.path)
+                    server.requests[(self.path, 404)] += 1
+                    self.send_error(404)
+                    return
+                if self.headers.get("If-None-Match") == entry["etag"]:
+                    server.requests[(self.path, 304)] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", entry["etag"])
+                    self.end_headers()
+                    return
+                body = (server.root / entry["file"]).read_bytes()
+                server.requests[(self.path, 200)] += 1
+                self.send_response(200)
+                self.send_header("Content-Type", entry["content_type"])
+                self.send_header("ETag", entry["etag"])
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    self.send_header("Content-Encoding", "gzip")
+                else:
+                    body = gzip.decompress(body)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_args):
+                pass
+
+        return Handler
+
+    def start(self) -> ReplayServer:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def __enter__(self) -> ReplayServer:
+        return self.start()
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record or replay EDGAR fixtures.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="Record the responses a build reads.")
+    rec.add_argument("--out", type=Path, required=True, help="Fixture directory to write.")
+    rec.add_argument("--airlines", nargs="+", default=list(config.AIRLINE_NAMES))
+    rec.add_argument("--years", nargs="+", type=int, required=True)
+    rec.add_argument("--periods", nargs="+", default=list(config.QUARTERS))
+    rec.add_argument("--no-documents", action="store_true", help="Skip filing documents (financials only).")
+    serve = sub.add_parser("serve", help="Serve a fixture directory over HTTP.")
+    serve.add_argument("--fixtures", type=Path, required=True)
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0, help="Seconds to delay each response.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.command == "record":
+        record(args.out, args.airlines, args.years, args.periods, documents=not args.no_documents)
+        return
+    server = ReplayServer(args.fixtures, args.host, args.port, args.latency)
+    log.info("Replaying %d responses at %s", len(server.responses), server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
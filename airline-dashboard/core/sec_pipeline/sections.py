@@ -0,0 +1,206 @@
+"""Split 10-K and 10-Q text into their numbered Items.
+
+Periodic reports are organized into Items fixed by Regulation S-K: Item 7
+(MD&A) of a 10-K, Part II Item 1A (Risk Factors) of a 10-Q, and so on. The
+retrieval queries in ``summarize.py`` only ever target a few of them. Risk
+factors, controls, and exhibit indexes are long, they repeat between
+filings, and they crowd useful passages out of retrieval. ``segment`` finds
+the Item headings in parsed text and names each section (``ITEMS_10K``,
+``ITEMS_10Q``). ``select`` then applies ``config.SECTION_ALLOW`` and
+``config.SECTION_DENY``.
+
+Headings are short lines such as ``Item 7. Management's Discussion...`` or
+``ITEM 1A.`` with the title on the next line. A heading can also appear in
+the table of contents and in cross-references such as "see Item 1A. Risk
+Factors". For each Item, ``segment`` keeps the occurrence followed by the most
+text before the next heading. It then keeps the run of those headings, in
+Item order, that spans the most text. Text that cannot be segmented
+plausibly is returned whole, as are 8-Ks and other forms, so nothing is
+dropped when segmentation fails.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable
+
+from . import config
+from .chunk import strip_span
+
+ITEMS_10K: dict[str, str] = {
+    "1": "business",
+    "1A": "risk_factors",
+    "1B": "unresolved_staff_comments",
+    "1C": "cybersecurity",
+    "2": "properties",
+    "3": "legal_proceedings",
+    "4": "mine_safety",
+    "5": "market_for_equity",
+    "6": "reserved",
+    "7": "mdna",
+    "7A": "market_risk",
+    "8": "financial_statements",
+    "9": "accountant_changes",
+    "9A": "controls",
+    "9B": "other_information",
+    "9C": "foreign_inspections",
+    "10": "directors_officers",
+    "11": "executive_compensation",
+    "12": "security_ownership",
+    "13": "related_transactions",
+    "14": "accountant_fees",
+    "15": "exhibits",
+    "16": "form_summary",
+}
+
+# 10-Q Item numbers restart in Part II, so they are keyed by part.
+ITEMS_10Q: dict[str, str] = {
+    "I-1": "financial_statements",
+    "I-2": "mdna",
+    "I-3": "market_risk",
+    "I-4": "controls",
+    "II-1": "legal_proceedings",
+    "II-1A": "risk_factors",
+    "II-2": "unregistered_sales",
+    "II-3": "defaults",
+    "II-4": "mine_safety",
+    "II-5": "other_information",
+    "II-6": "exhibits",
+}
+
+# Name of the text before the first Item: cover page, contents, glossary, and
+# the forward-looking statements notice.
+COVER = "cover"
+
+# A section must hold this many characters to count toward a plausible
+# segmentation; table-of-contents entries are far shorter.
+MIN_SECTION_CHARS = 500
+
+_MAX_HEADING_CHARS = 150
+_PART_RE = re.compile(r"^part\s+(iv|i{1,3})\b", re.IGNORECASE)
+_ITEM_RE = re.compile(
+    r"^(?:part\s+(iv|i{1,3})\s*[,.:—–-]?\s*)?"
+    r"item\s+(\d{1,2}[a-c]?)(?![\w,]|\.\d)\s*[.:—–-]?",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class Section:
+    """A named ``[start, end)`` span of a filing's text.
+
+    ``item`` is None when the text is unsegmented.
+    """
+
+    item: str | None
+    start: int
+    end: int
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+
+def _items_for(form: str) -> tuple[dict[str, str], bool] | None:
+    base = form.upper().split("/")[0]
+    if base.startswith("10-K"):
+        return ITEMS_10K, False
+    if base.startswith("10-Q"):
+        return ITEMS_10Q, True
+    return None
+
+
+def _headings(text: str, items: dict[str, str], by_part: bool) -> list[tuple[int, str]]:
+    """(offset, Item key) for every heading-shaped line naming a known Item."""
+    found: list[tuple[int, str]] = []
+    part = "I"
+    offset = 0
+    for line in text.split("\n"):
+        if len(line) <= _MAX_HEADING_CHARS:
+            item = _ITEM_RE.match(line)
+            if item:
+                # "Part II, Item 1A" names its own part without starting it.
+                item_part = (item.group(1) or part).upper()
+                number = item.group(2).upper()
+                key = f"{item_part}-{number}" if by_part else number
+                if key in items:
+                    found.append((offset, key))
+            else:
+                heading = _PART_RE.match(line)
+                if heading:
+                    part = heading.group(1).upper()
+        offset += len(line) + 1
+    return found
+
+
+def segment(text: str, form: str) -> list[Section]:
+    """Split ``text`` of a ``form`` filing into named Item sections.
+
+    Returns ``[Section(None, 0, len(text))]`` for forms without Items and for
+    text where fewer than two Items of ``MIN_SECTION_CHARS`` could be found.
+    """
+    whole = [Section(None, 0, len(text))]
+    spec = _items_for(form)
+    if spec is None or not text:
+        return whole
+    items, by_part = spec
+    found = _headings(text, items, by_part)
+    if not found:
+        return whole
+
+    # Longest span per Item: body headings beat contents entries and most
+    # cross-references.
+    best: dict[str, tuple[int, int]] = {}
+    for n, (start, key) in enumerate(found):
+        span = (found[n + 1][0] if n + 1 < len(found) else len(text)) - start
+        if key not in best or span > best[key][1]:
+            best[key] = (start, span)
+    # Of those, keep the run in Item order that spans the most text, so a
+    # stray contents entry cannot knock out the body headings after it.
+    order = {key: n for n, key in enumerate(items)}
+    candidates = sorted((start, key, span) for key, (start, span) in best.items())
+    total = [span for _, _, span in candidates]
+    prev: list[int | None] = [None] * len(candidates)
+    for j, (_, key, span) in enumerate(candidates):
+        for i in range(j):
+            if order[candidates[i][1]] < order[key] and total[i] + span > total[j]:
+                total[j], prev[j] = total[i] + span, i
+    last: int | None = max(range(len(candidates)), key=total.__getitem__)
+    chosen: list[tuple[int, str]] = []
+    while last is not None:
+        chosen.append(candidates[last][:2])
+        last = prev[last]
+    chosen.reverse()
+
+    bounds = [(COVER, 0)] + [(items[key], start) for start, key in chosen] + [(None, len(text))]
+    sections = [
+        Section(name, *strip_span(text, start, stop))
+        for (name, start), (_, stop) in zip(bounds, bounds[1:])
+    ]
+    if sum(len(s) >= MIN_SECTION_CHARS for s in sections[1:]) < 2:
+        return whole
+    return [s for s in sections if len(s)]
+
+
+def select(
+    sections: Iterable[Section],
+    allow: Iterable[str] | None = None,
+    deny: Iterable[str] | None = None,
+) -> tuple[list[Section], dict[str, int]]:
+    """Keep the sections to embed; also return dropped characters per Item.
+
+    ``allow`` and ``deny`` default to ``config.SECTION_ALLOW`` and
+    ``config.SECTION_DENY``. A non-empty ``allow`` keeps only the Items it
+    names. Unsegmented text is always kept.
+    """
+    allow = {name.lower() for name in (config.SECTION_ALLOW if allow is None else allow)}
+    deny = {name.lower() for name in (config.SECTION_DENY if deny is None else deny)}
+    kept: list[Section] = []
+    dropped: dict[str, int] = {}
+    for section in sections:
+        name = section.item
+        if name is not None and (name in deny or (allow and name not in allow)):
+            dropped[name] = dropped.get(name, 0) + len(section)
+        else:
+            kept.append(section)
+    return kept, dropped
@@ -2,16 +2,20 @@
 
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import Callable
+from typing import Any
 
 from . import config
+from .chunk import token_counter
 from .embed import EmbeddingFn, collection_size, retrieve_passages
 
 # Approximate token budget for the retrieved context. Keeps requests well within
 # the model's window while covering the period, and bounds latency and cost.
 MAX_CONTEXT_TOKENS = 30_000
 
+# Allowance for each excerpt's source tag and separators, e.g.
+# "[10-Q filed 2024-07-25]" (about 12 tokens).
+TAG_TOKENS = 16
+
 # Bound on generated tokens so output length (and cost) stays predictable.
 MAX_OUTPUT_TOKENS = 1_800
 
@@ -26,22 +30,6 @@ SYSTEM_PROMPT = (
 )
 
 
-@lru_cache(maxsize=1)
-def _token_counter() -> Callable[[str], int]:
-    """Return a token-counting function, using ``tiktoken`` when available."""
-    try:
-        import tiktoken
-
-        try:
-            enc = tiktoken.encoding_for_model(config.OPENAI_CHAT_MODEL)
-        except Exception:
-            enc = tiktoken.get_encoding("o200k_base")
-        return lambda s: len(enc.encode(s))
-    except Exception:
-        # Rough fallback: ~4 characters per token.
-        return lambda s: max(1, len(s) // 4)
-
-
 def _retrieval_queries(airline: str, name: str, label: str) -> list[str]:
     """Build several targeted queries spanning the reported topic areas."""
     spec = config.PeriodSpec.from_label(label)
@@ -67,13 +55,22 @@ def _source_tag(meta: dict) -> str:
 
 
 def _build_context(passages: list[tuple[str, dict]]) -> str:
-    """Assemble tagged excerpts up to the token budget, in relevance order."""
-    count = _token_counter()
+    """Assemble tagged excerpts up to the token budget, in relevance order.
+
+    Chunk sizes come from the ``tokens`` metadata written at chunking time;
+    only passages from collections built before it are counted here, and the
+    tokenizer is loaded only when one turns up.
+    """
+    count = None
     blocks: list[str] = []
     used = 0
     for text, meta in passages:
         block = f"{_source_tag(meta)}\n{text}"
-        tokens = count(block)
+        if "tokens" in meta:
+            tokens = TAG_TOKENS + meta["tokens"]
+        else:
+            count = count or token_counter()
+            tokens = TAG_TOKENS + count(text)
         if blocks and used + tokens > MAX_CONTEXT_TOKENS:
             break
         blocks.append(block)
@@ -103,8 +100,13 @@ def summarize_period(
     collection_name: str,
     embedder: EmbeddingFn,
     per_query_k: int | None = None,
+    where: dict[str, Any] | None = None,
 ) -> str:
-    """Retrieve the most relevant filing text and generate a markdown summary."""
+    """Retrieve the most relevant filing text and generate a markdown summary.
+
+    ``where`` scopes retrieval to the period's chunks of a shared collection,
+    as built by ``embed.filing_window``.
+    """
     from openai import OpenAI
 
     name = config.AIRLINE_NAMES.get(airline, airline)
@@ -112,8 +114,8 @@ def summarize_period(
     if per_query_k is None:
         # A moderate per-query depth; the token budget below is the real cap on
         # how much context reaches the model after de-duplication.
-        per_query_k = max(1, 30 + int(0.02 * collection_size(collection_name)))
-    passages = retrieve_passages(collection_name, queries, embedder, k=per_query_k)
+        per_query_k = max(1, 30 + int(0.02 * collection_size(collection_name, where)))
+    passages = retrieve_passages(collection_name, queries, embedder, k=per_query_k, where=where)
     if not passages:
         raise ValueError(f"No indexed content found for {collection_name}")
     context = _build_context(passages)
@@ -0,0 +1,73 @@
+"""Cache of cleaned filing text keyed by accession and parser version.
+
+Adjacent periods select overlapping filings. The Q4 window (October to
+January) and the FY window (January to February of the next year) share the
+10-K, and ``--overwrite`` reruns select everything again. Without a cache,
+``document_to_text`` would re-parse identical documents each time. The cache
+keeps the parsed text of each ``(accession, document)``, zlib-compressed,
+under ``.cache/text/<parser version>/``.
+
+The parser version is a hash of ``parse.py`` and ``config.PDF_MAX_PAGES``,
+which caps the text kept from a PDF. Any change to the parsing logic or the
+page cap therefore starts a fresh directory, and directories of other versions
+are removed when the cache is opened. The HTML backends produce identical
+text, so the backend in use is not part of the key.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import shutil
+import zlib
+from functools import lru_cache
+from pathlib import Path
+
+from . import config
+
+log = logging.getLogger("text_cache")
+
+
+@lru_cache(maxsize=1)
+def _parser_source() -> bytes:
+    return (Path(__file__).parent / "parse.py").read_bytes()
+
+
+def parser_version() -> str:
+    """Hash of the parsing source and PDF page cap; cached text is stale when either changes."""
+    return hashlib.blake2b(
+        _parser_source() + f"\0pdf_max_pages={config.PDF_MAX_PAGES}".encode(), digest_size=8
+    ).hexdigest()
+
+
+class ParsedTextCache:
+    """Compressed parsed text per filing document for the current parser."""
+
+    def __init__(self, root: Path | None = None) -> None:
+        base = Path(root or config.CACHE_DIR / "text")
+        self.root = base / parser_version()
+        self.root.mkdir(parents=True, exist_ok=True)
+        for stale in base.iterdir():
+            if stale.is_dir() and stale != self.root:
+                shutil.rmtree(stale, ignore_errors=True)
+
+    def _path(self, accession: str, document: str) -> Path:
+        return self.root / accession / f"{document}.txt.z"
+
+    def get(self, accession: str, document: str) -> str | None:
+        path = self._path(accession, document)
+        if not path.exists():
+            return None
+        try:
+            return zlib.decompress(path.read_bytes()).decode("utf-8")
+        except Exception as exc:  # noqa: BLE001 - a corrupt entry is a cache miss
+            log.warning("Discarding unreadable text cache %s: %s", path, exc)
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, accession: str, document: str, text: str) -> None:
+        path = self._path(accession, document)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(zlib.compress(text.encode("utf-8"), 6))
+        tmp.replace(path)
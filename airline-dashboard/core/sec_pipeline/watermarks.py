@@ -0,0 +1,191 @@
+"""Per-CIK accession watermarks for incremental XBRL extraction.
+
+A full build re-extracts every requested (year, period) even when a filer has
+submitted nothing since the last run. The watermark records the latest
+``filed`` date incorporated for each CIK, together with the accessions filed
+on that date. It also keeps the auto records extracted under it. On the next
+run only facts past the watermark count as new. Only the periods those facts
+can influence are re-extracted; every other period reuses its stored record.
+
+A fact influences the periods ending in its calendar month, plus those matching
+its ``fp`` label when ``XBRL_ENABLE_FP_FALLBACK`` is on. Derived values add
+downstream periods: YTD-derived quarters subtract earlier quarters, and Q4 is
+FY less Q1-Q3. A change to any quarter therefore also touches the later
+quarters of that year, and a change to FY touches Q4. Stored records of
+touched periods outside the requested slice are dropped when the watermark
+advances, so they are re-extracted the next time they are requested.
+
+Facts that SEC backfills with a filing date *before* the watermark are not
+detected. A non-incremental build re-extracts everything. Stored records are
+discarded whenever the extractor source, ``XBRL_ENGINE`` or
+``XBRL_ENABLE_FP_FALLBACK`` changes. The state is internal, so it lives under
+``config.CACHE_DIR`` rather than next to the published datasets.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterable
+
+from . import config
+from .fact_table import FactTable
+from .xbrl import _QUARTER_END_MONTH, _fp_candidates, XBRL_TAGS, extract_financials
+
+log = logging.getLogger("watermarks")
+
+WATERMARKS_PATH = config.CACHE_DIR / "xbrl_watermarks.json"
+
+# Periods whose extracted value reads facts of the keyed period.
+_DOWNSTREAM = {
+    "Q1": ("Q2", "Q3", "Q4"),
+    "Q2": ("Q3", "Q4"),
+    "Q3": ("Q4",),
+    "Q4": (),
+    "FY": ("Q4",),
+}
+
+
+def _extractor_version() -> str:
+    """Hash of the extraction sources and settings; stored records are stale when it changes."""
+    digest = hashlib.blake2b(digest_size=8)
+    for module in ("xbrl.py", "fact_table.py"):
+        digest.update((Path(__file__).parent / module).read_bytes())
+    digest.update(
+        f"\0engine={config.XBRL_ENGINE}\0fp_fallback={config.XBRL_ENABLE_FP_FALLBACK}".encode()
+    )
+    return digest.hexdigest()
+
+
+def _period_key(year: int, period: str) -> str:
+    return f"{year}{period}"
+
+
+def _iter_facts(facts: dict[str, Any]) -> Iterable[dict[str, Any]]:
+    for node in facts.get("facts", {}).get("us-gaap", {}).values():
+        for unit_facts in (node or {}).get("units", {}).values():
+            yield from unit_facts
+
+
+def touched_periods(fact: dict[str, Any]) -> set[tuple[int, str]]:
+    """``(year, period)`` keys whose extracted value ``fact`` can change."""
+    end = str(fact.get("end", ""))
+    try:
+        year, month = int(end[:4]), int(end[5:7])
+    except ValueError:
+        return set()
+    direct = {p for p, m in _QUARTER_END_MONTH.items() if m == month}
+    if config.XBRL_ENABLE_FP_FALLBACK:
+        fp = str(fact.get("fp", ""))
+        direct |= {p for p in config.QUARTERS if fp in _fp_candidates(p)}
+    touched = set(direct)
+    for period in direct:
+        touched.update(_DOWNSTREAM[period])
+    return {(year, period) for period in touched}
+
+
+def extract_periods(
+    facts: dict[str, Any] | FactTable, keys: Iterable[tuple[int, str]]
+) -> list[dict[str, Any]]:
+    """``extract_financials`` over an arbitrary set of ``(year, period)`` keys."""
+    keys = list(keys)
+    if not keys:
+        return []
+    if config.XBRL_ENGINE == "columnar" and not isinstance(facts, FactTable):
+        facts = FactTable.from_companyfacts(facts, XBRL_TAGS)
+    records: list[dict[str, Any]] = []
+    for year, period in keys:
+        records.extend(extract_financials(facts, [year], [period]))
+    return records
+
+
+class Watermarks:
+    """JSON-persisted watermark and extracted records per CIK."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or WATERMARKS_PATH
+        self.version = _extractor_version()
+        state: dict[str, Any] = {}
+        if self.path.exists():
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        if state.get("extractor") != self.version:
+            if state:
+                log.info("Extractor changed since %s was written; re-extracting", self.path.name)
+            state = {"extractor": self.version, "ciks": {}}
+        self._state = state
+
+    def _entry(self, cik: str) -> dict[str, Any]:
+        return self._state["ciks"].get(cik, {"filed": "", "accns": [], "records": {}})
+
+    @staticmethod
+    def _touched(entry: dict[str, Any], facts: dict[str, Any]) -> set[tuple[int, str]]:
+        """Keys touched by facts filed past ``entry``'s watermark."""
+        mark, seen = entry["filed"], set(entry["accns"])
+        touched: set[tuple[int, str]] = set()
+        for fact in _iter_facts(facts):
+            filed = str(fact.get("filed", ""))
+            if filed > mark or (filed == mark and fact.get("accn") not in seen):
+                touched |= touched_periods(fact)
+        return touched
+
+    def stale_periods(
+        self, cik: str, facts: dict[str, Any], years: list[int], periods: list[str]
+    ) -> list[tuple[int, str]]:
+        """Requested keys to re-extract: never extracted, or touched by new facts."""
+        entry = self._entry(cik)
+        touched = self._touched(entry, facts)
+        return [
+            (year, period)
+            for year in years
+            for period in periods
+            if (year, period) in touched or _period_key(year, period) not in entry["records"]
+        ]
+
+    def advance(
+        self,
+        cik: str,
+        facts: dict[str, Any],
+        keys: list[tuple[int, str]],
+        extracted: list[dict[str, Any]],
+    ) -> None:
+        """Store re-extracted ``keys`` and move the watermark past ``facts``.
+
+        Stored records of periods the new facts touch but ``keys`` leave out
+        (a restated quarter outside the requested slice) are dropped, so a
+        later request for them re-extracts instead of reusing a stale record.
+        """
+        entry = self._entry(cik)
+        stored = dict(entry["records"])
+        for year, period in self._touched(entry, facts) - set(keys):
+            stored.pop(_period_key(year, period), None)
+        by_key = {_period_key(r["Year"], r["Quarter"]): r for r in extracted}
+        for year, period in keys:
+            key = _period_key(year, period)
+            # ``None`` marks a period extracted with no facts yet.
+            stored[key] = by_key.get(key)
+        mark, accns = entry["filed"], set(entry["accns"])
+        for fact in _iter_facts(facts):
+            filed = str(fact.get("filed", ""))
+            if filed > mark:
+                mark, accns = filed, set()
+            if filed == mark and fact.get("accn"):
+                accns.add(fact["accn"])
+        self._state["ciks"][cik] = {"filed": mark, "accns": sorted(accns), "records": stored}
+
+    def records(self, cik: str, years: list[int], periods: list[str]) -> list[dict[str, Any]]:
+        """Stored records for the requested slice, in year/period order."""
+        stored = self._entry(cik)["records"]
+        return [
+            dict(stored[key])
+            for year in years
+            for period in periods
+            if stored.get(key := _period_key(year, period))
+        ]
+
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self._state, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.path)
+        log.info("Wrote %s", self.path)
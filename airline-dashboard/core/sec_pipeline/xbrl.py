@@ -7,6 +7,11 @@ Flow metrics use duration contexts, with YTD-aware handling for metrics commonly
 reported cumulatively in Q2/Q3 (e.g., Operating Cash Flow and CapEx). Most Q4
 flows are derived as ``FY - (Q1 + Q2 + Q3)``. Instant metrics use period-end
 contexts. Fact selection prefers matching SEC ``fp`` values when available.
+
+Two interchangeable engines resolve facts. The scalar engine scans each tag's
+fact list per lookup; the columnar engine (``XBRL_ENGINE=columnar``, default)
+flattens the payload once into a ``FactTable`` and resolves every year of a tag
+with vectorized selection. Both produce identical results.
 """
 
 from __future__ import annotations
@@ -17,6 +22,7 @@ import logging
 from typing import Any
 
 from . import config
+from .fact_table import _QUARTER_END_MONTH, _fp_candidates, FactTable, FactView
 
 log = logging.getLogger("xbrl")
 
@@ -97,7 +103,7 @@ INSTANT_METRICS: dict[str, list[str]] = {
 
 ALL_METRICS = tuple(DURATION_METRICS) + tuple(INSTANT_METRICS)
 
-_QUARTER_END_MONTH = {"Q1": 3, "Q2": 6, "Q3": 9, "Q4": 12, "FY": 12}
+_ENGINES = ("columnar", "scalar")
 YTD_DERIVED_METRICS = {"Operating Cash Flow", "Capital Expenditures"}
 NON_ADDITIVE_DURATION_METRICS = {"Earnings Per Share"}
 METRIC_UNIT_CANDIDATES: dict[str, list[str]] = {
@@ -120,13 +126,37 @@ CAPEX_COMPONENT_TAGS = [
     "PaymentsToAcquireOtherPropertyPlantAndEquipment",
 ]
 CAPEX_RECONCILE_TOLERANCE = 0.05
+RESTRICTED_CASH_CURRENT_TAGS = [
+    "RestrictedCashAndCashEquivalentsCurrent",
+    "RestrictedCashCurrent",
+]
+RESTRICTED_CASH_NONCURRENT_TAGS = [
+    "RestrictedCashAndCashEquivalentsNoncurrent",
+    "RestrictedCashNoncurrent",
+]
+
+# Every us-gaap tag the extractor can read.
+XBRL_TAGS: tuple[str, ...] = tuple(
+    dict.fromkeys(
+        [tag for tags in DURATION_METRICS.values() for tag in tags]
+        + [tag for tags in INSTANT_METRICS.values() for tag in tags]
+        + EPS_SHARE_TAGS
+        + CAPEX_BROAD_TAGS
+        + CAPEX_COMPONENT_TAGS
+    )
+)
+
+# A companyfacts payload, or the same payload flattened into a FactTable.
+Facts = dict[str, Any] | FactTable
 
 
 def _facts_for_tag(
-    facts: dict[str, Any],
+    facts: Facts,
     tag: str,
     unit_candidates: list[str] | None = None,
-) -> list[dict[str, Any]]:
+) -> list[dict[str, Any]] | FactView:
+    if isinstance(facts, FactTable):
+        return facts.view(tag, unit_candidates)
     node = facts.get("facts", {}).get("us-gaap", {}).get(tag)
     if not node:
         return []
@@ -139,14 +169,6 @@ def _facts_for_tag(
     return out
 
 
-def _fp_candidates(period: str) -> set[str]:
-    """Preferred SEC fiscal period labels for a logical period."""
-    if period == "Q4":
-        # Year-end filings usually carry FY in companyfacts.
-        return {"Q4", "FY"}
-    return {period}
-
-
 def _latest_value(candidates: list[dict[str, Any]]) -> float | None:
     """Pick the latest fact by accession when available."""
     if not candidates:
@@ -171,7 +193,7 @@ def _duration_days(fact: dict[str, Any]) -> int | None:
 
 
 def _pick_duration_window(
-    facts_list: list[dict[str, Any]],
+    facts_list: list[dict[str, Any]] | FactView,
     year: int,
     end_month: int,
     min_days: int,
@@ -179,9 +201,11 @@ def _pick_duration_window(
     period: str | None = None,
 ) -> float | None:
     """Pick a duration fact matching year/month and day-count window."""
+    if isinstance(facts_list, FactView):
+        return facts_list.duration_window(year, end_month, min_days, max_days, period)
     preferred: list[dict[str, Any]] = []
     fallback: list[dict[str, Any]] = []
-    fp_preferred = _fp_candidates(period) if period else set()
+    fp_preferred = _fp_candidates(period) if period else ()
     for f in facts_list:
         end = _parse(f.get("end"))
         days = _duration_days(f)
@@ -223,7 +247,7 @@ def _pick_duration_window(
 
 
 def _pick_duration(
-    facts_list: list[dict[str, Any]], year: int, period: str
+    facts_list: list[dict[str, Any]] | FactView, year: int, period: str
 ) -> float | None:
     """Pick the flow value for a year/period from duration facts."""
     end_month = _QUARTER_END_MONTH[period]
@@ -234,9 +258,11 @@ def _pick_duration(
 
 
 def _pick_instant(
-    facts_list: list[dict[str, Any]], year: int, period: str
+    facts_list: list[dict[str, Any]] | FactView, year: int, period: str
 ) -> float | None:
     """Pick the balance value for a year/period from instant facts."""
+    if isinstance(facts_list, FactView):
+        return facts_list.instant(year, period)
     end_month = _QUARTER_END_MONTH[period]
     preferred: list[dict[str, Any]] = []
     fallback: list[dict[str, Any]] = []
@@ -270,7 +296,7 @@ def _pick_instant(
 
 
 def _extract_ytd_from_tags(
-    facts: dict[str, Any],
+    facts: Facts,
     tags: list[str],
     year: int,
     period: str,
@@ -344,7 +370,7 @@ def _extract_ytd_from_tags(
 
 
 def _extract_ytd_metric(
-    facts: dict[str, Any], metric: str, year: int, period: str
+    facts: Facts, metric: str, year: int, period: str
 ) -> float | None:
     """Extract named cash-flow metrics that may be reported YTD in Q2/Q3."""
     return _extract_ytd_from_tags(
@@ -357,7 +383,7 @@ def _extract_ytd_metric(
 
 
 def _extract_capex_metric(
-    facts: dict[str, Any], year: int, period: str
+    facts: Facts, year: int, period: str
 ) -> float | None:
     """Extract CapEx with broad-tag precedence and component-sum fallback."""
     broad_val = _extract_ytd_from_tags(facts, CAPEX_BROAD_TAGS, year, period)
@@ -394,26 +420,17 @@ def _extract_capex_metric(
 
 
 def _extract_restricted_cash_metric(
-    facts: dict[str, Any], year: int, period: str
+    facts: Facts, year: int, period: str
 ) -> float | None:
     """Extract restricted cash by summing current/noncurrent components safely."""
-    current_tags = [
-        "RestrictedCashAndCashEquivalentsCurrent",
-        "RestrictedCashCurrent",
-    ]
-    noncurrent_tags = [
-        "RestrictedCashAndCashEquivalentsNoncurrent",
-        "RestrictedCashNoncurrent",
-    ]
-
     current_val: float | None = None
-    for tag in current_tags:
+    for tag in RESTRICTED_CASH_CURRENT_TAGS:
         current_val = _pick_instant(_facts_for_tag(facts, tag), year, period)
         if current_val is not None:
             break
 
     noncurrent_val: float | None = None
-    for tag in noncurrent_tags:
+    for tag in RESTRICTED_CASH_NONCURRENT_TAGS:
         noncurrent_val = _pick_instant(_facts_for_tag(facts, tag), year, period)
         if noncurrent_val is not None:
             break
@@ -423,7 +440,7 @@ def _extract_restricted_cash_metric(
     return (current_val or 0.0) + (noncurrent_val or 0.0)
 
 
-def _extract_eps_q4_fallback(facts: dict[str, Any], year: int) -> float | None:
+def _extract_eps_q4_fallback(facts: Facts, year: int) -> float | None:
     """Derive Q4 basic EPS if direct Q4 value is not present.
 
     Formula:
@@ -477,7 +494,7 @@ def _extract_eps_q4_fallback(facts: dict[str, Any], year: int) -> float | None:
     return round(eps_q4, 2)
 
 
-def extract_metric(facts: dict[str, Any], metric: str, year: int, period: str) -> float | None:
+def extract_metric(facts: Facts, metric: str, year: int, period: str) -> float | None:
     """Extract one metric for one year/period, deriving Q4 when needed."""
     if metric in INSTANT_METRICS:
         if metric == "Restricted Cash":
@@ -525,9 +542,22 @@ def extract_metric(facts: dict[str, Any], metric: str, year: int, period: str) -
 
 
 def extract_financials(
-    facts: dict[str, Any], years: list[int], periods: list[str]
+    facts: Facts,
+    years: list[int],
+    periods: list[str],
+    engine: str | None = None,
 ) -> list[dict[str, Any]]:
-    """Return one record per year/period with the four auto-sourced metrics."""
+    """Return one record per year/period with the four auto-sourced metrics.
+
+    ``engine`` selects ``"columnar"`` or ``"scalar"`` fact resolution and
+    defaults to ``config.XBRL_ENGINE``. A ``FactTable`` is always resolved
+    columnar. An unknown engine raises ``ValueError``.
+    """
+    engine = engine or config.XBRL_ENGINE
+    if engine not in _ENGINES:
+        raise ValueError(f"Unknown XBRL engine {engine!r}; expected one of {_ENGINES}")
+    if engine == "columnar" and not isinstance(facts, FactTable):
+        facts = FactTable.from_companyfacts(facts, XBRL_TAGS)
     records: list[dict[str, Any]] = []
     for year in years:
         for period in periods:
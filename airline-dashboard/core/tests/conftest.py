@@ -0,0 +1,90 @@
+"""Fixtures shared across test modules: isolated caches and EDGAR stand-ins."""
+
+import json
+from typing import Any
+
+import pytest
+
+from helpers import AAL_CIK, DOCUMENTS, EXHIBITS, FACTS, SUBMISSIONS, index_page
+from sec_pipeline import config, facts_cache
+from sec_pipeline.edgar_client import EdgarClient
+from sec_pipeline.replay import FixtureRecorder, ReplayServer, record
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(config, "DOC_STORE_DIR", tmp_path / "filings")
+    monkeypatch.setattr(facts_cache, "FACTS_CACHE_DIR", tmp_path / "facts")
+
+    def _no_network(self, url):
+        raise AssertionError(f"bulk mode made a request: {url}")
+
+    monkeypatch.setattr(EdgarClient, "_get", _no_network)
+    bulk = tmp_path / "bulk"
+    bulk.mkdir()
+    return bulk
+
+
+@pytest.fixture
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(config, "DOC_STORE_DIR", tmp_path / "filings")
+    monkeypatch.setattr(config, "SEC_MAX_REQUESTS_PER_SECOND", 1000.0)
+    monkeypatch.setattr(facts_cache, "FACTS_CACHE_DIR", tmp_path / "facts")
+    (tmp_path / "cache").mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def stand_in(tmp_path):
+    """Start a ``ReplayServer`` over ``{path: body}`` routes; other paths 404.
+
+    Dict and list bodies are served as JSON. Keyword arguments go to
+    ``ReplayServer`` (``latency``, ``on_request``).
+    """
+    servers: list[ReplayServer] = []
+
+    def serve(routes: dict[str, Any], **kwargs: Any) -> ReplayServer:
+        recorder = FixtureRecorder(tmp_path / f"stand-in-{len(servers)}")
+        for path, body in routes.items():
+            if isinstance(body, bytes):
+                recorder.add(path, body, "text/html")
+            else:
+                recorder.add(path, json.dumps(body).encode(), "application/json")
+        recorder.save()
+        servers.append(ReplayServer(recorder.root, **kwargs).start())
+        return servers[-1]
+
+    yield serve
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def source(isolated):
+    """Stand-in for live SEC, itself served from a hand-written fixture set."""
+    recorder = FixtureRecorder(isolated / "source")
+    recorder.add(f"/submissions/CIK{AAL_CIK}.json", json.dumps(SUBMISSIONS).encode(), "application/json")
+    recorder.add(f"/api/xbrl/companyfacts/CIK{AAL_CIK}.json", json.dumps(FACTS).encode(), "application/json")
+    accessions = dict(zip(SUBMISSIONS["filings"]["recent"]["primaryDocument"], SUBMISSIONS["filings"]["recent"]["accessionNumber"]))
+    archive = f"/Archives/edgar/data/{int(AAL_CIK)}"
+    for primary, accession in accessions.items():
+        acc = accession.replace("-", "")
+        recorder.add(f"{archive}/{acc}/{primary}", DOCUMENTS[primary], "text/html")
+        if primary in EXHIBITS:
+            page = index_page(AAL_CIK, accession, EXHIBITS[primary])
+            recorder.add(f"{archive}/{acc}/{accession}-index.htm", page, "text/html")
+            for _, doc in EXHIBITS[primary]:
+                if doc in DOCUMENTS and doc != primary:
+                    recorder.add(f"{archive}/{acc}/{doc}", DOCUMENTS[doc], "text/html")
+    recorder.save()
+    with ReplayServer(recorder.root) as server:
+        yield server
+
+
+@pytest.fixture
+def fixtures(isolated, source):
+    """A fixture set recorded from ``source`` by a normal client."""
+    record(isolated / "recorded", ["AAL"], [2024], ["Q2"], client=EdgarClient(base_url=source.url))
+    return isolated / "recorded"
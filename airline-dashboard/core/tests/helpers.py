@@ -0,0 +1,200 @@
+"""Sample payloads and builders shared by the test modules."""
+
+import json
+import random
+import zipfile
+from datetime import date, datetime, timedelta
+
+from scripts import build_data
+from sec_pipeline import config
+from sec_pipeline.edgar_client import Filing
+from sec_pipeline.xbrl import XBRL_TAGS
+
+YEARS = [2019, 2020, 2021, 2022]
+PERIODS = ["Q1", "Q2", "Q3", "Q4", "FY"]
+
+
+def _fact(rng: random.Random, start: date | None, end: date, fp: str) -> dict:
+    fact = {
+        "end": end.isoformat(),
+        "val": rng.choice([rng.randint(-5_000, 90_000), rng.randint(1, 50) / 7]),
+        "accn": f"0000000000-{end.year % 100:02d}-{rng.randint(0, 3):06d}",
+        "fy": end.year,
+        "fp": fp,
+        "form": "10-K" if fp == "FY" else "10-Q",
+        "filed": (end + timedelta(days=rng.choice([30, 45, 400]))).isoformat(),
+    }
+    if start is not None:
+        fact["start"] = start.isoformat()
+    return fact
+
+
+def synthetic_companyfacts(seed: int) -> dict:
+    """Build a noisy companyfacts payload that exercises every selection path.
+
+    Accession collisions create ties, shifted quarter ends exercise the fp
+    fallback, and random omissions force the YTD and Q4 derivations.
+    """
+    rng = random.Random(seed)
+    gaap: dict = {}
+    for tag in XBRL_TAGS + ("PaymentsForFlightEquipment", "UnusedTag"):
+        units = ["USD"]
+        if "PerShare" in tag:
+            units = ["USD/shares", "USD/share"]
+        elif "NumberOf" in tag:
+            units = ["shares"]
+        node: dict = {}
+        for unit in units:
+            rows = []
+            for year in YEARS:
+                shift = rng.choice([0, 0, 0, -40])
+                for q, fp in enumerate(("Q1", "Q2", "Q3", "FY"), start=1):
+                    end = date(year, q * 3, 28) + timedelta(days=shift)
+                    for _ in range(rng.randint(0, 3)):
+                        if rng.random() < 0.3:
+                            rows.append(_fact(rng, None, end, rng.choice([fp, "Q4", ""])))
+                        months = 12 if fp == "FY" else rng.choice([3, 3 * q])
+                        start = end - timedelta(days=int(months * 30.4))
+                        rows.append(_fact(rng, start, end, rng.choice([fp, fp, "FY", "Q4"])))
+            rows.append({"end": "not-a-date", "val": 1, "accn": "x", "fp": "Q1"})
+            rng.shuffle(rows)
+            node[unit] = rows
+        gaap[tag] = {"units": node}
+    return {"cik": 1, "facts": {"us-gaap": gaap}}
+
+
+AAL_CIK = config.AIRLINE_CIK_FALLBACK["AAL"]
+UAL_CIK = config.AIRLINE_CIK_FALLBACK["UAL"]
+
+SUBMISSIONS = {
+    "cik": "6201",
+    "filings": {
+        "recent": {
+            "accessionNumber": ["0000006201-24-000010", "0000006201-24-000004"],
+            "form": ["10-Q", "8-K"],
+            "filingDate": ["2024-07-25", "2024-04-25"],
+            "primaryDocument": ["aal-20240630.htm", "ex991.htm"],
+        },
+        "files": [],
+    },
+}
+
+
+def write_bulk_dir(root, facts: dict, submissions: dict = SUBMISSIONS):
+    """Write a minimal bulk-archive fixture.
+
+    ``facts`` is either one payload (stored for AAL) or a ``{cik: payload}`` map.
+    """
+    by_cik = facts if all(k.isdigit() for k in facts) and facts else {AAL_CIK: facts}
+    with zipfile.ZipFile(root / "companyfacts.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+        for cik, payload in by_cik.items():
+            zf.writestr(f"CIK{cik}.json", json.dumps(payload))
+    with zipfile.ZipFile(root / "submissions.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"CIK{AAL_CIK}.json", json.dumps(submissions))
+    return root
+
+
+FACTS = synthetic_companyfacts(3)
+DOCUMENTS = {
+    "aal-20240630.htm": b"<html><body><p>Quarterly revenue rose on strong demand.</p></body></html>",
+    "ex991.htm": b"<html><body><p>American Airlines reports first-quarter results.</p></body></html>",
+    "ex992.htm": b"<html><body><p>Investor update: second-quarter capacity guidance.</p></body></html>",
+}
+# The 8-K's index page lists the exhibit it links to (``EX-99.1``).
+EXHIBITS = {"ex991.htm": [("8-K", "ex991.htm"), ("EX-99.1", "ex992.htm"), ("GRAPHIC", "logo.jpg")]}
+
+
+def index_page(cik: str, accession: str, rows: list[tuple[str, str]]) -> bytes:
+    """A filing index page in EDGAR's layout listing ``(type, document)`` rows."""
+    base = f"/Archives/edgar/data/{int(cik)}/{accession.replace('-', '')}"
+    cells = "".join(
+        f"<tr><td>{n}</td><td>{doc_type}</td><td><a href=\"{base}/{doc}\">{doc}</a></td>"
+        f"<td>{doc_type}</td><td>1000</td></tr>"
+        for n, (doc_type, doc) in enumerate(rows, 1)
+    )
+    return (
+        '<html><body><table class="tableFile" summary="Document Format Files">'
+        "<tr><th>Seq</th><th>Description</th><th>Document</th><th>Type</th><th>Size</th></tr>"
+        f"{cells}</table></body></html>"
+    ).encode()
+
+
+def redirect_outputs(monkeypatch, root):
+    """Point every file ``build_data.build`` reads or writes under ``root``."""
+    out = root / "generated"
+    out.mkdir()
+    for name in ("FINANCIALS_PATH", "FINANCIALS_AS_REPORTED_PATH", "BUYBACKS_PATH"):
+        monkeypatch.setattr(build_data, name, out / getattr(build_data, name).name)
+    diagnostics = out / "diagnostics"
+    monkeypatch.setattr(build_data, "DIAGNOSTICS_DIR", diagnostics)
+    for name in ("DIAGNOSTICS_SUMMARY_CSV", "DIAGNOSTICS_DETAIL_CSV", "DIAGNOSTICS_REPORT_JSON"):
+        monkeypatch.setattr(build_data, name, diagnostics / getattr(build_data, name).name)
+    for name in ("MANUAL_XLSX", "MANUAL_METRICS_CSV", "REPURCHASES_CSV", "SHARE_SALES_CSV"):
+        monkeypatch.setattr(build_data, name, root / "manual" / getattr(build_data, name).name)
+    monkeypatch.setattr("sec_pipeline.watermarks.WATERMARKS_PATH", out / "xbrl_watermarks.json")
+    monkeypatch.setattr(config, "SUMMARIES_PATH", out / "insights.json")
+    return out
+
+
+def _body(topic: str) -> str:
+    return "\n\n".join(f"{topic} paragraph {n} with enough words to read like a filing." for n in range(12))
+
+
+TEN_K = "\n".join([
+    "UNITED STATES SECURITIES AND EXCHANGE COMMISSION",
+    "FORM 10-K",
+    "TABLE OF CONTENTS",
+    "PART I",
+    "Item 1. Business", "3",
+    "Item 1A. Risk Factors", "12",
+    "Item 6. [Reserved]", "40",
+    "PART II",
+    "Item 7. Management's Discussion and Analysis", "41",
+    "Item 15. Exhibits and Financial Statement Schedules", "120",
+    "PART I",
+    "ITEM 1. BUSINESS",
+    _body("Fleet and network"),
+    # A cross-reference rendered as its own text node.
+    "Item 1A. Risk Factors",
+    _body("Business continued"),
+    "ITEM 1A.",
+    "RISK FACTORS",
+    _body("Risk") * 3,
+    "PART II",
+    "ITEM 7. MANAGEMENT'S DISCUSSION AND ANALYSIS OF FINANCIAL CONDITION",
+    _body("Revenue and unit costs"),
+    "ITEM 15. EXHIBITS AND FINANCIAL STATEMENT SCHEDULES",
+    _body("Exhibit"),
+])
+
+TEN_Q = "\n".join([
+    "FORM 10-Q",
+    "PART I. FINANCIAL INFORMATION",
+    "Item 1. Financial Statements",
+    _body("Balance sheet"),
+    "Item 2. Management's Discussion and Analysis",
+    _body("Capacity and load factor"),
+    "For more information see Part II, Item 1A. Risk Factors.",
+    "Item 4. Controls and Procedures",
+    _body("Controls"),
+    "PART II. OTHER INFORMATION",
+    "Item 1. Legal Proceedings",
+    _body("Litigation"),
+    "Item 1A. Risk Factors",
+    _body("Risk"),
+    "Item 6. Exhibits",
+    "31.1 Certification",
+])
+
+
+def sample_filings(n: int) -> list[Filing]:
+    """``n`` stand-in 8-K filings with distinct primary documents."""
+    return [
+        Filing(f"0000006201-24-{i:06d}", "8-K", datetime(2024, 4, 25), f"d{i}.htm")
+        for i in range(n)
+    ]
+
+
+def document_path(cik: str, filing: Filing) -> str:
+    """The URL path EDGAR serves ``filing``'s primary document at."""
+    return f"/Archives/edgar/data/{int(cik)}/{filing.accession.replace('-', '')}/{filing.primary_document}"
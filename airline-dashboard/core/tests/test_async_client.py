@@ -0,0 +1,185 @@
+"""Async EDGAR client: concurrency, request coalescing, and the token bucket."""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import pytest
+import requests
+
+from helpers import AAL_CIK, SUBMISSIONS, document_path, sample_filings
+from sec_pipeline.async_client import AsyncEdgarClient, fetch_documents, iter_documents, run_sync
+from sec_pipeline.edgar_client import EdgarClient, Filing, _RateLimiter
+
+TIMEOUT = 10.0
+DOCUMENTS = "/Archives/"
+
+
+class Gate:
+    """``on_request`` hook that counts requests as they arrive and can hold them.
+
+    While held, a request waits until released, alone or with all the others.
+    """
+
+    def __init__(self) -> None:
+        self.hits: Counter = Counter()
+        self._held = False
+        self._released: set[str] = set()
+        self._cond = threading.Condition()
+
+    def __call__(self, path: str) -> None:
+        with self._cond:
+            self.hits[path] += 1
+            self._cond.wait_for(lambda: not self._held or path in self._released, TIMEOUT)
+
+    def hold(self) -> None:
+        with self._cond:
+            self._held = True
+
+    def release(self, path: str | None = None) -> None:
+        with self._cond:
+            if path is None:
+                self._held = False
+            else:
+                self._released.add(path)
+            self._cond.notify_all()
+
+    def arrived(self, prefix: str = DOCUMENTS) -> int:
+        with self._cond:
+            return sum(n for path, n in self.hits.items() if path.startswith(prefix))
+
+
+def _until(predicate: Callable[[], bool]) -> None:
+    deadline = time.monotonic() + TIMEOUT
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def gate():
+    gate = Gate()
+    yield gate
+    gate.release()
+
+
+@pytest.fixture
+def client(isolated, stand_in, gate):
+    routes = {f"/submissions/CIK{AAL_CIK}.json": SUBMISSIONS}
+    routes.update({document_path("6201", f): f.primary_document.encode() for f in sample_filings(8)})
+    return EdgarClient(base_url=stand_in(routes, on_request=gate).url)
+
+
+class TestAsyncEdgarClient:
+    def test_documents_download_concurrently_in_order(self, client, gate):
+        filings = sample_filings(8)
+        gate.hold()
+        with ThreadPoolExecutor(1) as pool:
+            run = pool.submit(fetch_documents, client, "6201", filings)
+            # Every request is in flight before any is answered.
+            _until(lambda: gate.arrived() == len(filings))
+            gate.release()
+            docs = run.result(TIMEOUT)
+        assert docs == [client.fetch_document("6201", f) for f in filings]
+        assert all(count == 1 for count in gate.hits.values())
+
+    def test_same_url_is_fetched_once(self, client, gate):
+        aclient = AsyncEdgarClient.of(client)
+        url = client.SUBMISSIONS_URL.format(cik=AAL_CIK)
+
+        async def go():
+            return await asyncio.gather(*(aclient.list_filings("6201") for _ in range(5)))
+
+        gate.hold()
+        with ThreadPoolExecutor(1) as pool:
+            run = pool.submit(run_sync, go())
+            _until(lambda: aclient._waiters[url] == 5)
+            gate.release()
+            results = run.result(TIMEOUT)
+        assert gate.hits[f"/submissions/CIK{AAL_CIK}.json"] == 1
+        assert all(r == client.list_filings("6201") for r in results)
+
+    def test_separate_callers_share_in_flight_requests(self, client, gate):
+        filings = sample_filings(4)
+        aclient = AsyncEdgarClient.of(client)
+        urls = [client.document_url("6201", f) for f in filings]
+        gate.hold()
+        with ThreadPoolExecutor(2) as pool:
+            fetched = pool.submit(fetch_documents, client, "6201", filings)
+            iterated = pool.submit(lambda: dict(iter_documents(client, "6201", filings)))
+            _until(lambda: all(aclient._waiters[url] == 2 for url in urls))
+            gate.release()
+            docs, by_position = fetched.result(TIMEOUT), iterated.result(TIMEOUT)
+        assert [by_position[i] for i in range(len(filings))] == docs
+        assert gate.arrived() == len(filings)
+
+    def test_failures_are_returned_in_place(self, client):
+        filings = sample_filings(3)
+        filings[1] = Filing(filings[1].accession, "8-K", filings[1].filing_date, "missing.htm")
+
+        async def go():
+            aclient = AsyncEdgarClient.of(client)
+            docs = await aclient.fetch_documents("6201", filings)
+            return docs, await aclient.frame("Revenues", "USD", "CY2024")
+
+        (first, missing, third), frame = run_sync(go())
+        assert isinstance(first, bytes) and isinstance(third, bytes)
+        assert isinstance(missing, requests.HTTPError)
+        assert frame == []
+
+    def test_iter_documents_yields_each_as_it_arrives(self, client, gate):
+        filings = sample_filings(6)
+        filings[2] = Filing(filings[2].accession, "8-K", filings[2].filing_date, "missing.htm")
+        gate.hold()
+        documents = iter_documents(client, "6201", filings)
+        # The fourth document arrives while the others are still held.
+        gate.release(document_path("6201", filings[3]))
+        assert next(documents) == (3, client.fetch_document("6201", filings[3]))
+        gate.release()
+        arrived = dict(documents)
+        assert sorted(arrived) == [0, 1, 2, 4, 5]
+        assert isinstance(arrived.pop(2), requests.HTTPError)
+        assert all(content == client.fetch_document("6201", filings[pos]) for pos, content in arrived.items())
+
+    def test_iter_documents_buffer_holds_off_downloads(self, client, gate):
+        documents = iter_documents(client, "6201", sample_filings(8), buffer=2)
+        next(documents)
+        # Two waiting for the consumer and one taking the slot it freed.
+        _until(lambda: gate.arrived() == 3)
+        assert gate.arrived() == 3
+        assert len(list(documents)) == 7
+        assert gate.arrived() == 8
+
+    def test_iter_documents_close_cancels_the_rest(self, client, gate):
+        gate.hold()
+        filings = sample_filings(8)
+        documents = iter_documents(client, "6201", filings, buffer=1)
+        gate.release(document_path("6201", filings[0]))
+        next(documents)
+        # The freed slot lets one more request start; it is held at the server.
+        _until(lambda: gate.arrived() == 2)
+        documents.close()
+        gate.release()
+        assert gate.arrived() == 2
+
+
+class TestTokenBucket:
+    def test_burst_then_steady_rate(self):
+        limiter = _RateLimiter(max_per_second=20.0, burst=3)
+        assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.reserve() == pytest.approx(1 / 20.0, abs=0.01)
+        assert limiter.reserve() == pytest.approx(2 / 20.0, abs=0.01)
+
+    def test_async_waiters_do_not_hold_the_lock(self):
+        limiter = _RateLimiter(max_per_second=50.0)
+
+        async def go():
+            await asyncio.gather(*(limiter.acquire() for _ in range(6)))
+
+        start = time.monotonic()
+        asyncio.run(go())
+        elapsed = time.monotonic() - start
+        assert 5 / 50.0 - 0.01 <= elapsed < 0.5
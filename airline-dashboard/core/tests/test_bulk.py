@@ -0,0 +1,61 @@
+"""Offline builds from SEC bulk ``companyfacts.zip`` / ``submissions.zip`` archives."""
+
+from datetime import datetime
+
+import pytest
+
+from helpers import AAL_CIK, PERIODS, UAL_CIK, YEARS, synthetic_companyfacts, write_bulk_dir
+from sec_pipeline.edgar_client import EdgarClient
+
+
+class TestBulkMode:
+    def test_serves_facts_and_filings_from_zip(self, offline):
+        facts = synthetic_companyfacts(2)
+        client = EdgarClient(bulk_dir=write_bulk_dir(offline, facts))
+        assert client.resolve_ciks(["aal"]) == {"AAL": AAL_CIK}
+        assert client.company_facts("6201") == facts
+        filings = client.list_filings(AAL_CIK)
+        assert [f.form for f in filings] == ["10-Q", "8-K"]
+        window = client.filings_in_window(
+            AAL_CIK, datetime(2024, 7, 1), datetime(2024, 8, 1), ("10-Q",)
+        )
+        assert [f.accession for f in window] == ["0000006201-24-000010"]
+
+    def test_missing_member_raises(self, offline):
+        client = EdgarClient(bulk_dir=write_bulk_dir(offline, {}))
+        with pytest.raises(LookupError):
+            client.company_facts("0000000001")
+
+    def test_load_auto_offline(self, offline):
+        from scripts.build_data import load_auto
+        from sec_pipeline.xbrl import extract_financials
+
+        facts = synthetic_companyfacts(5)
+        write_bulk_dir(offline, facts)
+        auto = load_auto(["AAL"], YEARS, PERIODS, bulk_dir=str(offline))
+        expected = extract_financials(facts, YEARS, PERIODS)
+        assert len(auto) == len(expected)
+        assert set(auto["Airline"]) == {"AAL"}
+
+    def test_parallel_load_auto_matches_serial(self, offline):
+        from scripts.build_data import load_auto
+
+        write_bulk_dir(
+            offline,
+            {AAL_CIK: synthetic_companyfacts(7), UAL_CIK: synthetic_companyfacts(8)},
+        )
+        args = (["UAL", "AAL", "DAL"], YEARS, PERIODS)
+        serial = load_auto(*args, bulk_dir=str(offline), workers=1)
+        parallel = load_auto(*args, bulk_dir=str(offline), workers=2)
+        assert parallel.equals(serial)
+        assert list(dict.fromkeys(parallel["Airline"])) == ["UAL", "AAL"]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_malformed_facts_skip_only_that_airline(self, offline, caplog, workers):
+        from scripts.build_data import load_auto
+
+        broken = {"facts": {"us-gaap": {"Revenues": {"units": {"USD": "not a fact list"}}}}}
+        write_bulk_dir(offline, {AAL_CIK: synthetic_companyfacts(7), UAL_CIK: broken})
+        auto = load_auto(["UAL", "AAL"], YEARS, PERIODS, bulk_dir=str(offline), workers=workers)
+        assert set(auto["Airline"]) == {"AAL"}
+        assert "Could not extract financials for UAL" in caplog.text
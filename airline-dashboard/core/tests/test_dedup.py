@@ -0,0 +1,105 @@
+"""Near-duplicate chunk filter."""
+
+import random
+
+import chromadb
+
+from sec_pipeline import config
+from sec_pipeline.dedup import Deduplicator, dedup_chunks, simhash
+from sec_pipeline.embed import Chunk, index_chunks, update_metadata
+
+_VOCAB = [f"word{i}" for i in range(2000)]
+
+
+def _text(seed: int, words: int = 190) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_VOCAB) for _ in range(words))
+
+
+def _chunk(text: str, accession: str) -> Chunk:
+    return Chunk(text=text, metadata={"form": "10-Q", "accession": accession})
+
+
+BOILERPLATE = (
+    "This report contains forward-looking statements within the meaning of the "
+    "Private Securities Litigation Reform Act of 1995. These statements are based on "
+    "management's current expectations and are subject to risks including fuel prices, "
+    "labor relations, economic conditions and the other factors described in our filings. "
+) * 3
+
+
+class TestSimhash:
+    def test_close_texts_have_close_fingerprints(self):
+        edited = BOILERPLATE.replace("current", "present", 1)
+        assert (simhash(BOILERPLATE) ^ simhash(edited)).bit_count() <= config.DEDUP_MAX_DISTANCE
+        assert (simhash(_text(1)) ^ simhash(_text(2))).bit_count() > 16
+
+    def test_case_and_whitespace_insensitive(self):
+        assert simhash("Revenue  rose\nsharply this quarter") == simhash("revenue rose sharply THIS quarter")
+        assert simhash("") == 0
+
+
+class TestDedupChunks:
+    def test_drops_near_duplicates_across_filings(self):
+        chunks = [
+            _chunk(BOILERPLATE, "A"),
+            _chunk(_text(1), "A"),
+            _chunk(BOILERPLATE.replace("1995", "1996"), "B"),
+            _chunk(_text(2), "B"),
+            _chunk(BOILERPLATE, "C"),
+        ]
+        kept, dropped = dedup_chunks(chunks, max_distance=6)
+        assert dropped == 2
+        assert [c.text for c in kept] == [BOILERPLATE, _text(1), _text(2)]
+        assert kept[0].metadata["also_in"] == "B,C"
+        assert "also_in" not in kept[1].metadata
+
+    def test_only_chunks_filed_the_same_day_are_compared(self):
+        chunks = [_chunk(BOILERPLATE, "A"), _chunk(BOILERPLATE, "B"), _chunk(BOILERPLATE, "C")]
+        for chunk, day in zip(chunks, (1, 2, 1)):
+            chunk.metadata["filing_ts"] = day * 86_400
+        kept, dropped = dedup_chunks(chunks, max_distance=6)
+        assert dropped == 1
+        assert [c.metadata["accession"] for c in kept] == ["A", "B"]
+        assert kept[0].metadata["also_in"] == "C"
+
+    def test_repeat_within_a_filing(self):
+        kept, dropped = dedup_chunks([_chunk(BOILERPLATE, "A"), _chunk(BOILERPLATE, "A")], max_distance=6)
+        assert dropped == 1
+        assert "also_in" not in kept[0].metadata
+
+    def test_distinct_chunks_kept_in_order(self):
+        chunks = [_chunk(_text(seed), "A") for seed in range(200)]
+        assert dedup_chunks(chunks, max_distance=6) == (chunks, 0)
+
+    def test_disabled(self, monkeypatch):
+        chunks = [_chunk(BOILERPLATE, "A"), _chunk(BOILERPLATE, "B")]
+        monkeypatch.setattr(config, "DEDUP_MAX_DISTANCE", -1)
+        assert dedup_chunks(chunks) == (chunks, 0)
+
+
+class TestDeduplicator:
+    def test_stream_matches_list(self):
+        chunks = [_chunk(BOILERPLATE, "A"), _chunk(_text(1), "A"), _chunk(BOILERPLATE, "B")]
+        dedup = Deduplicator(max_distance=6)
+        stream = dedup.filter(iter(chunks))
+        assert next(stream) is chunks[0]  # yielded before the rest are read
+        assert list(stream) == [chunks[1]]
+        assert dedup.dropped == 1
+        assert dedup.merged == {0: {"form": "10-Q", "accession": "A", "also_in": "B"}}
+
+    def test_merged_metadata_reaches_the_store(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "CHROMA_DIR", tmp_path)
+        batches = []
+
+        def embedder(texts):
+            batches.append(len(texts))
+            return [[float(len(t)), 1.0] for t in texts]
+
+        chunks = [_chunk(BOILERPLATE, "A"), *(_chunk(_text(seed), "A") for seed in range(4)), _chunk(BOILERPLATE, "B")]
+        dedup = Deduplicator(max_distance=6)
+        assert index_chunks("dedup", dedup.filter(iter(chunks)), embedder, batch_size=2) == {("A", ""): 5}
+        update_metadata("dedup", dedup.merged.values())
+        assert batches == [2, 2, 1]
+        stored = chromadb.PersistentClient(path=str(tmp_path)).get_collection("dedup").get(ids=["A-0"])
+        assert stored["metadatas"][0]["also_in"] == "B"
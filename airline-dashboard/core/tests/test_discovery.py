@@ -0,0 +1,134 @@
+"""New-filing discovery from EDGAR master indexes."""
+
+from datetime import date, datetime
+
+from sec_pipeline import config
+from sec_pipeline.discovery import (
+    DailyIndexSource,
+    LocalIndexSource,
+    affected_keys,
+    parse_master_index,
+    plan_refresh,
+)
+from sec_pipeline.edgar_client import EdgarClient
+
+AAL = config.AIRLINE_CIK_FALLBACK["AAL"]
+UAL = config.AIRLINE_CIK_FALLBACK["UAL"]
+TRACKED = {AAL: "AAL", UAL: "UAL"}
+
+HEADER = """Description:           Daily Index of EDGAR Dissemination Feed by Company Name
+Last Data Received:    July 25, 2024
+Comments:              webmaster@sec.gov
+
+CIK|Company Name|Form Type|Date Filed|Filename
+--------------------------------------------------------------------------------
+"""
+
+
+def index_text(*rows: tuple[str, str, str, str]) -> str:
+    """A master index with ``(cik, form, yyyymmdd, accession)`` rows."""
+    lines = [
+        f"{int(cik)}|SOME CO|{form}|{filed}|edgar/data/{int(cik)}/{acc}.txt"
+        for cik, form, filed, acc in rows
+    ]
+    return HEADER + "\n".join(lines) + "\n"
+
+
+def spec(label: str) -> config.PeriodSpec:
+    return config.PeriodSpec.from_label(label)
+
+
+class FakeClient:
+    def __init__(self, days: dict[date, str]) -> None:
+        self.days = days
+        self.requests: list[date] = []
+
+    def daily_index(self, day: date) -> str | None:
+        self.requests.append(day)
+        return self.days.get(day)
+
+
+class TestDiscovery:
+    def test_parse_master_index(self):
+        text = index_text((AAL, "10-Q", "20240725", "0000006201-24-000010"))
+        text += "1234|QUARTERLY ROW|8-K|2024-07-26|edgar/data/1234/0000001234-24-000001.txt\n"
+        entries = parse_master_index(text)
+        assert [e.cik for e in entries] == [AAL, "0000001234"]
+        assert entries[0].accession == "0000006201-24-000010"
+        assert entries[1].filing_date == datetime(2024, 7, 26)
+
+    def test_affected_keys(self):
+        fin, ins = affected_keys("10-Q", datetime(2024, 7, 25))
+        assert fin == [spec("2024Q2")]
+        assert spec("2024Q2") in ins and spec("2024Q3") in ins
+        fin, ins = affected_keys("10-K/A", datetime(2025, 2, 10))
+        assert fin == [spec("2024Q4"), spec("2024FY")]
+        assert ins == []  # amendments are not summarized
+        fin, ins = affected_keys("10-K", datetime(2025, 2, 10))
+        assert spec("2024FY") in ins
+        assert affected_keys("10-Q", datetime(2025, 1, 8))[0] == [spec("2024Q3")]
+        assert affected_keys("8-K", datetime(2024, 4, 20))[0] == []
+        assert affected_keys("4", datetime(2024, 4, 20)) == ([], [])
+
+    def test_daily_source_dedupes_and_waits_for_unpublished_days(self, tmp_path):
+        fri, sat, mon, tue = date(2024, 7, 26), date(2024, 7, 27), date(2024, 7, 29), date(2024, 7, 30)
+        days = {fri: index_text((AAL, "10-Q", "20240726", "a1"))}
+        client = FakeClient(days)
+        source = DailyIndexSource(client, start=fri, state_path=tmp_path / "state.json")
+        assert [e.accession for e in source.poll(today=mon)] == ["a1"]
+        # The weekend is missing but still within the grace period.
+        assert source.state.cursor == sat.isoformat()
+
+        days[mon] = index_text((UAL, "8-K", "20240729", "u1"))
+        again = DailyIndexSource(client, state_path=tmp_path / "state.json")
+        assert [e.accession for e in again.poll(today=mon)] == ["u1"]
+        assert again.poll(today=mon) == []
+        days[mon] += index_text((AAL, "10-Q/A", "20240729", "a2")).split("-\n")[-1]
+        assert [e.accession for e in again.poll(today=tue)] == ["a2"]
+        # Sunday is still within the grace period; Friday is final and pruned.
+        assert again.state.cursor == "2024-07-28"
+        assert set(again.state.seen) == {"u1", "a2"}
+
+    def test_plan_from_local_index_dir(self, tmp_path):
+        feed = tmp_path / "feed"
+        feed.mkdir()
+        (feed / "master.20240725.idx").write_text(
+            index_text(
+                (AAL, "10-Q", "20240725", "a1"),
+                ("0000000042", "10-Q", "20240725", "x1"),
+                (UAL, "4", "20240725", "u0"),
+            )
+        )
+        source = LocalIndexSource(feed, state_path=tmp_path / "state.json")
+        plan = plan_refresh(source.poll(), TRACKED)
+        assert plan.financials == {spec("2024Q2"): {"AAL"}}
+        assert set(plan.insights) == {spec("2024Q2"), spec("2024Q3"), spec("2024FY")}
+        assert not plan_refresh(source.poll(), TRACKED)
+
+    def test_discover_once_refreshes_only_affected_keys(self, tmp_path, monkeypatch):
+        from scripts import discover, refresh
+
+        feed = tmp_path / "feed"
+        feed.mkdir()
+        (feed / "master.20250210.idx").write_text(index_text((UAL, "10-K", "20250210", "u1")))
+        monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+        monkeypatch.setattr(config, "DOC_STORE_ENABLED", False)
+        monkeypatch.setattr("sec_pipeline.discovery.DISCOVERY_STATE_PATH", tmp_path / "state.json")
+        monkeypatch.setattr(EdgarClient, "resolve_ciks", lambda self, t: {a: TRACKED_BY_AIRLINE[a] for a in t})
+        monkeypatch.setattr(EdgarClient, "filing_index", lambda self, cik: None)
+        builds, runs = [], []
+        monkeypatch.setattr(refresh.build_data, "build", lambda *a, **k: builds.append((a, k)))
+        monkeypatch.setattr(refresh.pipeline, "run", lambda *a, **k: runs.append((a, k)))
+
+        discover.discover(["AAL", "UAL"], index_dir=feed, once=True)
+        assert [(a, k["incremental"]) for a, k in builds] == [((["UAL"], [2024], ["Q4", "FY"]), True)]
+        assert all(k["overwrite"] for _, k in runs)
+        assert (["UAL"], [2024], ["FY"]) in [a for a, _ in runs]
+        assert len({id(k["client"]) for _, k in builds + runs}) == 1
+
+        builds.clear()
+        discover.discover(["AAL", "UAL"], index_dir=feed, once=True)
+        assert builds == []
+
+
+TRACKED_BY_AIRLINE = {airline: cik for cik, airline in TRACKED.items()}
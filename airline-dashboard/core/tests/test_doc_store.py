@@ -0,0 +1,98 @@
+"""Content-addressed raw filing store."""
+
+import os
+import sys
+import time
+
+import pytest
+
+from sec_pipeline import doc_store
+from sec_pipeline.doc_store import DocStore, parse_size
+
+CIK = "0000006201"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DocStore(tmp_path / "filings")
+    yield store
+    store.close()
+
+
+def _age_objects(store, seconds):
+    past = time.time() - seconds
+    for path in (store.root / "objects").glob("*/*.z*"):
+        os.utime(path, (past, past))
+
+
+class TestDocStore:
+    def test_roundtrip_and_dedup(self, store):
+        body = b"<html>" + b"Revenue rose. " * 5000 + b"</html>"
+        digest = store.put(CIK, "0000006201-24-000010", "aal-20240630.htm", body)
+        # An amendment re-filing the identical exhibit shares the object.
+        assert store.put(CIK, "0000006201-24-000011", "ex991.htm", body) == digest
+        assert store.get(CIK, "0000006201-24-000010", "aal-20240630.htm") == body
+        assert store.get(CIK, "0000006201-24-000011", "ex991.htm") == body
+        assert store.get(CIK, "0000006201-24-000012", "missing.htm") is None
+        stats = store.stats()
+        assert stats["documents"] == 2 and stats["objects"] == 1
+        assert stats["stored_bytes"] < len(body) / 10
+
+    def test_shared_between_instances(self, store):
+        store.put(CIK, "a", "d.htm", b"payload")
+        other = DocStore(store.root)
+        assert other.get(CIK, "a", "d.htm") == b"payload"
+        other.close()
+
+    def test_evict_by_age_and_size(self, store):
+        for i in range(4):
+            store.put(CIK, f"acc-{i}", "d.htm", os.urandom(20_000))
+        _age_objects(store, 2 * doc_store._SWEEP_GRACE_SECONDS)
+        store._conn.execute("UPDATE refs SET last_access=? WHERE accession='acc-0'", (time.time() - 40 * 86400,))
+        assert store.evict(older_than_days=30) == 1
+        assert store.get(CIK, "acc-0", "d.htm") is None
+        store.get(CIK, "acc-1", "d.htm")  # most recently read survives
+        assert store.evict(max_bytes=25_000) == 2
+        assert store.get(CIK, "acc-1", "d.htm") is not None
+        assert store.stats()["objects"] == 1
+
+    def test_sweep_keeps_objects_not_yet_indexed(self, store):
+        store.put(CIK, "old", "d.htm", b"old payload")
+        store.put(CIK, "gone", "d.htm", b"evicted payload")
+        _age_objects(store, 2 * doc_store._SWEEP_GRACE_SECONDS)
+        # Another process's put: its object is written, its ref not yet added.
+        store._write_object("f" * 40, b"in flight")
+        store._conn.execute("DELETE FROM refs WHERE accession IN ('old', 'gone')")
+        store._conn.commit()
+        store._sweep()
+        assert [p.name.split(".")[0] for p in (store.root / "objects").glob("*/*.z*")] == ["f" * 40]
+
+    def test_put_restores_an_object_evicted_meanwhile(self, store, monkeypatch):
+        store.put(CIK, "a", "d.htm", b"shared")
+        touch = store._touch_object
+
+        def evicted_after_touch(digest):
+            found = touch(digest)
+            store._find_object(digest).unlink()
+            return found
+
+        monkeypatch.setattr(store, "_touch_object", evicted_after_touch)
+        store.put(CIK, "b", "d.htm", b"shared")
+        assert store.get(CIK, "b", "d.htm") == b"shared"
+
+    def test_zstd_object_without_zstandard_is_a_miss(self, store, monkeypatch, caplog):
+        if store._suffix != ".zst":
+            pytest.skip("zstandard is not installed")
+        store.put(CIK, "a", "d.htm", b"payload")
+        monkeypatch.setitem(sys.modules, "zstandard", None)
+        plain = DocStore(store.root)
+        assert plain.get(CIK, "a", "d.htm") is None
+        assert "zstandard is not installed" in caplog.text
+        plain.put(CIK, "a", "d.htm", b"payload")
+        assert plain.get(CIK, "a", "d.htm") == b"payload"
+        plain.close()
+
+    def test_parse_size(self):
+        assert parse_size("500MB") == 500 << 20
+        assert parse_size("1.5GB") == int(1.5 * (1 << 30))
+        assert parse_size("2048") == 2048
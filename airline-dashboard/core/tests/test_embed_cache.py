@@ -0,0 +1,115 @@
+"""Embedding cache: hits across instances, batch dedup, and size-bounded eviction."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from sec_pipeline import embed_cache
+from sec_pipeline.embed_cache import CachedEmbedder, EmbeddingCache, text_key
+
+DIM = 4
+
+
+def _vector(text: str) -> list[float]:
+    rng = np.random.default_rng(int(text_key(text)[:8], 16))
+    return rng.standard_normal(DIM).astype(np.float32).tolist()
+
+
+@pytest.fixture
+def backend():
+    """Deterministic stand-in embedder that records every text it is sent."""
+    sent = []
+
+    def embed(texts):
+        sent.extend(texts)
+        return [_vector(t) for t in texts]
+
+    embed.sent = sent
+    return embed
+
+
+class TestCachedEmbedder:
+    def test_second_run_hits_the_cache(self, tmp_path, backend):
+        texts = ["Revenue rose.", "Fuel costs fell.", "Revenue rose."]
+        first = CachedEmbedder(backend, "local:test", EmbeddingCache("local:test", tmp_path))
+        assert first(texts) == [_vector(t) for t in texts]
+        assert backend.sent == ["Revenue rose.", "Fuel costs fell."]
+        first.cache.close()
+
+        again = CachedEmbedder(backend, "local:test", EmbeddingCache("local:test", tmp_path))
+        assert again(["Revenue  rose.\n", "Load factor held."]) == [_vector("Revenue rose."), _vector("Load factor held.")]
+        assert backend.sent[2:] == ["Load factor held."]
+        stats = again.cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 3)
+        assert stats["hit_rate"] == 0.5
+
+    def test_models_do_not_share_vectors(self, tmp_path, backend):
+        CachedEmbedder(backend, "local:a", EmbeddingCache("local:a", tmp_path))(["Revenue rose."])
+        CachedEmbedder(backend, "openai:b", EmbeddingCache("openai:b", tmp_path))(["Revenue rose."])
+        assert backend.sent == ["Revenue rose.", "Revenue rose."]
+
+
+class TestEviction:
+    def test_full_cache_evicts_least_recently_read(self, tmp_path):
+        cache = EmbeddingCache("local:test", tmp_path, max_bytes=3 * DIM * 4)
+        keys = [text_key(str(n)) for n in range(4)]
+        for n in range(3):
+            cache.put_many([keys[n]], np.eye(3, DIM)[n : n + 1])
+            time.sleep(0.01)
+        cache.get_many([keys[0]])  # read last, so kept
+        cache.put_many([keys[3]], np.full((1, DIM), 7.0))
+        found = cache.get_many(keys)
+        assert set(found) == {keys[0], keys[2], keys[3]}
+        assert found[keys[3]].tolist() == [7.0] * DIM
+        assert cache.stats()["bytes"] <= 3 * DIM * 4
+
+    def test_evict_compacts_the_array(self, tmp_path):
+        cache = EmbeddingCache("local:test", tmp_path)
+        keys = [text_key(str(n)) for n in range(10)]
+        vectors = np.arange(10 * DIM, dtype=np.float32).reshape(10, DIM)
+        cache.put_many(keys, vectors)
+        cache.get_many(keys[7:])
+        assert cache.evict(max_bytes=3 * DIM * 4) == 7
+        assert cache.stats()["bytes"] == 3 * DIM * 4
+        found = cache.get_many(keys)
+        assert sorted(found) == sorted(keys[7:])
+        assert all(found[k].tolist() == vectors[i].tolist() for i, k in enumerate(keys) if k in found)
+        cache.put_many([text_key("new")], np.ones((1, DIM)))
+        assert cache.get_many([text_key("new")])[text_key("new")].tolist() == [1.0] * DIM
+
+    def test_other_dimensions_are_not_cached(self, tmp_path):
+        cache = EmbeddingCache("local:test", tmp_path)
+        cache.put_many([text_key("a")], np.ones((1, DIM)))
+        cache.put_many([text_key("b")], np.ones((1, DIM + 1)))
+        assert set(cache.get_many([text_key("a"), text_key("b")])) == {text_key("a")}
+
+
+class TestSharedCache:
+    def test_evict_by_another_instance_is_remapped(self, tmp_path):
+        writer = EmbeddingCache("local:test", tmp_path)
+        reader = EmbeddingCache("local:test", tmp_path)
+        keys = [text_key(str(n)) for n in range(10)]
+        vectors = np.arange(10 * DIM, dtype=np.float32).reshape(10, DIM)
+        writer.put_many(keys, vectors)
+        assert len(reader.get_many(keys)) == 10  # maps the full array
+        writer.get_many(keys[7:])
+        writer.evict(max_bytes=3 * DIM * 4)
+        found = reader.get_many(keys)
+        assert sorted(found) == sorted(keys[7:])
+        assert all(found[k].tolist() == vectors[i].tolist() for i, k in enumerate(keys) if k in found)
+
+    @pytest.mark.skipif(embed_cache.fcntl is None, reason="no fcntl")
+    def test_reads_wait_for_a_writer(self, tmp_path):
+        writer = EmbeddingCache("local:test", tmp_path)
+        reader = EmbeddingCache("local:test", tmp_path)
+        writer.put_many([text_key("a")], np.ones((1, DIM)))
+        found = []
+        with writer._locked(exclusive=True):
+            thread = threading.Thread(target=lambda: found.append(reader.get_many([text_key("a")])))
+            thread.start()
+            thread.join(0.2)
+            assert thread.is_alive() and not found
+        thread.join()
+        assert found[0][text_key("a")].tolist() == [1.0] * DIM
@@ -0,0 +1,139 @@
+"""Exhibit discovery through filing index pages, and the earnings-release preference."""
+
+from dataclasses import replace
+from datetime import datetime
+from types import SimpleNamespace
+
+from helpers import AAL_CIK, SUBMISSIONS, TEN_Q, index_page
+from sec_pipeline import config, embed, pipeline
+from sec_pipeline.async_client import with_exhibits
+from sec_pipeline.config import PeriodSpec
+from sec_pipeline.edgar_client import EdgarClient, Filing
+from sec_pipeline.embed import filing_ts, filing_window
+from sec_pipeline.replay import ReplayServer
+
+EIGHT_K = Filing("0000006201-24-000009", "8-K", datetime(2024, 7, 18), "d8k.htm", items="2.02,9.01")
+TEN_Q_FILING = Filing("0000006201-24-000010", "10-Q", datetime(2024, 7, 25), "aal-20240630.htm")
+
+
+class TestIndexPage:
+    def test_rows_and_viewer_links(self):
+        page = index_page(AAL_CIK, EIGHT_K.accession, [("8-K", "d8k.htm"), ("EX-99.1", "ex991.htm")])
+        page = page.replace(b'href="/Archives', b'href="/ix?doc=/Archives', 1)
+        assert EdgarClient._parse_index_page(page) == [("8-K", "d8k.htm"), ("EX-99.1", "ex991.htm")]
+        assert EdgarClient._parse_index_page(b"") == []
+        assert EdgarClient._parse_index_page(b"<html><table><tr><td>x</td></tr></table></html>") == []
+
+    def test_exhibits_in_requested_order(self):
+        rows = [("8-K", "d8k.htm"), ("EX-99.2", "ex992.htm"), ("EX-99.1", "ex991.htm"), ("EX-104", "cover.htm")]
+        page = index_page(AAL_CIK, EIGHT_K.accession, rows)
+        found = EdgarClient.exhibits(EIGHT_K, page, ("EX-99.1", "ex-99.2"))
+        assert [(f.document_type, f.primary_document) for f in found] == [
+            ("EX-99.1", "ex991.htm"), ("EX-99.2", "ex992.htm")
+        ]
+        assert {(f.accession, f.items) for f in found} == {(EIGHT_K.accession, "2.02,9.01")}
+
+    def test_submissions_items_column(self):
+        columns = dict(SUBMISSIONS["filings"]["recent"], items=["", "2.02,9.01"])
+        filings = EdgarClient._parse_columns(columns)
+        assert [f.item_numbers for f in filings] == [(), ("2.02", "9.01")]
+        assert [f.items for f in EdgarClient._parse_columns(SUBMISSIONS["filings"]["recent"])] == ["", ""]
+
+
+class TestWithExhibits:
+    def test_filings_followed_by_their_exhibits(self, fixtures):
+        with ReplayServer(fixtures) as server:
+            client = EdgarClient(base_url=server.url)
+            filings = client.list_filings(AAL_CIK)
+            documents = with_exhibits(client, AAL_CIK, filings)
+            assert with_exhibits(client, AAL_CIK, filings, exhibits={}) == filings
+            # No index page was recorded for the 10-Q: it keeps its primary document.
+            unlisted = with_exhibits(client, AAL_CIK, filings, exhibits={"10-Q": ("EX-99.1",)})
+        assert [(d.form, d.primary_document, d.document_type) for d in documents] == [
+            ("10-Q", "aal-20240630.htm", ""),
+            ("8-K", "ex991.htm", ""),
+            ("8-K", "ex992.htm", "EX-99.1"),
+        ]
+        assert unlisted == filings
+
+
+class TestEarningsRelease:
+    def test_release_for_the_period(self):
+        release = replace(EIGHT_K, primary_document="ex991.htm", document_type="EX-99.1")
+        q2 = PeriodSpec(2024, "Q2")
+        assert pipeline._earnings_release([TEN_Q_FILING, EIGHT_K, release], q2) == release
+        # The prior quarter's release, filed in April, reports Q1.
+        april = replace(release, filing_date=datetime(2024, 4, 25))
+        assert pipeline._earnings_release([april], q2) is None
+        other = replace(release, items="5.02,9.01")
+        assert pipeline._earnings_release([other], q2) is None
+
+    def test_release_filters_financial_statements_at_retrieval(self):
+        release = replace(EIGHT_K, document_type="EX-99.1")
+        q2 = PeriodSpec(2024, "Q2")
+        assert pipeline.period_filter(q2) == filing_window(*q2.date_window())
+        statements = pipeline.period_filter(q2, release)["$and"][-1]["$or"]
+        assert statements == [
+            {"item": {"$ne": "financial_statements"}},
+            {"filing_ts": {"$lte": filing_ts(q2.period_end)}},
+        ]
+
+    def test_period_end(self):
+        assert PeriodSpec(2024, "Q2").period_end == datetime(2024, 6, 30)
+        assert PeriodSpec(2024, "FY").period_end == datetime(2024, 12, 31)
+        assert PeriodSpec(2024, "Q2").date_window() == (datetime(2024, 4, 1), datetime(2024, 7, 31))
+
+
+class TestReleaseIndexing:
+    """The earnings-release preference must not depend on which period indexes first."""
+
+    RELEASE = Filing(
+        "0000006201-24-000004", "8-K", datetime(2024, 4, 25), "ex991.htm", "2.02,9.01", "EX-99.1"
+    )
+    # The Q1 10-Q, filed in both the Q1 and Q2 windows.
+    REPORT = Filing("0000006201-24-000005", "10-Q", datetime(2024, 4, 26), "aal-20240331.htm")
+    DOCUMENTS = {
+        "ex991.htm": b"<p>American Airlines reports first-quarter results.</p>",
+        "aal-20240331.htm": "".join(f"<p>{line}</p>" for line in TEN_Q.split("\n")).encode(),
+    }
+
+    def _run(self, tmp_path, monkeypatch, order):
+        monkeypatch.setattr(config, "CHROMA_DIR", tmp_path / "-".join(order))
+        monkeypatch.setattr(config, "SUMMARIES_PATH", tmp_path / "insights.json")
+        monkeypatch.setattr(config, "TEXT_CACHE_ENABLED", False)
+        monkeypatch.setattr(config, "PARSE_WORKERS", 1)
+        monkeypatch.setattr(pipeline, "get_embedder", lambda: lambda texts: [[float(len(t)), 1.0] for t in texts])
+
+        def period_filings(client, cik, spec):
+            start, end = spec.date_window()
+            return [f for f in (self.RELEASE, self.REPORT) if start <= f.filing_date <= end]
+
+        def iter_documents(client, cik, filings, **kwargs):
+            for pos, filing in enumerate(filings):
+                yield pos, self.DOCUMENTS[filing.primary_document]
+
+        retrieved = {}
+
+        def summarize_period(airline, label, collection_name, _, where=None):
+            found = embed._client().get_collection(collection_name).get(where=where, include=["metadatas"])
+            retrieved[label] = sorted(m.get("item", m["form"]) for m in found["metadatas"])
+            return label
+
+        monkeypatch.setattr(pipeline, "period_filings", period_filings)
+        monkeypatch.setattr(pipeline, "iter_documents", iter_documents)
+        monkeypatch.setattr(pipeline, "summarize_period", summarize_period)
+        client = SimpleNamespace(resolve_ciks=lambda airlines: {a: AAL_CIK for a in airlines})
+        for period in order:
+            pipeline.run(["AAL"], [2024], [period], overwrite=True, client=client)
+        stored = embed._collection(embed.collection_for("AAL")).get(include=["documents", "metadatas"])
+        metadatas = [sorted(m.items()) for m in stored["metadatas"]]
+        return sorted(zip(stored["ids"], stored["documents"], metadatas)), retrieved
+
+    def test_q1_then_q2_matches_q2_then_q1(self, tmp_path, monkeypatch):
+        forward, retrieved = self._run(tmp_path, monkeypatch, ["Q1", "Q2"])
+        backward, again = self._run(tmp_path, monkeypatch, ["Q2", "Q1"])
+        assert forward == backward
+        assert retrieved == again
+        # Q1 has a release after it closed, so the 10-Q's statements are left out.
+        assert "financial_statements" not in retrieved["2024Q1"]
+        assert "financial_statements" in retrieved["2024Q2"]
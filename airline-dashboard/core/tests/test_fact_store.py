@@ -0,0 +1,85 @@
+"""Tests for the point-in-time XBRL fact store."""
+
+import pytest
+
+from sec_pipeline.fact_store import FactStore, extract_as_reported
+from sec_pipeline.xbrl import extract_financials
+
+CIK = "0000006201"
+
+
+def _rev(start, end, val, accn, filed, fp, form="10-Q"):
+    return {
+        "start": start, "end": end, "val": val, "accn": accn,
+        "fy": int(filed[:4]), "fp": fp, "form": form, "filed": filed,
+    }
+
+
+@pytest.fixture
+def restated_payload():
+    revenue = [
+        _rev("2023-01-01", "2023-03-31", 100.0, "0000006201-23-000010", "2023-04-20", "Q1"),
+        _rev("2023-04-01", "2023-06-30", 120.0, "0000006201-23-000020", "2023-07-20", "Q2"),
+        # The 2024 Q1 10-Q restates the prior-year comparative.
+        _rev("2023-01-01", "2023-03-31", 110.0, "0000006201-24-000010", "2024-04-22", "Q1"),
+        _rev("2024-01-01", "2024-03-31", 130.0, "0000006201-24-000010", "2024-04-22", "Q1"),
+    ]
+    cash = [
+        {"end": "2023-03-31", "val": 7.0, "accn": "0000006201-23-000010",
+         "fy": 2023, "fp": "Q1", "form": "10-Q", "filed": "2023-04-20"},
+    ]
+    return {
+        "facts": {
+            "us-gaap": {
+                "Revenues": {"units": {"USD": revenue}},
+                "CashAndCashEquivalentsAtCarryingValue": {"units": {"USD": cash}},
+            }
+        }
+    }
+
+
+@pytest.fixture
+def store(tmp_path, restated_payload):
+    store = FactStore(tmp_path / "facts.sqlite3")
+    store.ingest(CIK, restated_payload)
+    yield store
+    store.close()
+
+
+class TestFactStore:
+    def test_point_lookups(self, store):
+        assert store.latest_value(CIK, "Revenues", "2023-03-31", 89) == 110.0
+        assert store.value_as_of(CIK, "Revenues", "2023-03-31", 89, as_of="2023-12-31") == 100.0
+        assert store.value_as_of(CIK, "Revenues", "2023-03-31", 89, as_of="2023-01-01") is None
+        assert store.latest_value(CIK, "CashAndCashEquivalentsAtCarryingValue", "2023-03-31") == 7.0
+
+    def test_lookup_prefers_accession_like_the_extractor(self, tmp_path):
+        # A late-filed fact from a lower accession loses, as it does in xbrl.py.
+        revenue = [
+            _rev("2023-01-01", "2023-03-31", 100.0, "0000006201-23-000020", "2023-04-20", "Q1"),
+            _rev("2023-01-01", "2023-03-31", 90.0, "0000006201-23-000010", "2023-05-01", "Q1"),
+        ]
+        payload = {"facts": {"us-gaap": {"Revenues": {"units": {"USD": revenue}}}}}
+        store = FactStore(tmp_path / "facts.sqlite3")
+        store.ingest(CIK, payload)
+        assert store.latest_value(CIK, "Revenues", "2023-03-31", 89) == 100.0
+        assert extract_financials(payload, [2023], ["Q1"])[0]["Operating Revenue"] == 100.0
+        store.close()
+
+    def test_reingest_is_idempotent(self, store, restated_payload):
+        before = store.snapshot(CIK)
+        store.ingest(CIK, restated_payload)
+        assert store.snapshot(CIK) == before
+
+    def test_first_filed(self, store):
+        assert store.first_filed(CIK, 2023, "Q1") == "2023-04-20"
+        assert store.first_filed(CIK, 2023, "Q2") == "2023-07-20"
+        assert store.first_filed(CIK, 2022, "Q1") is None
+
+    def test_as_reported_vs_restated(self, store, restated_payload):
+        restated = extract_financials(restated_payload, [2023], ["Q1"])
+        original = extract_as_reported(store, CIK, [2023], ["Q1", "Q2"])
+        assert restated[0]["Operating Revenue"] == 110.0
+        assert [r["Operating Revenue"] for r in original] == [100.0, 120.0]
+        assert original[0]["As Of"] == "2023-04-20"
+        assert original[0]["Unrestricted Cash"] == 7.0
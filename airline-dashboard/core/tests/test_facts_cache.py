@@ -0,0 +1,65 @@
+"""Tests for the tag-pruned companyfacts ingest and its on-disk cache."""
+
+import sys
+
+import pytest
+
+from helpers import AAL_CIK, PERIODS, YEARS, synthetic_companyfacts, write_bulk_dir
+from sec_pipeline import facts_cache
+from sec_pipeline.edgar_client import EdgarClient
+from sec_pipeline.facts_cache import PrunedFactsCache, load_company_facts
+from sec_pipeline.xbrl import XBRL_TAGS, extract_financials
+
+FACTS_PATH = f"/api/xbrl/companyfacts/CIK{AAL_CIK}.json"
+
+
+@pytest.fixture
+def payload():
+    facts = synthetic_companyfacts(4)
+    facts["facts"]["dei"] = {"EntityCommonStockSharesOutstanding": {"units": {}}}
+    return facts
+
+
+def _no_parse(*_args, **_kwargs):
+    raise AssertionError("cache hit must not re-parse the payload")
+
+
+class TestPrunedFacts:
+    @pytest.mark.parametrize("streaming", [True, False])
+    def test_pruned_payload_extracts_identically(self, isolated, stand_in, monkeypatch, payload, streaming):
+        if not streaming:
+            monkeypatch.setitem(sys.modules, "ijson", None)
+        client = EdgarClient(base_url=stand_in({FACTS_PATH: payload}).url)
+        pruned = load_company_facts(client, "6201")
+        assert set(pruned["facts"]["us-gaap"]) == set(XBRL_TAGS)
+        assert extract_financials(pruned, YEARS, PERIODS) == extract_financials(
+            payload, YEARS, PERIODS
+        )
+
+    def test_unchanged_body_revalidates_without_download(self, isolated, stand_in, monkeypatch, payload):
+        server = stand_in({FACTS_PATH: payload})
+        client = EdgarClient(base_url=server.url)
+        first = load_company_facts(client, "6201")
+        monkeypatch.setattr(facts_cache, "prune_company_facts", _no_parse)
+        assert load_company_facts(client, "CIK0000006201") == first
+        assert server.requests == {(FACTS_PATH, 200): 1, (FACTS_PATH, 304): 1}
+        assert client.cache_stats == {"hits": 0, "revalidated": 1, "misses": 1}
+
+    def test_changed_body_replaces_entry(self, isolated, stand_in, payload):
+        load_company_facts(EdgarClient(base_url=stand_in({FACTS_PATH: payload}).url), "6201")
+        payload["facts"]["us-gaap"].pop("NetIncomeLoss")
+        client = EdgarClient(base_url=stand_in({FACTS_PATH: payload}).url)
+        pruned = load_company_facts(client, "6201")
+        assert "NetIncomeLoss" not in pruned["facts"]["us-gaap"]
+        assert len(list(facts_cache.FACTS_CACHE_DIR.glob("CIK0000006201-*"))) == 1
+
+    def test_bulk_member_validated_by_crc(self, offline, monkeypatch, payload):
+        client = EdgarClient(bulk_dir=write_bulk_dir(offline, payload))
+        cache = PrunedFactsCache()
+        first = load_company_facts(client, "6201", cache=cache)
+        monkeypatch.setattr(facts_cache, "prune_company_facts", _no_parse)
+        assert load_company_facts(client, "6201", cache=cache) == first
+        payload["facts"]["us-gaap"].pop("NetIncomeLoss")
+        client = EdgarClient(bulk_dir=write_bulk_dir(offline, payload))
+        with pytest.raises(AssertionError, match="re-parse"):
+            load_company_facts(client, "6201", cache=cache)
@@ -0,0 +1,91 @@
+"""Per-CIK filing index: bisect window queries and lazy history shards."""
+
+import json
+import random
+import zipfile
+from datetime import datetime, timedelta
+
+from helpers import AAL_CIK
+from sec_pipeline.edgar_client import EdgarClient, Filing, FilingIndex
+
+FORMS = ("10-Q", "10-K", "8-K", "4", "S-8")
+
+
+def _filings(rng: random.Random, start: datetime, days: int, n: int, tag: str) -> list[Filing]:
+    rows = [
+        Filing(
+            f"{tag}-{i:06d}",
+            rng.choice(FORMS),
+            start + timedelta(days=rng.randrange(days)),
+            f"{tag}{i}.htm",
+        )
+        for i in range(n)
+    ]
+    return sorted(rows, key=lambda f: f.filing_date, reverse=True)
+
+
+def _columns(filings: list[Filing]) -> dict:
+    return {
+        "accessionNumber": [f.accession for f in filings],
+        "form": [f.form for f in filings],
+        "filingDate": [f.filing_date.strftime("%Y-%m-%d") for f in filings],
+        "primaryDocument": [f.primary_document for f in filings],
+    }
+
+
+def _linear(filings, start, end, forms):
+    return [f for f in filings if f.form in forms and start <= f.filing_date <= end]
+
+
+class TestFilingIndex:
+    def test_window_matches_linear_scan(self):
+        rng = random.Random(0)
+        recent = _filings(rng, datetime(2020, 1, 1), 1500, 400, "r")
+        index = FilingIndex(recent, [], lambda name: [])
+        for _ in range(50):
+            start = datetime(2020, 1, 1) + timedelta(days=rng.randrange(1500))
+            end = start + timedelta(days=rng.randrange(200))
+            forms = tuple(rng.sample(FORMS, 2)) + ("DEF 14A",)
+            assert index.window(start, end, forms) == _linear(recent, start, end, forms)
+
+    def test_shards_page_in_only_for_older_windows(self):
+        rng = random.Random(1)
+        recent = _filings(rng, datetime(2020, 1, 1), 1000, 100, "r")
+        old = _filings(rng, datetime(2010, 1, 1), 3000, 100, "o")
+        shard = {"name": "CIK-001.json", "filingFrom": "2010-01-01", "filingTo": "2018-12-31"}
+        loads = []
+
+        def load(name):
+            loads.append(name)
+            return old
+
+        index = FilingIndex(recent, [shard], load)
+        window = (datetime(2021, 1, 1), datetime(2021, 6, 30), FORMS)
+        assert index.window(*window) == _linear(recent, *window)
+        assert loads == []
+        window = (datetime(2012, 1, 1), datetime(2013, 12, 31), FORMS)
+        assert index.window(*window) == _linear(old, *window)
+        index.window(datetime(2011, 1, 1), datetime(2011, 3, 31), FORMS)
+        assert loads == ["CIK-001.json"]
+        assert len(index) == 200
+
+    def test_client_pages_bulk_shard(self, offline):
+        rng = random.Random(2)
+        recent = _filings(rng, datetime(2022, 1, 1), 700, 30, "r")
+        old = _filings(rng, datetime(2015, 1, 1), 700, 30, "o")
+        shard = f"CIK{AAL_CIK}-submissions-001.json"
+        submissions = {
+            "filings": {
+                "recent": _columns(recent),
+                "files": [{"name": shard, "filingFrom": "2015-01-01", "filingTo": "2016-12-31"}],
+            }
+        }
+        with zipfile.ZipFile(offline / "submissions.zip", "w") as zf:
+            zf.writestr(f"CIK{AAL_CIK}.json", json.dumps(submissions))
+            zf.writestr(shard, json.dumps(_columns(old)))
+
+        client = EdgarClient(bulk_dir=offline)
+        assert client.list_filings(AAL_CIK) == recent
+        window = (datetime(2015, 6, 1), datetime(2016, 6, 1), ("10-Q", "10-K"))
+        assert client.filings_in_window(AAL_CIK, *window) == _linear(old, *window)
+        assert client.filing_index(AAL_CIK) is client.filing_index("6201")
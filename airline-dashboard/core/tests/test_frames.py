@@ -0,0 +1,93 @@
+"""Frames-API ingestion against a local stand-in for data.sec.gov."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from sec_pipeline import config
+from sec_pipeline.edgar_client import EdgarClient
+from sec_pipeline.frames import _INSTANT_TAGS, _tag_units, load_frames_facts
+from sec_pipeline.xbrl import XBRL_TAGS, extract_financials
+
+YEARS = [2022, 2023]
+PERIODS = ["Q1", "Q2", "Q3", "Q4", "FY"]
+CIKS = ["0000006201", "0000100517"]
+
+
+def _calendar_fact(cik_seed: int, tag_idx: int, year: int, q: int | None, instant: bool) -> dict:
+    """One fact for calendar quarter ``q`` (or the full year when ``q`` is None)."""
+    if q is None:
+        start, end, fp, frame = date(year, 1, 1), date(year, 12, 31), "FY", f"CY{year}"
+    else:
+        start = date(year, q * 3 - 2, 1)
+        end = date(year + q // 4, q * 3 % 12 + 1, 1) - timedelta(days=1)
+        fp, frame = f"Q{q}", f"CY{year}Q{q}" + ("I" if instant else "")
+    fact = {
+        "end": end.isoformat(),
+        "val": (cik_seed * 1000 + tag_idx * 10 + (q or 7)) * (year - 2000),
+        "accn": f"{cik_seed:010d}-{year % 100}-{q or 9:06d}",
+        "fy": year,
+        "fp": fp,
+        "frame": frame,
+    }
+    if not instant:
+        fact["start"] = start.isoformat()
+    return fact
+
+
+def calendar_companyfacts(cik_seed: int) -> dict:
+    """A payload with exactly one calendar-aligned fact per frame and tag."""
+    gaap: dict = {}
+    for tag_idx, tag in enumerate(XBRL_TAGS):
+        instant = tag in _INSTANT_TAGS
+        quarters = [1, 2, 3, 4] if instant else [1, 2, 3, 4, None]
+        rows = [
+            _calendar_fact(cik_seed, tag_idx, year, q, instant)
+            for year in YEARS
+            for q in quarters
+        ]
+        gaap[tag] = {"units": {_tag_units(tag)[0]: rows}}
+    return {"facts": {"us-gaap": gaap}}
+
+
+def to_frames(payloads: dict[str, dict]) -> dict[str, dict]:
+    """Pivot per-company payloads into frames responses keyed by URL path."""
+    frames: dict[str, dict] = {}
+    for cik, payload in payloads.items():
+        for tag, node in payload["facts"]["us-gaap"].items():
+            for unit, rows in node["units"].items():
+                for row in rows:
+                    unit_path = unit.replace("/", "-per-")
+                    path = f"/api/xbrl/frames/us-gaap/{tag}/{unit_path}/{row['frame']}.json"
+                    data = {k: row[k] for k in ("start", "end", "val", "accn") if k in row}
+                    data["cik"] = int(cik)
+                    frames.setdefault(path, {"tag": tag, "data": []})["data"].append(data)
+    return frames
+
+
+class TestFrames:
+    def test_pivot_matches_companyfacts_extraction(self, tmp_path, monkeypatch, stand_in):
+        monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+        monkeypatch.setattr(config, "DOC_STORE_DIR", tmp_path / "filings")
+        monkeypatch.setattr(config, "SEC_MAX_REQUESTS_PER_SECOND", 10_000.0)
+        originals = {cik: calendar_companyfacts(i + 1) for i, cik in enumerate(CIKS)}
+        server = stand_in(to_frames(originals))
+
+        client = EdgarClient(base_url=server.url)
+        payloads = load_frames_facts(client, ["6201", "100517"], YEARS)
+        for cik in CIKS:
+            expected = extract_financials(originals[cik], YEARS, PERIODS)
+            assert expected
+            assert extract_financials(payloads[cik], YEARS, PERIODS) == expected
+
+    def test_missing_frame_is_empty(self, tmp_path, monkeypatch, stand_in):
+        monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+        monkeypatch.setattr(config, "DOC_STORE_DIR", tmp_path / "filings")
+        client = EdgarClient(base_url=stand_in({}).url)
+        assert client.frame("Revenues", "USD", "CY1990Q1") == []
+
+    def test_as_reported_store_is_rejected(self):
+        from scripts.build_data import build
+
+        with pytest.raises(ValueError):
+            build(["AAL"], YEARS, PERIODS, as_reported=True, source="frames")
@@ -0,0 +1,59 @@
+"""Per-URL-class HTTP cache policy and conditional revalidation."""
+
+import pytest
+import requests_cache
+
+from helpers import SUBMISSIONS, document_path, sample_filings
+from sec_pipeline import config
+from sec_pipeline.edgar_client import EdgarClient
+
+FILING = sample_filings(1)[0]
+SUBMISSIONS_PATH = "/submissions/CIK0000006201.json"
+DOCUMENT_PATH = document_path("6201", FILING)
+
+
+@pytest.fixture
+def etag_server(stand_in):
+    """Submissions and one archive document, ETag-tagged like SEC serves them."""
+    return stand_in({SUBMISSIONS_PATH: SUBMISSIONS, DOCUMENT_PATH: b"<html>10-Q</html>"})
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, etag_server):
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(config, "DOC_STORE_DIR", tmp_path / "filings")
+    monkeypatch.setattr(config, "SEC_MAX_REQUESTS_PER_SECOND", 1000.0)
+    return EdgarClient(base_url=etag_server.url)
+
+
+class TestCachePolicy:
+    def test_submissions_revalidate_with_304(self, client, etag_server):
+        first = client.list_filings("6201")
+        assert client.list_filings("6201") == first
+        assert etag_server.requests[(SUBMISSIONS_PATH, 200)] == 1
+        assert etag_server.requests[(SUBMISSIONS_PATH, 304)] == 1
+        assert client.cache_stats == {"hits": 0, "revalidated": 1, "misses": 1}
+
+    def test_archives_never_expire(self, client, etag_server, monkeypatch):
+        monkeypatch.setattr(config, "DOC_STORE_ENABLED", False)
+        client = EdgarClient(base_url=etag_server.url)
+        body = client.fetch_document("6201", FILING)
+        assert client.fetch_document("6201", FILING) == body
+        assert sum(etag_server.requests.values()) == 1
+        assert client.cache_stats == {"hits": 1, "revalidated": 0, "misses": 1}
+        assert client._is_cached(client.document_url("6201", FILING))
+
+    def test_archives_read_through_doc_store(self, client, etag_server):
+        body = client.fetch_document("6201", FILING)
+        assert client.fetch_document("6201", FILING) == body
+        assert sum(etag_server.requests.values()) == 1
+        assert client.cache_stats == {"hits": 1, "revalidated": 0, "misses": 1}
+        assert not client._is_cached(client.document_url("6201", FILING))
+        assert client.doc_store.get("0000006201", FILING.accession, FILING.primary_document) == body
+
+    def test_policy_follows_base_url(self, client, etag_server):
+        host = etag_server.url.split("://")[1]
+        policy = client._cache_policy()
+        assert policy[f"{host}/Archives/edgar/data/"] == requests_cache.DO_NOT_CACHE
+        assert policy[f"{host}/submissions/CIK"] == requests_cache.EXPIRE_IMMEDIATELY
+        assert not client._is_cached(client.SUBMISSIONS_URL.format(cik="0000006201"))
@@ -1,29 +1,82 @@
 """Unit tests for the deterministic, offline-friendly parts of the pipeline."""
 
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 import pytest
 
-from sec_pipeline.chunk import chunk_text
+from sec_pipeline.chunk import chunk_spans, chunk_text
+from sec_pipeline import config
 from sec_pipeline.config import PeriodSpec, build_periods
 from sec_pipeline.edgar_client import _RateLimiter
-from sec_pipeline.parse import clean_text, html_to_text
+from sec_pipeline.parse import clean_text, html_to_text, pdf_to_text
 
 
 class TestChunk:
     def test_short_text_single_chunk(self):
-        chunks = chunk_text("A short paragraph.", chunk_size=1200)
+        chunks = chunk_text("A short paragraph.", max_tokens=300)
         assert chunks == ["A short paragraph."]
 
     def test_long_text_splits_with_overlap(self):
         text = " ".join(f"Sentence number {i}." for i in range(400))
-        chunks = chunk_text(text, chunk_size=200, overlap=40)
+        chunks = chunk_text(text, max_tokens=50, overlap_tokens=10)
         assert len(chunks) > 1
-        assert all(len(c) <= 260 for c in chunks)  # size + tolerance
+        assert all(tokens <= 50 for _, _, tokens in chunk_spans(text, max_tokens=50, overlap_tokens=10))
+        # The next chunk opens with the last whole sentences of the one before.
+        assert chunks[1].split(". ")[0] + "." in chunks[0][-50:]
 
     def test_empty_text(self):
         assert chunk_text("") == []
 
+    def test_spans_point_into_the_text(self):
+        text = "\n\n".join(f"Paragraph {i}. " + "fleet capacity " * 20 for i in range(30))
+        start, end = text.index("Paragraph 1."), text.index("Paragraph 29.")
+        spans = chunk_spans(text, start, end, max_tokens=120, overlap_tokens=30)
+        assert spans[0][0] == start and spans[-1][1] < end
+        assert all(not text[s].isspace() and not text[e - 1].isspace() for s, e, _ in spans)
+        assert all(0 < tokens <= 120 for _, _, tokens in spans)
+        # Paragraph-sized units: whole paragraphs, never cut mid-word.
+        assert all(text[s:e].startswith(("Paragraph", "fleet")) for s, e, _ in spans)
+
+    def test_unbroken_text_is_hard_wrapped(self):
+        spans = chunk_spans("x" * 5000, max_tokens=300, overlap_tokens=40)
+        assert len(spans) == 5
+        assert all(tokens <= 300 for _, _, tokens in spans)
+        assert spans[1][0] < spans[0][1]  # windows overlap
+
+    def test_hard_wrapped_windows_are_counted(self, monkeypatch):
+        from sec_pipeline import chunk
+
+        # Dense stretches pack more tokens per character than the unit average.
+        monkeypatch.setattr(chunk, "token_counter", lambda: lambda s: len(s) + 4 * s.count("#"))
+        text = "x" * 3000 + "#" * 500 + "x" * 3000
+        spans = chunk_spans(text, max_tokens=300, overlap_tokens=40)
+        assert all(tokens == len(text[s:e]) + 4 * text[s:e].count("#") for s, e, tokens in spans)
+        assert all(tokens <= 300 for _, _, tokens in spans)
+        assert spans[-1][1] == len(text)
+
+
+class TestBuildContext:
+    def test_uses_token_metadata(self, monkeypatch):
+        from sec_pipeline import summarize
+
+        monkeypatch.setattr(summarize, "MAX_CONTEXT_TOKENS", 100)
+        passages = [("a" * 40, {"form": "10-Q", "tokens": 60}), ("b" * 40, {"tokens": 60})]
+        assert "b" not in summarize._build_context(passages)
+        # Without metadata the text itself is counted (~10 tokens here).
+        assert "b" * 40 in summarize._build_context([(t, {}) for t, _ in passages])
+
+    def test_tokenizer_only_loaded_when_needed(self, monkeypatch):
+        from sec_pipeline import summarize
+
+        def token_counter():
+            raise AssertionError("tokenizer loaded")
+
+        monkeypatch.setattr(summarize, "token_counter", token_counter)
+        assert "a" * 40 in summarize._build_context([("a" * 40, {"tokens": 10})])
+
 
 class TestParse:
     def test_clean_text_collapses_inline_whitespace(self):
@@ -39,6 +92,115 @@ class TestParse:
         assert "x=1" not in out
 
 
+_TAGS = ["p", "div", "span", "td", "tr", "table", "FONT", "ix:nonFraction", "br", "script", "style", "li"]
+_WORDS = ["Revenue", "rose", "$", "1,234", "&amp;", "&nbsp;", "&#8217;", "caf\u00e9", "\n", "\t", "<!-- c -->", "AT&T"]
+
+
+def _random_html(rng: random.Random, depth: int = 0) -> str:
+    out = []
+    for _ in range(rng.randint(1, 5)):
+        if rng.random() < 0.45 or depth > 5:
+            out.append(" ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4))))
+        else:
+            tag = rng.choice(_TAGS)
+            close = "" if rng.random() < 0.1 else f"</{tag}>"  # malformed on purpose
+            out.append(f"<{tag} style='x'>{_random_html(rng, depth + 1)}{close}")
+    return "".join(out)
+
+
+class TestStreamParser:
+    FILINGS = [
+        b"<html><head><title>10-Q</title></head><body><p>Revenue rose.</p><script>x=1</script></body></html>",
+        b"<div>Net income <span>$<ix:nonFraction name='NetIncomeLoss'>1,234</ix:nonFraction></span> million</div>",
+        b"<html><body><ix:header><ix:hidden><ix:nonNumeric>hidden</ix:nonNumeric></ix:hidden></ix:header><p>x</p></body></html>",
+        "<meta charset='windows-1252'><p>caf\u00e9 \u2014 ok</p>".encode("cp1252"),
+        b"<table><tr><td>a&nbsp;b</td><td>c</td></tr></table>\n\n\n<p>next</p>",
+        b"plain text",
+        b"",
+    ]
+
+    @pytest.mark.parametrize("html", FILINGS)
+    def test_matches_soup_backend(self, html):
+        assert html_to_text(html, backend="stream") == html_to_text(html, backend="soup")
+
+    def test_matches_soup_backend_on_random_markup(self):
+        for seed in range(200):
+            rng = random.Random(seed)
+            html = f"<html><body>{_random_html(rng)}</body></html>".encode()
+            assert html_to_text(html, backend="stream") == html_to_text(html, backend="soup"), seed
+
+    def test_long_document_fed_in_chunks(self):
+        html = ("<p>" + "word &amp; more &#8217; text " * 40 + "</p>\n") * 500
+        assert html_to_text(html.encode(), backend="stream") == html_to_text(html.encode(), backend="soup")
+
+    def test_backend_selected_by_config(self, monkeypatch):
+        from sec_pipeline import parse
+
+        calls = []
+        monkeypatch.setattr(parse, "_stream_html_to_text", lambda html: calls.append(html) or "")
+        monkeypatch.setattr(config, "HTML_PARSER", "stream")
+        html_to_text(b"<p>x</p>")
+        assert calls == [b"<p>x</p>"]
+
+
+def _pdf(pages: int) -> bytes:
+    """A ``pages``-page PDF whose page ``n`` reads "Page n revenue ..."."""
+    import io
+
+    from pypdf import PdfWriter
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for n in range(pages):
+        page = writer.add_blank_page(612, 792)
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 72 720 Td (Page {n} revenue rose) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def _pdf_to_text_in_worker(pdf: bytes) -> str:
+    from sec_pipeline import parse
+
+    config.PDF_PARALLEL_MIN_PAGES, config.PDF_WORKERS = 2, 2
+    parse.ProcessPoolExecutor = None  # a nested pool would fail here
+    return pdf_to_text(pdf)
+
+
+class TestPdf:
+    def test_pages_in_order(self):
+        text = pdf_to_text(_pdf(3), workers=1)
+        assert text == "Page 0 revenue rose\n\nPage 1 revenue rose\n\nPage 2 revenue rose"
+
+    def test_page_cap(self, monkeypatch):
+        pdf = _pdf(5)
+        assert pdf_to_text(pdf, max_pages=2, workers=1).count("revenue") == 2
+        monkeypatch.setattr(config, "PDF_MAX_PAGES", 3)
+        assert pdf_to_text(pdf, workers=1).count("revenue") == 3
+        assert pdf_to_text(pdf, max_pages=0, workers=1).count("revenue") == 5
+
+    def test_parallel_matches_serial(self, monkeypatch):
+        monkeypatch.setattr(config, "PDF_PARALLEL_MIN_PAGES", 2)
+        pdf = _pdf(11)
+        assert pdf_to_text(pdf, workers=3) == pdf_to_text(pdf, workers=1)
+        assert pdf_to_text(pdf, max_pages=7, workers=2) == pdf_to_text(pdf, max_pages=7, workers=1)
+
+    def test_worker_process_extracts_in_process(self):
+        pdf = _pdf(4)
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context(config.MP_START_METHOD)) as pool:
+            assert pool.submit(_pdf_to_text_in_worker, pdf).result() == pdf_to_text(pdf, workers=1)
+
+
 class TestPeriodSpec:
     def test_label_roundtrip(self):
         spec = PeriodSpec(2024, "Q2")
@@ -0,0 +1,143 @@
+"""Unified refresh: one plan, one shared client, both stages together."""
+
+import json
+
+from helpers import AAL_CIK, redirect_outputs
+from scripts import build_data, refresh
+from sec_pipeline import config, embed, pipeline
+from sec_pipeline.config import PeriodSpec
+from sec_pipeline.discovery import RefreshPlan
+from sec_pipeline.edgar_client import EdgarClient
+from sec_pipeline.replay import ReplayServer
+
+
+def _offline_insights(monkeypatch, root):
+    """Stub the embedding and LLM steps; chunks retrieved per period are recorded."""
+    collections = {}
+    monkeypatch.setattr(config, "CHROMA_DIR", root / "chroma")
+    monkeypatch.setattr(pipeline, "get_embedder", lambda: lambda texts: [[float(len(t)), 1.0] for t in texts])
+
+    def summarize_period(airline, label, collection_name, _, where=None):
+        collections[label] = embed.collection_size(collection_name, where)
+        return f"{airline} {label} summary"
+
+    monkeypatch.setattr(pipeline, "summarize_period", summarize_period)
+    return collections
+
+
+class TestRefresh:
+    def test_plan_skips_summarized_insights(self, isolated, monkeypatch):
+        redirect_outputs(monkeypatch, isolated)
+        config.SUMMARIES_PATH.write_text(json.dumps({"AAL": {"2024": {"Q1": "done"}}}))
+        plan = refresh.plan_run(["AAL", "UAL"], [2024], ["Q1", "Q2"])
+        assert plan.financials == {PeriodSpec(2024, "Q1"): {"AAL", "UAL"}, PeriodSpec(2024, "Q2"): {"AAL", "UAL"}}
+        assert plan.insights == {PeriodSpec(2024, "Q1"): {"UAL"}, PeriodSpec(2024, "Q2"): {"AAL", "UAL"}}
+        overwrite = refresh.plan_run(["AAL"], [2024], ["Q1"], overwrite_insights=True)
+        assert overwrite.insights == {PeriodSpec(2024, "Q1"): {"AAL"}}
+        assert not refresh.plan_run(["AAL"], [2024], ["Q1"], insights=False).insights
+
+    def test_financials_build_only_planned_keys(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            build_data, "build", lambda airlines, years, periods, **_: calls.append((airlines, years, periods))
+        )
+        plan = RefreshPlan(
+            {
+                PeriodSpec(2023, "Q4"): {"AAL"},
+                PeriodSpec(2024, "Q1"): {"AAL"},
+                PeriodSpec(2024, "Q2"): {"AAL"},
+                PeriodSpec(2025, "Q1"): {"AAL"},
+                PeriodSpec(2025, "Q2"): {"AAL"},
+            },
+            {},
+        )
+        refresh._financials(plan, None, incremental=False, workers=None)
+        assert calls == [(["AAL"], [2023], ["Q4"]), (["AAL"], [2024, 2025], ["Q1", "Q2"])]
+
+    def test_offline_refresh_shares_one_client(self, isolated, fixtures, monkeypatch):
+        redirect_outputs(monkeypatch, isolated)
+        collections = _offline_insights(monkeypatch, isolated)
+        with ReplayServer(fixtures) as server:
+            monkeypatch.setattr(config, "SEC_BASE_URL", server.url)
+            refresh.refresh(["AAL"], [2022, 2024], ["Q2"], workers=1)
+            again = refresh.plan_run(["AAL"], [2022, 2024], ["Q2"])
+
+        financials = json.loads(build_data.FINANCIALS_PATH.read_text())
+        assert {(r["Airline"], r["Year"], r["Quarter"]) for r in financials} == {("AAL", 2022, "Q2")}
+        assert json.loads(config.SUMMARIES_PATH.read_text()) == {"AAL": {"2024": {"Q2": "AAL 2024Q2 summary"}}}
+        assert collections["2024Q2"] > 0
+        # Submissions were read once for both insight periods.
+        assert server.requests[(f"/submissions/CIK{AAL_CIK}.json", 200)] == 1
+        assert server.requests[(f"/submissions/CIK{AAL_CIK}.json", 304)] == 0
+        assert again.insights == {PeriodSpec(2022, "Q2"): {"AAL"}}
+
+
+class TestAirlineCollection:
+    def test_filings_are_embedded_once_across_periods(self, isolated, fixtures, monkeypatch):
+        redirect_outputs(monkeypatch, isolated)
+        retrieved = _offline_insights(monkeypatch, isolated)
+        embedded = []
+        monkeypatch.setattr(
+            pipeline, "get_embedder", lambda: lambda texts: embedded.extend(texts) or [[float(len(t)), 1.0] for t in texts]
+        )
+        with ReplayServer(fixtures) as server:
+            client = EdgarClient(base_url=server.url)
+            pipeline.run(["AAL"], [2024], ["Q2"], client=client)
+            first = len(embedded)
+            pipeline.run(["AAL"], [2024], ["Q2"], overwrite=True, client=client)
+        assert first > 0 and len(embedded) == first
+        assert {a for a, _ in embed.indexed_documents(embed.collection_for("AAL"))} == {"0000006201-24-000010", "0000006201-24-000004"}
+        assert retrieved["2024Q2"] == first
+        # The April 8-K falls in both the Q1 and Q2 windows; the 10-Q only in Q2.
+        q1 = embed.collection_size(embed.collection_for("AAL"), embed.filing_window(*PeriodSpec(2024, "Q1").date_window()))
+        assert 0 < q1 < first
+        assert embed.collection_size(embed.collection_for("AAL"), embed.filing_window(*PeriodSpec(2022, "Q2").date_window())) == 0
+
+    def test_reindex_re_embeds_each_document_once(self, isolated, fixtures, monkeypatch):
+        redirect_outputs(monkeypatch, isolated)
+        retrieved = _offline_insights(monkeypatch, isolated)
+        embedded = []
+        monkeypatch.setattr(
+            pipeline, "get_embedder", lambda: lambda texts: embedded.extend(texts) or [[float(len(t)), 1.0] for t in texts]
+        )
+        with ReplayServer(fixtures) as server:
+            client = EdgarClient(base_url=server.url)
+            pipeline.run(["AAL"], [2024], ["Q1", "Q2"], client=client)
+            first, sizes = len(embedded), dict(retrieved)
+            documents = embed.indexed_documents(embed.collection_for("AAL"))
+            # Summarized already, but --reindex implies --overwrite.
+            pipeline.run(["AAL"], [2024], ["Q1", "Q2"], client=client, reindex=True)
+        # The April 8-K is in both windows and re-embedded only for Q1.
+        assert len(embedded) == 2 * first
+        assert retrieved == sizes
+        assert embed.indexed_documents(embed.collection_for("AAL")) == documents
+
+    def test_failed_exhibit_is_indexed_by_a_later_run(self, isolated, fixtures, monkeypatch):
+        redirect_outputs(monkeypatch, isolated)
+        _offline_insights(monkeypatch, isolated)
+        failing = {"ex991.htm"}
+        fetch = pipeline.iter_documents
+
+        def iter_documents(client, cik, filings, **kwargs):
+            for pos, content in fetch(client, cik, filings, **kwargs):
+                if filings[pos].primary_document in failing:
+                    content = OSError("connection reset")
+                yield pos, content
+
+        monkeypatch.setattr(pipeline, "iter_documents", iter_documents)
+        with ReplayServer(fixtures) as server:
+            client = EdgarClient(base_url=server.url)
+            pipeline.run(["AAL"], [2024], ["Q2"], client=client)
+            first = embed.indexed_documents(embed.collection_for("AAL"))
+            failing.clear()
+            pipeline.run(["AAL"], [2024], ["Q2"], overwrite=True, client=client)
+        assert first == {("0000006201-24-000010", "aal-20240630.htm"), ("0000006201-24-000004", "ex992.htm")}
+        assert embed.indexed_documents(embed.collection_for("AAL")) - first == {("0000006201-24-000004", "ex991.htm")}
+
+    def test_each_embedding_model_has_its_own_collection(self, monkeypatch):
+        monkeypatch.setattr(config, "LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        monkeypatch.setattr(config, "OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+        monkeypatch.setattr(config, "EMBEDDING_BACKEND", "local")
+        assert embed.collection_for("AAL") == "aal-filings-local-sentence-transformers-all-MiniLM-L6-v2"
+        monkeypatch.setattr(config, "EMBEDDING_BACKEND", "openai")
+        assert embed.collection_for("AAL") == "aal-filings-openai-text-embedding-3-small"
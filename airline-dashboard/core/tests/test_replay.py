@@ -0,0 +1,108 @@
+"""Record/replay EDGAR fixtures and fully offline end-to-end runs."""
+
+import json
+
+import pandas as pd
+
+from helpers import AAL_CIK, FACTS, PERIODS, YEARS, redirect_outputs, write_bulk_dir
+from scripts import build_data
+from sec_pipeline import config
+from sec_pipeline.config import PeriodSpec
+from sec_pipeline.edgar_client import EdgarClient
+from sec_pipeline.pipeline import build_period_chunks, iter_period_chunks, parse_pool
+from sec_pipeline.replay import ReplayServer, record
+
+
+class TestRecordReplay:
+    def test_recording_captures_every_response(self, fixtures, source):
+        recorded = json.loads((fixtures / "manifest.json").read_text())
+        assert recorded["format"] == 1
+        assert {p: e["etag"] for p, e in recorded["responses"].items()} == {
+            p: e["etag"] for p, e in source.responses.items()
+        }
+
+    def test_replay_revalidates_and_reports_misses(self, fixtures):
+        with ReplayServer(fixtures) as server:
+            client = EdgarClient(base_url=server.url)
+            assert client.list_filings(AAL_CIK) == client.list_filings(AAL_CIK)
+            assert client.daily_index(PeriodSpec(2024, "Q2").date_window()[0]) is None
+        path = f"/submissions/CIK{AAL_CIK}.json"
+        assert server.requests[(path, 200)] == 1
+        assert server.requests[(path, 304)] == 1
+        assert len(server.missing) == 1
+
+    def test_replayed_documents_match_the_store_recording(self, isolated, source):
+        # A second recording serves documents from the store, not the network.
+        client = EdgarClient(base_url=source.url)
+        record(isolated / "first", ["AAL"], [2024], ["Q2"], client=client)
+        record(isolated / "second", ["AAL"], [2024], ["Q2"], client=client)
+        first = json.loads((isolated / "first" / "manifest.json").read_text())["responses"]
+        second = json.loads((isolated / "second" / "manifest.json").read_text())["responses"]
+        assert {p: e["etag"] for p, e in first.items()} == {p: e["etag"] for p, e in second.items()}
+
+
+class TestOfflineEndToEnd:
+    def test_load_auto_matches_bulk_archive(self, isolated, fixtures):
+        bulk = isolated / "bulk"
+        bulk.mkdir()
+        expected = build_data.load_auto(
+            ["AAL"], YEARS, PERIODS, client=EdgarClient(bulk_dir=write_bulk_dir(bulk, FACTS)), workers=1
+        )
+        with ReplayServer(fixtures) as server:
+            client = EdgarClient(base_url=server.url)
+            replayed = build_data.load_auto(["AAL"], YEARS, PERIODS, client=client, workers=1)
+        assert not replayed.empty
+        pd.testing.assert_frame_equal(replayed, expected)
+
+    def test_build_period_chunks(self, fixtures):
+        with ReplayServer(fixtures) as server:
+            client = EdgarClient(base_url=server.url)
+            chunks = build_period_chunks(client, AAL_CIK, PeriodSpec(2024, "Q2"))
+        assert server.missing == []
+        assert [c.metadata["form"] for c in chunks] == ["10-Q", "8-K", "8-K"]
+        assert [c.metadata.get("exhibit") for c in chunks] == [None, None, "EX-99.1"]
+        assert all(c.metadata["tokens"] > 0 for c in chunks)
+        assert "Quarterly revenue rose" in chunks[0].text
+        assert "capacity guidance" in chunks[2].text
+
+    def test_parallel_parse_matches_serial(self, fixtures, monkeypatch):
+        monkeypatch.setattr(config, "TEXT_CACHE_ENABLED", False)
+        spec = PeriodSpec(2024, "Q2")
+        with ReplayServer(fixtures) as server:
+            client = EdgarClient(base_url=server.url)
+            monkeypatch.setattr(config, "PARSE_WORKERS", 1)
+            serial = build_period_chunks(client, AAL_CIK, spec)
+            with parse_pool(2) as pool:
+                parallel = build_period_chunks(client, AAL_CIK, spec, pool)
+        assert parallel == serial
+        assert [c.metadata["accession"] for c in parallel] == [
+            "0000006201-24-000010", "0000006201-24-000004", "0000006201-24-000004"
+        ]
+
+    def test_streamed_chunks_match_the_list(self, fixtures, monkeypatch):
+        monkeypatch.setattr(config, "TEXT_CACHE_ENABLED", False)
+        monkeypatch.setattr(config, "STREAM_BUFFER", 1)  # one document ahead of the consumer
+        spec = PeriodSpec(2024, "Q2")
+        with ReplayServer(fixtures) as server:
+            client = EdgarClient(base_url=server.url)
+            listed = build_period_chunks(client, AAL_CIK, spec)
+            with parse_pool(2) as pool:
+                streamed = list(iter_period_chunks(client, AAL_CIK, spec, pool))
+                ordered = list(iter_period_chunks(client, AAL_CIK, spec, pool, ordered=True))
+        assert ordered == listed
+        key = lambda c: (c.metadata["accession"], c.metadata.get("exhibit", ""), c.text)  # noqa: E731
+        assert sorted(streamed, key=key) == sorted(listed, key=key)
+
+    def test_build_writes_financials(self, isolated, fixtures, monkeypatch):
+        redirect_outputs(monkeypatch, isolated)
+        with ReplayServer(fixtures) as server:
+            monkeypatch.setattr(config, "SEC_BASE_URL", server.url)
+            build_data.build(["AAL"], YEARS, PERIODS, overwrite=True, workers=1, incremental=True)
+            first = json.loads(build_data.FINANCIALS_PATH.read_text())
+            build_data.build(["AAL"], YEARS, PERIODS, overwrite=True, workers=1, incremental=True)
+        assert first
+        assert {r["Airline"] for r in first} == {"AAL"}
+        assert json.loads(build_data.FINANCIALS_PATH.read_text()) == first
+        facts_path = f"/api/xbrl/companyfacts/CIK{AAL_CIK}.json"
+        assert server.requests[(facts_path, 200)] == 1
+        assert server.requests[(facts_path, 304)] == 1
@@ -0,0 +1,71 @@
+"""10-K/10-Q Item segmentation and the section filter."""
+
+from helpers import TEN_K, TEN_Q
+from sec_pipeline import config, pipeline
+from sec_pipeline.sections import Section, segment, select
+
+
+def _of(text: str, section: Section) -> str:
+    return text[section.start : section.end]
+
+
+class TestSegment:
+    def test_10k_skips_contents_and_cross_references(self):
+        sections = segment(TEN_K, "10-K")
+        assert [s.item for s in sections] == ["cover", "business", "risk_factors", "mdna", "exhibits"]
+        business = _of(TEN_K, sections[1])
+        assert business.startswith("ITEM 1. BUSINESS")
+        assert "Business continued" in business
+        assert _of(TEN_K, sections[2]).startswith("ITEM 1A.\nRISK FACTORS")
+        assert _of(TEN_K, sections[0]).startswith("UNITED STATES")
+        assert _of(TEN_K, sections[-1]).endswith("read like a filing.")
+
+    def test_10q_items_are_keyed_by_part(self):
+        sections = segment(TEN_Q, "10-Q")
+        assert [s.item for s in sections] == [
+            "cover", "financial_statements", "mdna", "controls",
+            "legal_proceedings", "risk_factors", "exhibits",
+        ]
+        assert "see Part II, Item 1A" in _of(TEN_Q, sections[2])
+
+    def test_unsegmented_text_is_whole(self):
+        assert segment("Item 1. Business\nshort", "10-K") == [Section(None, 0, 22)]
+        assert segment(TEN_Q, "8-K") == [Section(None, 0, len(TEN_Q))]
+        assert segment("", "10-Q") == [Section(None, 0, 0)]
+
+    def test_amendments_use_the_base_form(self):
+        assert [s.item for s in segment(TEN_K, "10-K/A")] == [s.item for s in segment(TEN_K, "10-K")]
+
+
+class TestSelect:
+    def test_deny_and_allow(self):
+        sections = segment(TEN_Q, "10-Q")
+        kept, dropped = select(sections, allow=(), deny=("risk_factors", "cover"))
+        assert "risk_factors" not in {s.item for s in kept}
+        assert set(dropped) == {"risk_factors", "cover"}
+        assert dropped["risk_factors"] == len(_of(TEN_Q, sections[5]))
+        kept, _ = select(sections, allow=("mdna",), deny=())
+        assert [s.item for s in kept] == ["mdna"]
+
+    def test_unsegmented_text_is_always_kept(self):
+        whole = [Section(None, 0, 16)]
+        assert select(whole, allow=("mdna",), deny=()) == (whole, {})
+
+    def test_default_filter_keeps_what_the_prompts_ask_about(self):
+        kept, dropped = select(segment(TEN_K, "10-K"))
+        assert [s.item for s in kept] == ["business", "mdna"]
+        assert set(dropped) == {"cover", "risk_factors", "exhibits"}
+
+
+class TestSectionChunks:
+    def test_chunks_carry_their_item(self):
+        pieces, dropped = pipeline._section_chunks(TEN_Q, "10-Q")
+        assert {item for item, *_ in pieces} == {"financial_statements", "mdna", "legal_proceedings"}
+        assert "controls" in dropped
+        assert not any("Risk paragraph" in TEN_Q[start:end] for _, start, end, _ in pieces)
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(config, "SECTIONS_ENABLED", False)
+        pieces, dropped = pipeline._section_chunks(TEN_Q, "10-Q")
+        assert dropped == {}
+        assert {item for item, *_ in pieces} == {None}
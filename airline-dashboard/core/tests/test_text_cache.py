@@ -0,0 +1,67 @@
+"""Parsed-text cache consulted by build_period_chunks."""
+
+import shutil
+
+import pytest
+
+from helpers import AAL_CIK
+from sec_pipeline import config, pipeline, text_cache
+from sec_pipeline.config import PeriodSpec
+from sec_pipeline.edgar_client import EdgarClient
+from sec_pipeline.replay import ReplayServer
+from sec_pipeline.text_cache import ParsedTextCache
+
+
+@pytest.fixture
+def counted(isolated, fixtures, monkeypatch):
+    """Replay server plus the documents fetched and parsed by the pipeline."""
+    shutil.rmtree(config.CACHE_DIR / "text", ignore_errors=True)  # filled while recording
+    monkeypatch.setattr(config, "PARSE_WORKERS", 1)  # parse in-process, where it is counted
+    fetched, parsed = [], []
+    fetch, parse = pipeline.iter_documents, pipeline.document_to_text
+
+    def iter_documents(client, cik, filings, **kwargs):
+        fetched.extend(f.primary_document for f in filings)
+        return fetch(client, cik, filings, **kwargs)
+
+    monkeypatch.setattr(pipeline, "iter_documents", iter_documents)
+    monkeypatch.setattr(pipeline, "document_to_text", lambda c, name: parsed.append(name) or parse(c, name))
+    with ReplayServer(fixtures) as server:
+        yield server, fetched, parsed
+
+
+def _chunks(server, spec):
+    return pipeline.build_period_chunks(EdgarClient(base_url=server.url), AAL_CIK, spec)
+
+
+class TestParsedTextCache:
+    def test_overlapping_windows_parse_each_document_once(self, counted):
+        server, fetched, parsed = counted
+        q2 = _chunks(server, PeriodSpec(2024, "Q2"))
+        assert _chunks(server, PeriodSpec(2024, "Q2")) == q2
+        q3 = _chunks(server, PeriodSpec(2024, "Q3"))
+        assert sorted(fetched) == sorted(parsed) == ["aal-20240630.htm", "ex991.htm", "ex992.htm"]
+        assert [c.metadata["form"] for c in q2] == ["10-Q", "8-K", "8-K"]
+        assert [c for c in q2 if c.metadata["form"] == "10-Q"] == q3
+
+    def test_disabled_cache_parses_every_time(self, counted, monkeypatch):
+        monkeypatch.setattr(config, "TEXT_CACHE_ENABLED", False)
+        server, fetched, parsed = counted
+        _chunks(server, PeriodSpec(2024, "Q2"))
+        _chunks(server, PeriodSpec(2024, "Q2"))
+        assert len(parsed) == len(fetched) == 6
+        assert not (config.CACHE_DIR / "text").exists()
+
+    def test_parser_change_invalidates(self, isolated):
+        ParsedTextCache().put("0000006201-24-000010", "a.htm", "old text")
+        assert ParsedTextCache().get("0000006201-24-000010", "a.htm") == "old text"
+        old_root = ParsedTextCache().root
+        old_root.rename(old_root.with_name("0" * 16))  # as written by another parse.py
+        cache = ParsedTextCache()
+        assert cache.get("0000006201-24-000010", "a.htm") is None
+        assert [p.name for p in cache.root.parent.iterdir()] == [text_cache.parser_version()]
+
+    def test_pdf_page_cap_invalidates(self, isolated, monkeypatch):
+        ParsedTextCache().put("0000006201-24-000010", "a.pdf", "first pages")
+        monkeypatch.setattr(config, "PDF_MAX_PAGES", 5)
+        assert ParsedTextCache().get("0000006201-24-000010", "a.pdf") is None
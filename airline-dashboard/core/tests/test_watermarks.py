@@ -0,0 +1,105 @@
+"""Incremental extraction from per-CIK accession watermarks."""
+
+import copy
+
+import pytest
+
+from helpers import PERIODS, YEARS, synthetic_companyfacts, write_bulk_dir
+from sec_pipeline import config
+from sec_pipeline.watermarks import Watermarks, extract_periods
+from sec_pipeline.xbrl import extract_financials
+
+CIK = "0000000001"
+
+
+def filed_by(facts: dict, cutoff: str) -> dict:
+    """The payload as it stood once every fact filed on or before ``cutoff`` existed."""
+    out = copy.deepcopy(facts)
+    for node in out["facts"]["us-gaap"].values():
+        for unit, rows in node["units"].items():
+            node["units"][unit] = [r for r in rows if str(r.get("filed", "")) <= cutoff]
+    return out
+
+
+def incremental_run(marks: Watermarks, facts: dict) -> tuple[list, list]:
+    stale = marks.stale_periods(CIK, facts, YEARS, PERIODS)
+    marks.advance(CIK, facts, stale, extract_periods(facts, stale))
+    return stale, marks.records(CIK, YEARS, PERIODS)
+
+
+class TestWatermarks:
+    @pytest.mark.parametrize("seed", range(4))
+    @pytest.mark.parametrize("fp_fallback", [True, False])
+    def test_incremental_matches_full_extraction(self, tmp_path, monkeypatch, seed, fp_fallback):
+        monkeypatch.setattr(config, "XBRL_ENABLE_FP_FALLBACK", fp_fallback)
+        facts = synthetic_companyfacts(seed)
+        marks = Watermarks(tmp_path / "marks.json")
+        for cutoff in ("2020-06-30", "2021-02-15", "2021-11-30", "2022-08-15", "9999"):
+            snapshot = filed_by(facts, cutoff)
+            _, records = incremental_run(marks, snapshot)
+            assert records == extract_financials(snapshot, YEARS, PERIODS)
+            marks.save()
+            marks = Watermarks(marks.path)
+
+    def test_unchanged_filer_extracts_nothing(self, tmp_path):
+        facts = synthetic_companyfacts(1)
+        marks = Watermarks(tmp_path / "marks.json")
+        first, _ = incremental_run(marks, filed_by(facts, "2021-02-15"))
+        assert len(first) == len(YEARS) * len(PERIODS)
+        again, _ = incremental_run(marks, filed_by(facts, "2021-02-15"))
+        assert again == []
+        later, _ = incremental_run(marks, filed_by(facts, "2021-06-30"))
+        assert 0 < len(later) < len(first)
+
+    def test_extractor_change_discards_records(self, tmp_path, monkeypatch):
+        marks = Watermarks(tmp_path / "marks.json")
+        incremental_run(marks, synthetic_companyfacts(2))
+        marks.save()
+        monkeypatch.setattr("sec_pipeline.watermarks._extractor_version", lambda: "changed")
+        assert Watermarks(marks.path).records(CIK, YEARS, PERIODS) == []
+
+    @pytest.mark.parametrize("setting, value", [("XBRL_ENABLE_FP_FALLBACK", False), ("XBRL_ENGINE", "scalar")])
+    def test_extractor_setting_change_discards_records(self, tmp_path, monkeypatch, setting, value):
+        marks = Watermarks(tmp_path / "marks.json")
+        incremental_run(marks, synthetic_companyfacts(2))
+        marks.save()
+        monkeypatch.setattr(config, setting, value)
+        assert Watermarks(marks.path).records(CIK, YEARS, PERIODS) == []
+
+    def test_load_auto_reuses_stored_records(self, offline, monkeypatch):
+        from scripts.build_data import load_auto
+
+        facts = synthetic_companyfacts(3)
+        write_bulk_dir(offline, facts)
+        marks = Watermarks(offline / "marks.json")
+        full = load_auto(["AAL"], YEARS, PERIODS, bulk_dir=str(offline), watermarks=marks)
+
+        def _no_extraction(facts, keys):
+            assert keys == []
+            return []
+
+        monkeypatch.setattr("scripts.build_data.extract_periods", _no_extraction)
+        again = load_auto(["AAL"], YEARS, PERIODS, bulk_dir=str(offline), watermarks=marks)
+        assert again.equals(full)
+
+    def test_restated_period_outside_the_slice_is_re_extracted(self, tmp_path):
+        facts = synthetic_companyfacts(0)
+        marks = Watermarks(tmp_path / "marks.json")
+        incremental_run(marks, facts)
+        old = YEARS[0]
+        restated = copy.deepcopy(facts)
+        for node in restated["facts"]["us-gaap"].values():
+            for rows in node["units"].values():
+                rows.extend(
+                    dict(r, val=999.0, filed="9999-01-01", accn="restatement")
+                    for r in list(rows)
+                    if str(r.get("end", "")).startswith(f"{old}-0")
+                )
+        # The restatement arrives while only the latest year is requested...
+        stale = marks.stale_periods(CIK, restated, YEARS[-1:], PERIODS)
+        marks.advance(CIK, restated, stale, extract_periods(restated, stale))
+        # ...and a later request for the restated year must not reuse its old records.
+        stale = marks.stale_periods(CIK, restated, [old], PERIODS)
+        assert stale
+        marks.advance(CIK, restated, stale, extract_periods(restated, stale))
+        assert marks.records(CIK, [old], PERIODS) == extract_financials(restated, [old], PERIODS)
@@ -0,0 +1,36 @@
+"""Tests for XBRL metric extraction, including scalar/columnar engine parity."""
+
+import pytest
+
+from helpers import PERIODS, YEARS, synthetic_companyfacts
+from sec_pipeline import config
+from sec_pipeline.fact_table import FactTable
+from sec_pipeline.xbrl import XBRL_TAGS, extract_financials, extract_metric
+
+
+class TestColumnarEngine:
+    @pytest.mark.parametrize("seed", range(6))
+    @pytest.mark.parametrize("fp_fallback", [True, False])
+    def test_matches_scalar_engine(self, monkeypatch, seed, fp_fallback):
+        monkeypatch.setattr(config, "XBRL_ENABLE_FP_FALLBACK", fp_fallback)
+        facts = synthetic_companyfacts(seed)
+        scalar = extract_financials(facts, YEARS, PERIODS, engine="scalar")
+        columnar = extract_financials(facts, YEARS, PERIODS, engine="columnar")
+        assert scalar
+        assert columnar == scalar
+
+    def test_table_accepted_directly(self):
+        facts = synthetic_companyfacts(11)
+        table = FactTable.from_companyfacts(facts, XBRL_TAGS)
+        for metric in ("Net Income", "Capital Expenditures", "Restricted Cash"):
+            assert extract_metric(table, metric, 2021, "Q4") == extract_metric(
+                facts, metric, 2021, "Q4"
+            )
+
+    def test_empty_payload(self):
+        assert extract_financials({}, YEARS, PERIODS, engine="columnar") == []
+
+    def test_unknown_engine_rejected(self, monkeypatch):
+        monkeypatch.setattr(config, "XBRL_ENGINE", "vectorised")
+        with pytest.raises(ValueError, match="vectorised"):
+            extract_financials({}, YEARS, PERIODS)